@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.urls import get_resolver
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'backend.api'
+
+    def ready(self):
+        # Register cache invalidation handlers
+        from backend.api import signals  # noqa: F401
+
+        # Cached view methods register their endpoint for the cache statistics
+        # when decorated; loading the URLconf imports every routed view
+        get_resolver().url_patterns
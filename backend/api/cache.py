@@ -0,0 +1,275 @@
+"""
+Response cache for the read-only catalog endpoints.
+
+Rendered responses are stored under keys built from the view action, the
+request origin (scheme and host, which absolute URLs in bodies are built
+from), the request language, the negotiated format, the normalized query
+parameters and the current version token of every cache namespace the view
+depends on.
+Invalidation publishes a new token for a namespace, so stale entries are never
+looked up again and simply expire; no key scans are needed. Tokens carry the
+time they were published: a miss within ``DB_REPLICA_PIN_SECONDS`` of it
+reads from the primary, so a lagging replica cannot re-cache stale data.
+"""
+import functools
+import hashlib
+import random
+import time
+import uuid
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+
+from backend.api.profiling import span
+from backend.core.db_router import pin_to_primary
+
+NAMESPACE_CATEGORIES = 'categories'
+NAMESPACE_PRODUCTS = 'products'
+NAMESPACES = (NAMESPACE_CATEGORIES, NAMESPACE_PRODUCTS)
+
+VERSION_KEY = 'api:namespace:{}:version'
+RESPONSE_KEY = 'api:response:{endpoint}:{versions}:{language}:{format}:{digest}'
+STATS_KEY = 'api:stats:{endpoint}:{outcome}'
+
+# Parameters already represented by the language and format parts of the key
+IGNORED_PARAMS = {'lang', 'format'}
+
+# Endpoint labels of every cached view method, used for statistics
+endpoints = []
+
+
+def get_cache():
+    return caches[getattr(settings, 'API_CACHE_ALIAS', 'default')]
+
+
+def is_enabled():
+    return getattr(settings, 'API_CACHE_ENABLED', True)
+
+
+def get_timeout():
+    return getattr(settings, 'API_CACHE_TIMEOUT', 600)
+
+
+def get_stats_sample_rate():
+    return getattr(settings, 'API_CACHE_STATS_SAMPLE_RATE', 0.01)
+
+
+def new_version():
+    """Return a fresh version token, suffixed with the time it is published."""
+    return f'{uuid.uuid4().hex}.{int(time.time())}'
+
+
+def published_at(version):
+    """Return the time a version token was published, 0 for tokens without one."""
+    return int(version.partition('.')[2] or 0)
+
+
+def changed_recently(versions):
+    """Whether a namespace changed recently enough for replicas to lag behind."""
+    cutoff = time.time() - settings.DB_REPLICA_PIN_SECONDS
+    return any(published_at(version) >= cutoff for version in versions)
+
+
+def get_namespace_versions(namespaces):
+    """Return the current version token of each namespace, creating missing ones."""
+    cache = get_cache()
+    keys = [VERSION_KEY.format(namespace) for namespace in namespaces]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, new_version(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+async def aget_namespace_versions(namespaces):
+    """Async counterpart of ``get_namespace_versions``."""
+    cache = get_cache()
+    keys = [VERSION_KEY.format(namespace) for namespace in namespaces]
+    versions = await cache.aget_many(keys)
+    for key in keys:
+        if key not in versions:
+            await cache.aadd(key, new_version(), timeout=None)
+            versions[key] = await cache.aget(key)
+    return [versions[key] for key in keys]
+
+
+def invalidate(*namespaces):
+    """Publish new version tokens for the namespaces once the transaction commits."""
+    def bump():
+        get_cache().set_many(
+            {VERSION_KEY.format(namespace): new_version() for namespace in namespaces},
+            timeout=None
+        )
+
+    transaction.on_commit(bump)
+
+
+def normalize_query(query_params, ignored_params=()):
+    """Return query parameters as a canonical, order-independent string."""
+    items = sorted(
+        (key, value)
+        for key, values in query_params.lists()
+        if key not in IGNORED_PARAMS and key not in ignored_params
+        for value in values
+        if value != ''
+    )
+    return '&'.join(f'{key}={value}' for key, value in items)
+
+
+def build_cache_key(endpoint, request, versions, kwargs, ignored_params=()):
+    params = normalize_query(request.query_params, ignored_params)
+    lookup = '&'.join(f'{key}={kwargs[key]}' for key in sorted(kwargs))
+    # Pagination links and image URLs are absolute, so bodies differ per origin
+    origin = f'{request.scheme}://{request.get_host()}'
+    digest = hashlib.md5(f'{origin}/{lookup}?{params}'.encode(), usedforsecurity=False).hexdigest()
+    return RESPONSE_KEY.format(
+        endpoint=endpoint,
+        versions='.'.join(version[:8] for version in versions),
+        language=getattr(request, 'LANGUAGE_CODE', settings.LANGUAGE_CODE),
+        format=request.accepted_renderer.format,
+        digest=digest,
+    )
+
+
+def is_sampled():
+    """Decide whether a lookup updates the counters; one in 1/rate does."""
+    return random.random() < get_stats_sample_rate()
+
+
+def record(endpoint, outcome):
+    if not is_sampled():
+        return
+    cache = get_cache()
+    key = STATS_KEY.format(endpoint=endpoint, outcome=outcome)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+async def arecord(endpoint, outcome):
+    if not is_sampled():
+        return
+    cache = get_cache()
+    key = STATS_KEY.format(endpoint=endpoint, outcome=outcome)
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        if not await cache.aadd(key, 1, timeout=None):
+            await cache.aincr(key)
+
+
+def get_stats():
+    """Return sampled hit/miss counters per cached endpoint."""
+    keys = {
+        (endpoint, outcome): STATS_KEY.format(endpoint=endpoint, outcome=outcome)
+        for endpoint in endpoints
+        for outcome in ('hit', 'miss')
+    }
+    values = get_cache().get_many(keys.values())
+    return {
+        endpoint: {
+            outcome: values.get(keys[endpoint, outcome], 0)
+            for outcome in ('hit', 'miss')
+        }
+        for endpoint in endpoints
+    }
+
+
+def reset_stats():
+    get_cache().delete_many([
+        STATS_KEY.format(endpoint=endpoint, outcome=outcome)
+        for endpoint in endpoints
+        for outcome in ('hit', 'miss')
+    ])
+
+
+def cached_response(cached):
+    content, status, content_type = cached
+    response = HttpResponse(content, status=status, content_type=content_type)
+    response['X-Cache'] = 'HIT'
+    return response
+
+
+def cache_entry(rendered):
+    return rendered.content, rendered.status_code, rendered['Content-Type']
+
+
+def cache_response(*namespaces, ignored_params=()):
+    """
+    Cache successful responses of a viewset method.
+
+    The response is stored after rendering, so hits skip the database,
+    serialization and rendering entirely. ``namespaces`` lists the data the
+    response depends on; invalidating any of them retires the entry.
+    Query parameters in ``ignored_params`` do not affect the response and
+    are left out of the key.
+
+    Coroutine view methods use the async cache API and render the response
+    themselves before storing it, since no post-render callback can await.
+    """
+    def decorator(view_method):
+        endpoint = view_method.__qualname__
+        endpoints.append(endpoint)
+
+        if iscoroutinefunction(view_method):
+            @functools.wraps(view_method)
+            async def async_wrapper(self, request, *args, **kwargs):
+                if not is_enabled() or request.accepted_renderer.media_type == 'text/html':
+                    return await view_method(self, request, *args, **kwargs)
+
+                cache = get_cache()
+                versions = await aget_namespace_versions(namespaces)
+                key = build_cache_key(endpoint, request, versions, kwargs, ignored_params)
+                cached = await cache.aget(key)
+                if cached is not None:
+                    await arecord(endpoint, 'hit')
+                    return cached_response(cached)
+
+                await arecord(endpoint, 'miss')
+                if changed_recently(versions):
+                    pin_to_primary()
+                response = await view_method(self, request, *args, **kwargs)
+                if response.status_code == 200:
+                    response = self.finalize_response(request, response, *args, **kwargs)
+                    with span('render'):
+                        response.render()
+                    await cache.aset(key, cache_entry(response), timeout=get_timeout())
+                response['X-Cache'] = 'MISS'
+                return response
+
+            return async_wrapper
+
+        @functools.wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            if not is_enabled() or request.accepted_renderer.media_type == 'text/html':
+                return view_method(self, request, *args, **kwargs)
+
+            cache = get_cache()
+            versions = get_namespace_versions(namespaces)
+            key = build_cache_key(endpoint, request, versions, kwargs, ignored_params)
+            cached = cache.get(key)
+            if cached is not None:
+                record(endpoint, 'hit')
+                return cached_response(cached)
+
+            record(endpoint, 'miss')
+            if changed_recently(versions):
+                pin_to_primary()
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                def store(rendered):
+                    cache.set(key, cache_entry(rendered), timeout=get_timeout())
+
+                response.add_post_render_callback(store)
+            response['X-Cache'] = 'MISS'
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,149 @@
+"""
+Shared-cache (CDN / reverse proxy) support for the catalog endpoints.
+
+Catalog responses carry surrogate keys naming the data they contain and are
+marked publicly cacheable for ``CDN_MAX_AGE`` seconds by
+``LanguageMiddleware``. When catalog data changes, the matching keys are
+purged through ``CDN_PURGE_URL`` once the transaction commits:
+
+* ``categories``: every response embedding categories or their counters,
+  which includes all product responses; purged when categories change and
+  when a product write moves the counters;
+* ``products``: product listings not limited to one category;
+* ``product-<id>``: one product detail;
+* ``category-<slug>``: one category detail and the product listings limited
+  to it, its subtree included; purged with the categories above a changed
+  product.
+
+List membership and order depend on every product, so listings are purged
+by their listing key rather than by keys of the products they show.
+"""
+import functools
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import transaction
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+from backend.app.category_tree import get_category_tree
+
+KEY_CATEGORIES = 'categories'
+KEY_PRODUCTS = 'products'
+
+CACHEABLE_METHODS = ('GET', 'HEAD')
+CACHEABLE_STATUSES = (200, 304)
+
+
+def product_key(pk):
+    return f'product-{pk}'
+
+
+def category_key(slug):
+    return f'category-{slug}'
+
+
+def category_keys(view, request, **kwargs):
+    """Keys of category responses."""
+    if 'slug' in kwargs:
+        return [KEY_CATEGORIES, category_key(kwargs['slug'])]
+    return [KEY_CATEGORIES]
+
+
+def product_list_keys(view, request, **kwargs):
+    """Keys of product listings; a listing limited to a category carries its key."""
+    category_slug = request.query_params.get('category_slug') or request.query_params.get('category')
+    if category_slug:
+        return [KEY_CATEGORIES, category_key(category_slug)]
+    return [KEY_CATEGORIES, KEY_PRODUCTS]
+
+
+def product_detail_keys(view, request, **kwargs):
+    """Keys of a product detail response."""
+    return [KEY_CATEGORIES, product_key(kwargs['id'])]
+
+
+def product_change_keys(product_id, *category_ids):
+    """
+    Keys of the responses showing a product: its detail, the listings not
+    limited to a category and those of its categories and their ancestors.
+    """
+    tree = get_category_tree()
+    slugs = {
+        node.slug
+        for category_id in category_ids if category_id in tree
+        for node in (*tree.ancestors(category_id), tree.get(category_id))
+    }
+    return [KEY_PRODUCTS, product_key(product_id), *map(category_key, sorted(slugs))]
+
+
+def surrogate_keys(get_keys):
+    """
+    Tag successful and not-modified responses of a viewset method with surrogate keys.
+
+    ``get_keys(view, request, **kwargs)`` returns the keys; they depend only
+    on the request, so cache hits and 304 responses carry them too.
+    """
+    def decorator(view_method):
+        def tag(self, request, response, kwargs):
+            if response.status_code in CACHEABLE_STATUSES:
+                keys = get_keys(self, request, **kwargs)
+                response[settings.CDN_SURROGATE_KEY_HEADER] = ' '.join(keys)
+            return response
+
+        if iscoroutinefunction(view_method):
+            @functools.wraps(view_method)
+            async def async_wrapper(self, request, *args, **kwargs):
+                response = await view_method(self, request, *args, **kwargs)
+                return tag(self, request, response, kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            response = view_method(self, request, *args, **kwargs)
+            return tag(self, request, response, kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def set_cache_control(request, response):
+    """
+    Make surrogate-keyed responses to safe requests publicly cacheable and
+    everything else private, unless the view chose its own Cache-Control.
+
+    Surrogate-keyed responses vary on Accept, since the renderer (JSON or
+    MessagePack, see backend/api/renderers.py) is negotiated from it; cache
+    hits are plain responses, so this cannot depend on the view's renderers.
+    """
+    if response.has_header(settings.CDN_SURROGATE_KEY_HEADER):
+        patch_vary_headers(response, ('Accept',))
+    if response.has_header('Cache-Control'):
+        return response
+    if (
+        request.method in CACHEABLE_METHODS
+        and response.status_code in CACHEABLE_STATUSES
+        and response.has_header(settings.CDN_SURROGATE_KEY_HEADER)
+    ):
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=settings.CDN_BROWSER_MAX_AGE,
+            s_maxage=settings.CDN_MAX_AGE,
+        )
+    else:
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def purge(*keys):
+    """Purge surrogate keys from the shared cache once the transaction commits."""
+    if not settings.CDN_PURGE_URL:
+        return
+
+    def enqueue():
+        from backend.api.tasks import purge_surrogate_keys
+        purge_surrogate_keys.delay(sorted(set(keys)))
+
+    transaction.on_commit(enqueue)
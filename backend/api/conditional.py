@@ -0,0 +1,91 @@
+"""
+Conditional GET support for the catalog endpoints.
+
+The ETag of a response is derived from the version tokens of the response
+cache namespaces it depends on (see ``backend/api/cache.py``), so a matching
+``If-None-Match`` header is answered with 304 without touching the database.
+Every committed change that invalidates cached responses publishes new tokens
+and therefore changes the ETags of the affected endpoints as well.
+
+Tokens also carry the time they were published; the latest of them is sent
+as ``Last-Modified``, so ``If-Modified-Since`` is answered with 304 as well
+when the client sends no ``If-None-Match``.
+"""
+import functools
+import hashlib
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from backend.api.cache import (
+    aget_namespace_versions, get_namespace_versions, normalize_query, published_at
+)
+
+
+def build_etag(endpoint, request, versions, kwargs):
+    parts = [
+        endpoint,
+        *versions,
+        *(f'{key}={kwargs[key]}' for key in sorted(kwargs)),
+        getattr(request, 'LANGUAGE_CODE', settings.LANGUAGE_CODE),
+        request.accepted_renderer.format,
+        normalize_query(request.query_params),
+    ]
+    digest = hashlib.md5('|'.join(map(str, parts)).encode(), usedforsecurity=False).hexdigest()
+    return f'W/"{digest}"'
+
+
+def get_last_modified(versions):
+    """Time the newest of the version tokens was published, None if unknown."""
+    return max(map(published_at, versions), default=0) or None
+
+
+def set_validators(response, etag, last_modified):
+    if response.status_code in (200, 304):
+        response.headers.setdefault('ETag', etag)
+        if last_modified is not None:
+            response.headers.setdefault('Last-Modified', http_date(last_modified))
+    return response
+
+
+def conditional_response(*namespaces):
+    """
+    Answer conditional GET requests of a viewset method.
+
+    ``namespaces`` lists the response cache namespaces the response depends
+    on, like for ``cache_response``. The ETag hashes their version tokens
+    together with the lookup, request language, format and query parameters;
+    ``Last-Modified`` is the time the newest of the tokens was published.
+    Coroutine view methods read the tokens through the async cache API.
+    """
+    def decorator(view_method):
+        endpoint = view_method.__qualname__
+
+        if iscoroutinefunction(view_method):
+            @functools.wraps(view_method)
+            async def async_wrapper(self, request, *args, **kwargs):
+                versions = await aget_namespace_versions(namespaces)
+                etag = build_etag(endpoint, request, versions, kwargs)
+                last_modified = get_last_modified(versions)
+                response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+                if response is None:
+                    response = await view_method(self, request, *args, **kwargs)
+                return set_validators(response, etag, last_modified)
+
+            return async_wrapper
+
+        @functools.wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            versions = get_namespace_versions(namespaces)
+            etag = build_etag(endpoint, request, versions, kwargs)
+            last_modified = get_last_modified(versions)
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = view_method(self, request, *args, **kwargs)
+            return set_validators(response, etag, last_modified)
+
+        return wrapper
+
+    return decorator
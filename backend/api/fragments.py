@@ -0,0 +1,121 @@
+"""
+Fragment cache of serialized list items.
+
+The representation of each object in a list response is cached on its own,
+under a key built from the serializer, the active language, the object id and
+a version the serializer derives from the ``updated_at`` of everything the
+representation shows. For products that is the product itself (translation,
+image and stock changes touch it, see ``backend/app/signals.py``), its
+category and the category counters, so a change retires exactly the
+fragments it affects and stale ones are never read again.
+
+A page is looked up with one ``get_many``; only the misses are serialized,
+and the prefetches their representation needs run for the misses alone.
+"""
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Manager, prefetch_related_objects
+from django.utils.translation import get_language
+
+from backend.api.cache import get_cache
+from backend.api.profiling import ProfiledListSerializer
+
+FRAGMENT_KEY = 'api:fragment:{serializer}:{language}:{pk}:{version}'
+
+
+def is_enabled():
+    return getattr(settings, 'API_FRAGMENT_CACHE_ENABLED', True)
+
+
+def get_timeout():
+    return getattr(settings, 'API_FRAGMENT_CACHE_TIMEOUT', 86400)
+
+
+def version_of(*timestamps):
+    """Short digest of the timestamps a representation depends on."""
+    return hashlib.md5('|'.join(map(str, timestamps)).encode(), usedforsecurity=False).hexdigest()[:16]
+
+
+class FragmentListSerializer(ProfiledListSerializer):
+    """
+    List serializer reusing cached representations of its items.
+
+    The child serializer provides ``get_fragment_version(obj)`` and lists in
+    ``fragment_prefetches`` the prefetches its representation needs, which
+    the queryset should leave out. Async views call ``aload()`` before
+    reading ``data`` and ``astore()`` after, keeping cache and database
+    access off the event loop.
+    """
+
+    _fragments = None
+    _fresh = None
+
+    def get_items(self, data):
+        return list(data.all() if isinstance(data, Manager) else data)
+
+    def get_keys(self, items):
+        child = self.child
+        serializer = type(child)
+        # Field names tell apart representations of different deployments
+        name = f"{serializer.__name__}.{version_of(','.join(child.fields))[:8]}"
+        language = get_language()
+        return [
+            FRAGMENT_KEY.format(
+                serializer=name,
+                language=language,
+                pk=item.pk,
+                version=child.get_fragment_version(item),
+            )
+            for item in items
+        ]
+
+    def get_misses(self, items, keys):
+        return [item for item, key in zip(items, keys) if key not in self._fragments]
+
+    def load(self, items):
+        keys = self.get_keys(items)
+        self._fragments = get_cache().get_many(keys)
+        prefetch_related_objects(self.get_misses(items, keys), *self.child.fragment_prefetches)
+        return keys
+
+    async def aload(self):
+        """Fetch cached fragments and prefetch for the misses ahead of serialization."""
+        if not is_enabled():
+            return
+        self.instance = items = self.get_items(self.instance)
+        keys = self.get_keys(items)
+        self._fragments = await get_cache().aget_many(keys)
+        await sync_to_async(prefetch_related_objects)(
+            self.get_misses(items, keys), *self.child.fragment_prefetches
+        )
+        self._fresh = {}
+
+    async def astore(self):
+        """Store the fragments serialized after ``aload()``."""
+        if self._fresh:
+            await get_cache().aset_many(self._fresh, timeout=get_timeout())
+            self._fresh = {}
+
+    def to_representation(self, data):
+        items = self.get_items(data)
+        if not is_enabled():
+            prefetch_related_objects(items, *self.child.fragment_prefetches)
+            return [self.child.to_representation(item) for item in items]
+
+        loaded = self._fresh is not None
+        keys = self.get_keys(items) if loaded else self.load(items)
+        fresh = {}
+        representations = []
+        for item, key in zip(items, keys):
+            representation = self._fragments.get(key)
+            if representation is None:
+                representation = fresh[key] = self.child.to_representation(item)
+            representations.append(representation)
+
+        if loaded:
+            self._fresh.update(fresh)
+        elif fresh:
+            get_cache().set_many(fresh, timeout=get_timeout())
+        return representations
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from backend.api import cache
+
+
+class Command(BaseCommand):
+    help = 'Show API response cache hit/miss statistics and retire cached responses.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--invalidate',
+            nargs='*',
+            choices=cache.NAMESPACES,
+            help='Retire cached responses of the given namespaces (all when none are given).',
+        )
+        parser.add_argument(
+            '--reset-stats',
+            action='store_true',
+            help='Reset the hit/miss counters after printing them.',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Counters sample {cache.get_stats_sample_rate():.2%} of lookups.')
+        total_hits = total_misses = 0
+        for endpoint, counts in cache.get_stats().items():
+            hits, misses = counts['hit'], counts['miss']
+            total_hits += hits
+            total_misses += misses
+            self.stdout.write(f'{endpoint:<32} {hits:>8} hits {misses:>8} misses {self._ratio(hits, misses)}')
+        self.stdout.write(f"{'total':<32} {total_hits:>8} hits {total_misses:>8} misses "
+                          f'{self._ratio(total_hits, total_misses)}')
+
+        if options['reset_stats']:
+            cache.reset_stats()
+            self.stdout.write('Statistics reset.')
+
+        if options['invalidate'] is not None:
+            namespaces = options['invalidate'] or cache.NAMESPACES
+            cache.invalidate(*namespaces)
+            self.stdout.write(self.style.SUCCESS(f"Invalidated: {', '.join(namespaces)}"))
+
+    @staticmethod
+    def _ratio(hits, misses):
+        requests = hits + misses
+        return f'{hits / requests:6.1%} hit rate' if requests else '     - hit rate'
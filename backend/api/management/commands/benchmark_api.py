@@ -0,0 +1,86 @@
+import json
+
+from django.core.management.base import CommandError
+from django.test.utils import override_settings
+
+from backend.benchmarks.command import BenchmarkCommand
+from backend.benchmarks.runner import compare, discover_scenarios, get_samples, measure
+
+
+class Command(BenchmarkCommand):
+    help = (
+        'Build a synthetic catalog in a throwaway test database and measure latency, '
+        'throughput, query count and memory of every v1 API endpoint.'
+    )
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--concurrency', type=int, default=1)
+        parser.add_argument(
+            '--with-cache',
+            action='store_true',
+            help='Keep the API response cache enabled (disabled by default).',
+        )
+        parser.add_argument('--compare', help='Baseline JSON file to compare the results with.')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as fp:
+                    baseline = json.load(fp)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read baseline {options['compare']}: {exc}")
+
+        with override_settings(API_CACHE_ENABLED=options['with_cache']):
+            report = self.benchmark(options)
+        if baseline is not None:
+            self.print_comparison(baseline, report)
+
+    def run(self, options):
+        catalog = self.prepare_catalog(options)
+        samples = get_samples()
+        results = {}
+        self.stdout.write(
+            f"{'scenario':<36} {'status':>6} {'p50 ms':>9} {'p99 ms':>9} "
+            f"{'req/s':>8} {'queries':>7} {'mem KiB':>9}"
+        )
+        for scenario in discover_scenarios(samples):
+            if not self.selected(options, scenario.name):
+                continue
+            result = measure(
+                scenario,
+                requests=options['requests'],
+                warmup=options['warmup'],
+                concurrency=options['concurrency'],
+                language=options['language'],
+            )
+            results[scenario.name] = result
+            self.stdout.write(
+                f"{scenario.name:<36} {result['status']:>6} {result['p50_ms']:>9.2f} "
+                f"{result['p99_ms']:>9.2f} {result['throughput_rps']:>8.1f} "
+                f"{result['queries']:>7} {result['memory_peak_kb']:>9.1f}"
+            )
+
+        return {
+            'meta': {
+                **self.get_meta(options, catalog),
+                'response_cache': options['with_cache'],
+            },
+            'results': results,
+        }
+
+    def print_comparison(self, baseline, report):
+        self.stdout.write(
+            f"\nCompared with {baseline['meta'].get('commit') or 'baseline'} "
+            f"({baseline['meta']['catalog']['products']} products):"
+        )
+        for name, metric, before, after, change in compare(baseline, report):
+            # Lower is better except for throughput
+            worse = change is not None and (change < 0 if metric == 'throughput_rps' else change > 0)
+            text = f'{name:<36} {metric:<15} {before:>10} -> {after:>10}'
+            if change is None:
+                self.stdout.write(text)
+                continue
+            style = self.style.WARNING if worse and abs(change) >= 10 else self.style.SUCCESS
+            self.stdout.write(style(f'{text} {change:+7.1f}%'))
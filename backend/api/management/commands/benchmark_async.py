@@ -0,0 +1,68 @@
+from django.test.utils import override_settings
+
+from backend.benchmarks.command import BenchmarkCommand
+from backend.benchmarks.concurrency import async_scenarios, measure_concurrent
+from backend.benchmarks.runner import get_samples
+
+
+class Command(BenchmarkCommand):
+    help = (
+        'Compare the async catalog views with the sync views under concurrent '
+        'requests through the ASGI handler, on a synthetic catalog in a throwaway test database.'
+    )
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            nargs='+',
+            default=[1, 10, 50],
+            help='Concurrent clients; every level is measured for both variants.',
+        )
+        parser.set_defaults(requests=200)
+
+    def handle(self, *args, **options):
+        with override_settings(API_CACHE_ENABLED=False):
+            self.benchmark(options)
+
+    def run(self, options):
+        catalog = self.prepare_catalog(options)
+        samples = get_samples()
+        results = {}
+        self.stdout.write(
+            f"{'scenario':<32} {'conc':>4} {'sync p50':>9} {'async p50':>9} "
+            f"{'sync p99':>9} {'async p99':>9} {'sync rps':>9} {'async rps':>9} {'speedup':>7}"
+        )
+        for scenario in async_scenarios(samples):
+            if not self.selected(options, scenario.name):
+                continue
+            results[scenario.name] = []
+            for concurrency in options['concurrency']:
+                sync, async_ = (
+                    measure_concurrent(
+                        scenario,
+                        async_views,
+                        requests=options['requests'],
+                        warmup=options['warmup'],
+                        concurrency=concurrency,
+                        language=options['language'],
+                    )
+                    for async_views in (False, True)
+                )
+                results[scenario.name].append({'sync': sync, 'async': async_})
+                speedup = async_['throughput_rps'] / sync['throughput_rps']
+                line = (
+                    f"{scenario.name:<32} {concurrency:>4} {sync['p50_ms']:>9.2f} "
+                    f"{async_['p50_ms']:>9.2f} {sync['p99_ms']:>9.2f} {async_['p99_ms']:>9.2f} "
+                    f"{sync['throughput_rps']:>9.1f} {async_['throughput_rps']:>9.1f} {speedup:>6.2f}x"
+                )
+                if sync['responses'] != async_['responses']:
+                    self.stdout.write(self.style.ERROR(f'{line}  responses differ'))
+                else:
+                    self.stdout.write(line)
+
+        return {
+            'meta': self.get_meta(options, catalog),
+            'results': results,
+        }
@@ -0,0 +1,162 @@
+import csv
+import io
+import json
+import os
+import random
+import tempfile
+import time
+
+import factory
+from django.core.management import call_command
+from django.db import connection
+
+from backend.app.catalog_import import read_records
+from backend.app.models import Category, Product
+from backend.benchmarks.catalog import build_catalog
+from backend.benchmarks.command import BenchmarkCommand
+from backend.benchmarks.factories import LANGUAGES, ProductFactory, translated_name
+from backend.benchmarks.runner import QueryCounter
+
+FIELDS = ('price', 'discount_price', 'stock_quantity', 'is_active', 'is_featured', 'weight', 'material')
+TRANSLATED_FIELDS = ('name', 'short_description', 'description')
+
+
+class Command(BenchmarkCommand):
+    help = (
+        'Measure import_catalog throughput for new and updated products, from JSON Lines and CSV, '
+        'against creating products row by row through the ORM. Runs on a throwaway test database.'
+    )
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--batch-size', type=int, default=1000, help='import_catalog --batch-size.')
+        parser.add_argument(
+            '--sample',
+            type=int,
+            default=200,
+            help='Records created row by row for the ORM baseline.',
+        )
+
+    def handle(self, *args, **options):
+        self.benchmark(options)
+
+    def run(self, options):
+        catalog = build_catalog(
+            products=0,
+            categories=options['categories'],
+            depth=options['depth'],
+            images_per_product=0,
+            seed=options['seed'],
+        )
+        catalog['products'] = options['products']
+        catalog['batch_size'] = options['batch_size']
+        slugs = list(Category.objects.order_by('pk').values_list('slug', flat=True))
+        rng = random.Random(options['seed'])
+        factory.random.reseed_random(options['seed'])
+        records = [self.build_record(rng, slugs, n) for n in range(options['products'])]
+
+        results = {}
+        with tempfile.TemporaryDirectory() as directory:
+            jsonl = self.write_jsonl(os.path.join(directory, 'products.jsonl'), records, 'JL')
+            csv_path = self.write_csv(os.path.join(directory, 'products.csv'), records, 'CS')
+            scenarios = (
+                ('jsonl-insert', jsonl),
+                ('jsonl-update', jsonl),
+                ('csv-insert', csv_path),
+                ('csv-update', csv_path),
+            )
+            for name, path in scenarios:
+                if self.selected(options, name):
+                    results[name] = self.measure(
+                        lambda: self.import_file(path, options['batch_size']), options['products']
+                    )
+                    self.report(name, results[name])
+
+            if self.selected(options, 'orm-per-row'):
+                sample = os.path.join(directory, 'sample.jsonl')
+                self.write_jsonl(sample, records[:options['sample']], 'OR')
+                results['orm-per-row'] = self.measure(
+                    lambda: self.create_per_row(sample), min(options['sample'], len(records))
+                )
+                self.report('orm-per-row', results['orm-per-row'])
+
+        return {'meta': self.get_meta(options, catalog), 'results': results}
+
+    @staticmethod
+    def build_record(rng, slugs, n):
+        product = ProductFactory.build()
+        return {
+            'category': rng.choice(slugs),
+            **{name: getattr(product, name) for name in FIELDS},
+            'translations': {
+                code: {
+                    'name': translated_name(code, n),
+                    'short_description': f'{translated_name(code, n)} ({code})',
+                    'description': f'Supplier description of item {n} ({code}).',
+                }
+                for code in LANGUAGES
+            },
+        }
+
+    @staticmethod
+    def write_jsonl(path, records, prefix):
+        with open(path, 'w') as fp:
+            for n, record in enumerate(records):
+                fp.write(json.dumps({'sku': f'{prefix}{n:07d}', **record}, default=str) + '\n')
+        return path
+
+    @staticmethod
+    def write_csv(path, records, prefix):
+        columns = [f'{name}_{code}' for code in LANGUAGES for name in TRANSLATED_FIELDS]
+        with open(path, 'w', newline='') as fp:
+            writer = csv.writer(fp)
+            writer.writerow(['sku', 'category', *FIELDS, *columns])
+            for n, record in enumerate(records):
+                writer.writerow([
+                    f'{prefix}{n:07d}',
+                    record['category'],
+                    *('' if record[name] is None else record[name] for name in FIELDS),
+                    *(record['translations'][code][name] for code in LANGUAGES for name in TRANSLATED_FIELDS),
+                ])
+        return path
+
+    @staticmethod
+    def import_file(path, batch_size):
+        call_command('import_catalog', path, batch_size=batch_size, stdout=io.StringIO())
+
+    @staticmethod
+    def create_per_row(path):
+        """The naive path: one create and one save per record, as seed.py does."""
+        categories = dict(Category.objects.values_list('slug', 'pk'))
+        for _, data in read_records(path, 'jsonl'):
+            product = Product.objects.create(
+                sku=data['sku'],
+                category_id=categories[data['category']],
+                **{name: data[name] for name in FIELDS},
+            )
+            for code, values in data['translations'].items():
+                product.set_current_language(code)
+                for name, value in values.items():
+                    setattr(product, name, value)
+            product.save()
+
+    @staticmethod
+    def measure(run, records):
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            started = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - started
+        return {
+            'records': records,
+            'seconds': round(elapsed, 3),
+            'records_per_s': round(records / elapsed, 1),
+            'queries': counter.count,
+            'queries_per_record': round(counter.count / records, 3),
+        }
+
+    def report(self, name, result):
+        self.stdout.write(
+            f"{name:<14} {result['records']:>8} records {result['seconds']:9.2f} s "
+            f"{result['records_per_s']:10.0f} records/s {result['queries_per_record']:8.2f} queries/record"
+        )
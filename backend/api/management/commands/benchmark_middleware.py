@@ -0,0 +1,105 @@
+import time
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.test import AsyncClient
+from django.test.client import AsyncClientHandler
+
+from backend.benchmarks.command import BenchmarkCommand
+from backend.benchmarks.runner import discover_scenarios, get_samples, percentile
+from backend.core.handlers import MiddlewareProfilesMixin
+
+FULL = 'full'
+PROFILE = 'profile'
+
+
+class ProfiledAsyncClientHandler(MiddlewareProfilesMixin, AsyncClientHandler):
+    pass
+
+
+class Command(BenchmarkCommand):
+    help = (
+        'Compare the per-request cost of the full MIDDLEWARE stack with the stacks of '
+        'MIDDLEWARE_PROFILES on the catalog routes they cover, through the ASGI request '
+        'handling, and check that both return the same responses. The response cache is '
+        'warm, so middleware is a large share of the work. Runs on a synthetic catalog '
+        'in a throwaway test database.'
+    )
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--rounds', type=int, default=3, help='Alternating rounds per stack.')
+        parser.set_defaults(requests=300, products=500)
+
+    def handle(self, *args, **options):
+        self.benchmark(options)
+
+    def get_clients(self):
+        profiled = AsyncClient()
+        profiled.handler = ProfiledAsyncClientHandler(enforce_csrf_checks=False)
+        return {FULL: AsyncClient(), PROFILE: profiled}
+
+    def run(self, options):
+        catalog = self.prepare_catalog(options)
+        prefixes = tuple(settings.MIDDLEWARE_PROFILES)
+        headers = {'Accept-Language': options['language']}
+        results = {}
+        self.stdout.write(
+            f"{'scenario':<32} {'full p50':>9} {'lean p50':>9} {'full p99':>9} {'lean p99':>9} "
+            f"{'saved us':>9} {'saved':>6}"
+        )
+        for scenario in discover_scenarios(get_samples()):
+            if not scenario.path.startswith(prefixes) or not self.selected(options, scenario.name):
+                continue
+            result = async_to_sync(self.measure)(scenario, headers, options)
+            if result is None:
+                continue
+            results[scenario.name] = result
+            full, profile = result[FULL], result[PROFILE]
+            saved = full['p50_ms'] - profile['p50_ms']
+            line = (
+                f"{scenario.name:<32} {full['p50_ms']:>9.3f} {profile['p50_ms']:>9.3f} "
+                f"{full['p99_ms']:>9.3f} {profile['p99_ms']:>9.3f} {saved * 1000:>9.0f} "
+                f"{saved / full['p50_ms']:>6.1%}"
+            )
+            if result['identical']:
+                self.stdout.write(line)
+            else:
+                self.stdout.write(self.style.ERROR(f'{line}  responses differ'))
+
+        return {
+            'meta': {
+                **self.get_meta(options, catalog),
+                'middleware': settings.MIDDLEWARE,
+                'profiles': settings.MIDDLEWARE_PROFILES,
+            },
+            'results': results,
+        }
+
+    async def measure(self, scenario, headers, options):
+        clients = self.get_clients()
+        responses = {}
+        for name, client in clients.items():
+            for _ in range(options['warmup']):
+                response = await client.get(scenario.path, scenario.params, headers=headers)
+            if response.streaming:
+                # Feed exports are dominated by the feed itself
+                return None
+            responses[name] = (response.status_code, dict(response.headers), response.content)
+
+        latencies = {name: [] for name in clients}
+        for _ in range(options['rounds']):
+            for name, client in clients.items():
+                for _ in range(options['requests']):
+                    started = time.perf_counter()
+                    await client.get(scenario.path, scenario.params, headers=headers)
+                    latencies[name].append(time.perf_counter() - started)
+
+        result = {'identical': responses[FULL] == responses[PROFILE]}
+        for name, values in latencies.items():
+            values.sort()
+            result[name] = {
+                'p50_ms': round(percentile(values, 50) * 1000, 3),
+                'p99_ms': round(percentile(values, 99) * 1000, 3),
+            }
+        return result
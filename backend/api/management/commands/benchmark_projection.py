@@ -0,0 +1,132 @@
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from parler.utils.i18n import get_active_language_choices
+from rest_framework.renderers import JSONRenderer
+
+from backend.api.v1.projections import product_rows, render_products
+from backend.api.v1.serializers import ProductListSerializer
+from backend.app.models import Category, Product
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare ProductListSerializer, with and without warm list fragments, with the '
+        'single-language projection. '
+        'Synthetic products are created inside a transaction that is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[20, 500])
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--language', default='en')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.ensure_products(max(options['sizes']))
+            for size in options['sizes']:
+                self.benchmark(size, options['language'], options['repeat'])
+            transaction.set_rollback(True)
+
+    def ensure_products(self, count):
+        """Create enough translated products for the largest page."""
+        missing = count - Product.objects.filter(is_active=True).count()
+        if missing <= 0:
+            return
+        category = Category.objects.filter(is_active=True).first()
+        if category is None:
+            raise CommandError('At least one active category is required.')
+        products = Product.objects.bulk_create(
+            Product(
+                sku=f'BENCH-{index:06d}',
+                category=category,
+                price=Decimal('100.00') + index,
+                stock_quantity=index % 5,
+                material='Gold',
+            )
+            for index in range(missing)
+        )
+        Translation = Product._parler_meta.root_model
+        Translation.objects.bulk_create(
+            Translation(
+                master=product,
+                language_code=code,
+                name=f'Benchmark product {product.sku} ({code})',
+                description='Synthetic product created by benchmark_projection.',
+                short_description='Synthetic product',
+            )
+            for product in products
+            for code in ('en', 'de', 'fr')
+        )
+
+    def serialize(self, size, language):
+        with override_settings(API_FRAGMENT_CACHE_ENABLED=False):
+            return self.serialize_fragments(size, language)
+
+    def serialize_fragments(self, size, language):
+        """The serializer reusing cached fragments; every run after the first hits."""
+        queryset = Product.objects.filter(is_active=True).active_translations(
+            language
+        ).select_related('category__stats', 'primary_image')[:size]
+        return ProductListSerializer(queryset, many=True).data
+
+    def project(self, size, language):
+        rows = product_rows(Product.objects.filter(is_active=True), language)[:size]
+        return render_products(rows, language)
+
+    def measure(self, build, size, language, repeat):
+        timings = []
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                data = build(size, language)
+                JSONRenderer().render(data)
+                timings.append(time.perf_counter() - started)
+        return data, min(timings), len(queries.captured_queries)
+
+    def benchmark(self, size, language, repeat):
+        full, full_time, full_queries = self.measure(self.serialize, size, language, repeat)
+        fragments, fragments_time, fragments_queries = self.measure(
+            self.serialize_fragments, size, language, repeat
+        )
+        projected, projected_time, projected_queries = self.measure(
+            self.project, size, language, repeat
+        )
+
+        choices = get_active_language_choices(language)
+
+        def single_language(translations):
+            code = next((code for code in choices if code in translations), None)
+            return {code: translations[code]} if code else {}
+
+        expected = [
+            {
+                **item,
+                'translations': single_language(item['translations']),
+                'category': {
+                    **item['category'],
+                    'translations': single_language(item['category']['translations']),
+                },
+            }
+            for item in full
+        ]
+        identical = JSONRenderer().render(expected) == JSONRenderer().render(projected)
+        fragments_identical = JSONRenderer().render(full) == JSONRenderer().render(fragments)
+
+        self.stdout.write(f'{size} items ({language}), best of {repeat}:')
+        for label, elapsed, queries in (
+            ('serializer', full_time, full_queries),
+            ('fragments', fragments_time, fragments_queries),
+            ('projection', projected_time, projected_queries),
+        ):
+            self.stdout.write(
+                f'  {label:<11} {elapsed * 1000:9.2f} ms {size / elapsed:10.0f} items/s {queries:5} queries'
+            )
+        self.stdout.write(f'  speedup     {full_time / projected_time:9.1f}x')
+        style = self.style.SUCCESS if identical else self.style.ERROR
+        self.stdout.write(style(f"  output identical to the single-language slice: {'yes' if identical else 'no'}"))
+        style = self.style.SUCCESS if fragments_identical else self.style.ERROR
+        self.stdout.write(style(f"  fragments identical to the serializer: {'yes' if fragments_identical else 'no'}"))
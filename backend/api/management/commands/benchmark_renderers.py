@@ -0,0 +1,113 @@
+import time
+
+from django.core.management.base import CommandError
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.utils import translation
+from rest_framework.renderers import JSONRenderer
+
+from backend.api import renderers
+from backend.api.renderers import FastJSONRenderer, MessagePackRenderer
+from backend.api.v1.projections import product_rows, render_products
+from backend.api.v1.serializers import ProductDetailSerializer, ProductListSerializer
+from backend.app.models import Product
+from backend.benchmarks.command import BenchmarkCommand
+
+
+class Command(BenchmarkCommand):
+    help = (
+        'Time JSONRenderer, the orjson-backed FastJSONRenderer and MessagePackRenderer on '
+        'product list pages and a product detail, and check that both JSON renderers produce '
+        'the same bytes. Runs on a synthetic catalog in a throwaway test database.'
+    )
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--sizes', nargs='+', type=int, default=[20, 100, 500], help='Page sizes.')
+        parser.add_argument('--repeat', type=int, default=20, help='Renders per page and renderer; the best counts.')
+        parser.set_defaults(products=500)
+
+    def handle(self, *args, **options):
+        if renderers.orjson is None:
+            raise CommandError('orjson is not installed: FastJSONRenderer would be JSONRenderer.')
+        report = self.benchmark(options)
+        different = [name for name, result in report['results'].items() if not result['identical']]
+        if different:
+            raise CommandError(f'FastJSONRenderer output differs on: {", ".join(different)}')
+
+    def get_renderers(self):
+        candidates = [('json', JSONRenderer()), ('fast-json', FastJSONRenderer())]
+        if renderers.msgpack is not None:
+            candidates.append(('msgpack', MessagePackRenderer()))
+        else:
+            self.stdout.write(self.style.WARNING('msgpack is not installed, skipping MessagePackRenderer.'))
+        return candidates
+
+    def get_pages(self, options):
+        """Response data of product pages as the views build them, fragments left out."""
+        language = options['language']
+        context = {'request': RequestFactory().get('/api/v1/products/')}
+        products = Product.objects.filter(is_active=True).order_by('-created_at')
+        listed = products.active_translations(language).select_related('category__stats', 'primary_image')
+
+        def paginated(results):
+            return {'count': products.count(), 'next': None, 'previous': None, 'results': results}
+
+        pages = {}
+        for size in options['sizes']:
+            pages[f'list-{size}'] = lambda size=size: paginated(
+                ProductListSerializer(listed[:size], many=True, context=context).data
+            )
+            pages[f'projection-{size}'] = lambda size=size: paginated(
+                render_products(product_rows(products, language)[:size], language)
+            )
+        product = products.prefetch_related('translations', 'images__renditions').first()
+        pages['detail'] = lambda: ProductDetailSerializer(product, context=context).data
+
+        with override_settings(API_FRAGMENT_CACHE_ENABLED=False), translation.override(language):
+            return {name: build() for name, build in pages.items() if self.selected(options, name)}
+
+    def run(self, options):
+        catalog = self.prepare_catalog(options)
+        candidates = self.get_renderers()
+        results = {}
+        self.stdout.write(
+            f"{'page':<16} " + ' '.join(f'{name + " ms":>12} {"bytes":>9}' for name, _ in candidates)
+            + f" {'speedup':>8}"
+        )
+        for name, data in self.get_pages(options).items():
+            result = {}
+            for renderer_name, renderer in candidates:
+                content, elapsed = self.measure(renderer, data, options['repeat'])
+                result[renderer_name] = {
+                    'ms': round(elapsed * 1000, 3),
+                    'bytes': len(content),
+                    'content': content,
+                }
+            result['identical'] = result['json'].pop('content') == result['fast-json'].pop('content')
+            result.get('msgpack', {}).pop('content', None)
+            result['speedup'] = round(result['json']['ms'] / result['fast-json']['ms'], 2)
+            results[name] = result
+
+            line = f'{name:<16} ' + ' '.join(
+                f"{result[renderer_name]['ms']:>12.3f} {result[renderer_name]['bytes']:>9}"
+                for renderer_name, _ in candidates
+            ) + f" {result['speedup']:>7.1f}x"
+            if result['identical']:
+                self.stdout.write(line)
+            else:
+                self.stdout.write(self.style.ERROR(f'{line}  JSON differs'))
+
+        return {
+            'meta': {**self.get_meta(options, catalog), 'repeat': options['repeat']},
+            'results': results,
+        }
+
+    @staticmethod
+    def measure(renderer, data, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            content = renderer.render(data, renderer.media_type, {})
+            timings.append(time.perf_counter() - started)
+        return content, min(timings)
@@ -0,0 +1,219 @@
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.management.base import CommandError
+from django.db import connection, connections, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from backend.app import reservations
+from backend.app.category_stats import rebuild_category_stats
+from backend.app.models import CategoryStats, Product, StockReservation
+from backend.benchmarks.catalog import build_catalog
+from backend.benchmarks.command import BenchmarkCommand
+from backend.benchmarks.runner import percentile
+
+CONFIRM = 'confirmed'
+RELEASE = 'released'
+ABANDON = 'abandoned'
+# What clients do with a hold they got: pay, cancel, or leave it to expire
+OUTCOMES = (CONFIRM, RELEASE, ABANDON)
+OUTCOME_WEIGHTS = (6, 2, 2)
+
+
+def reserve_locked(product_id, quantity, ttl=None):
+    """The textbook alternative: lock the product row, check and save it through the ORM."""
+    with transaction.atomic():
+        product = Product.objects.select_for_update().get(pk=product_id, is_active=True)
+        if product.stock_quantity < quantity:
+            raise reservations.InsufficientStock(product.stock_quantity)
+        product.stock_quantity -= quantity
+        product.save(update_fields=['stock_quantity', 'updated_at'])
+        return StockReservation.objects.create(
+            product=product,
+            quantity=quantity,
+            expires_at=timezone.now() + timedelta(seconds=ttl or 600),
+        )
+
+
+class Command(BenchmarkCommand):
+    help = (
+        'Hammer a few products with stock reservations from hundreds of concurrent clients, '
+        'as in a flash sale, verify that nothing is oversold and the stock and category counters '
+        'add up, and compare the conditional UPDATE with locking the row through the ORM. '
+        'Clients share the connection pool like request threads. Runs on a throwaway test database.'
+    )
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--clients', type=int, default=200, help='Concurrent clients.')
+        parser.add_argument('--attempts', type=int, default=20, help='Reservations each client tries to place.')
+        parser.add_argument('--stock', type=int, default=500, help='Initial stock of every product.')
+        parser.add_argument(
+            '--abandoned-ttl',
+            type=float,
+            default=0.5,
+            help='Seconds before holds the client walks away from expire.',
+        )
+        # --products is the number of products on sale
+        parser.set_defaults(products=3, images=0)
+
+    def handle(self, *args, **options):
+        if 'pool' not in connection.settings_dict['OPTIONS']:
+            raise CommandError(
+                'Set DB_POOL_ENABLED=True: without a pool every client holds its own connection.'
+            )
+        report = self.benchmark(options)
+        failed = [name for name, result in report['results'].items() if not result['consistent']]
+        if failed:
+            raise CommandError(f'Stock went out of sync in: {", ".join(failed)}')
+
+    def run(self, options):
+        catalog = build_catalog(
+            products=options['products'],
+            categories=options['categories'],
+            depth=options['depth'],
+            images_per_product=0,
+            seed=options['seed'],
+        )
+        catalog['stock'] = options['stock']
+        products = list(Product.objects.order_by('pk').values_list('pk', flat=True))
+
+        results = {}
+        for name, reserve in (
+            ('conditional-update', reservations.reserve),
+            ('select-for-update', reserve_locked),
+        ):
+            if self.selected(options, name):
+                self.reset(products, options['stock'])
+                results[name] = self.measure(reserve, products, options)
+                self.report(name, results[name])
+
+        return {
+            'meta': {
+                **self.get_meta(options, catalog),
+                'clients': options['clients'],
+                'attempts_per_client': options['attempts'],
+                'pool_max_size': connection.settings_dict['OPTIONS']['pool'].get('max_size'),
+            },
+            'results': results,
+        }
+
+    @staticmethod
+    def reset(products, stock):
+        StockReservation.objects.all().delete()
+        Product.objects.filter(pk__in=products).update(stock_quantity=stock)
+        rebuild_category_stats()
+
+    def measure(self, reserve, products, options):
+        done = threading.Event()
+
+        def client(number):
+            rng = random.Random(options['seed'] + number)
+            latencies = []
+            counts = Counter()
+            try:
+                for _ in range(options['attempts']):
+                    product_id = rng.choice(products)
+                    outcome = rng.choices(OUTCOMES, OUTCOME_WEIGHTS)[0]
+                    ttl = options['abandoned_ttl'] if outcome == ABANDON else None
+                    started = time.perf_counter()
+                    try:
+                        reservation = reserve(product_id, 1, ttl=ttl)
+                    except reservations.InsufficientStock:
+                        counts['sold_out'] += 1
+                    else:
+                        counts['reserved'] += 1
+                        if outcome == CONFIRM:
+                            reservations.confirm(reservation.pk)
+                        elif outcome == RELEASE:
+                            reservations.release(reservation.pk)
+                        counts[outcome] += 1
+                    latencies.append(time.perf_counter() - started)
+                    # Every attempt stands for a request: hand the connection back
+                    connection.close()
+            finally:
+                connections.close_all()
+            return latencies, counts
+
+        def sweeper():
+            expired = 0
+            try:
+                while not done.wait(options['abandoned_ttl'] / 2):
+                    expired += reservations.expire_reservations()
+                    connection.close()
+            finally:
+                connections.close_all()
+            return expired
+
+        latencies = []
+        counts = Counter()
+        with ThreadPoolExecutor(max_workers=options['clients'] + 1) as executor:
+            swept = executor.submit(sweeper)
+            started = time.perf_counter()
+            for client_latencies, client_counts in executor.map(client, range(options['clients'])):
+                latencies.extend(client_latencies)
+                counts.update(client_counts)
+            elapsed = time.perf_counter() - started
+            done.set()
+            expired = swept.result()
+
+        time.sleep(options['abandoned_ttl'])
+        expired += reservations.expire_reservations()
+
+        latencies.sort()
+        attempts = len(latencies)
+        return {
+            'attempts': attempts,
+            'seconds': round(elapsed, 3),
+            'attempts_per_s': round(attempts / elapsed, 1),
+            'reserved_per_s': round(counts['reserved'] / elapsed, 1),
+            'reserved': counts['reserved'],
+            'sold_out': counts['sold_out'],
+            'confirmed': counts[CONFIRM],
+            'released': counts[RELEASE],
+            'abandoned': counts[ABANDON],
+            'expired': expired,
+            'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+            'max_ms': round(latencies[-1] * 1000, 3),
+            **self.verify(products, options['stock']),
+        }
+
+    @staticmethod
+    def verify(products, stock):
+        """Compare what is left and what is sold or still held with the initial stock."""
+        left = dict(Product.objects.filter(pk__in=products).values_list('pk', 'stock_quantity'))
+        taken = dict(
+            StockReservation.objects.filter(
+                status__in=[StockReservation.STATUS_HELD, StockReservation.STATUS_CONFIRMED]
+            ).values('product_id').annotate(quantity=Sum('quantity')).values_list('product_id', 'quantity')
+        )
+        counters = list(CategoryStats.objects.order_by('pk').values_list('pk', 'in_stock_products_count'))
+        rebuild_category_stats()
+        counters_consistent = counters == list(
+            CategoryStats.objects.order_by('pk').values_list('pk', 'in_stock_products_count')
+        )
+        oversold = sum(max(0, taken.get(pk, 0) - stock) for pk in products)
+        stock_consistent = all(left[pk] >= 0 and left[pk] + taken.get(pk, 0) == stock for pk in products)
+        return {
+            'oversold': oversold,
+            'stock_consistent': stock_consistent,
+            'counters_consistent': counters_consistent,
+            'consistent': not oversold and stock_consistent and counters_consistent,
+        }
+
+    def report(self, name, result):
+        line = (
+            f"{name:<20} {result['attempts']:>7} attempts {result['seconds']:8.2f} s "
+            f"{result['reserved_per_s']:9.0f} reserved/s p50 {result['p50_ms']:7.2f} ms "
+            f"p99 {result['p99_ms']:8.2f} ms  sold out {result['sold_out']}, oversold {result['oversold']}"
+        )
+        if result['consistent']:
+            self.stdout.write(line)
+        else:
+            self.stdout.write(self.style.ERROR(f'{line}  stock out of sync'))
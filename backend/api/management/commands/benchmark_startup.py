@@ -0,0 +1,108 @@
+import os
+import statistics
+import sys
+
+from django.db import connection
+
+from backend.benchmarks.command import BenchmarkCommand
+from backend.benchmarks.startup import run_probe, run_server
+
+PATH = '/api/v1/products/'
+PROFILES = {
+    'full': {'API_ONLY': 'False'},
+    'api-only': {'API_ONLY': 'True'},
+}
+
+
+class Command(BenchmarkCommand):
+    help = (
+        'Measure how fast a server worker boots: importing the application and serving its '
+        'first request in a fresh interpreter with the full and the API-only settings, and '
+        'the time to all workers ready and the memory of uvicorn and of gunicorn with and '
+        'without preload_app. Servers run against a synthetic catalog in a throwaway test database.'
+    )
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--boots', type=int, default=10, help='Fresh interpreters per settings profile.')
+        parser.add_argument('--workers', type=int, default=4, help='Workers per server.')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.set_defaults(products=200, images=0, requests=200)
+
+    def handle(self, *args, **options):
+        self.benchmark(options)
+
+    def get_env(self, **extra):
+        """Environment of the child processes, pointed at the test database."""
+        env = {
+            **os.environ,
+            'DJANGO_SETTINGS_MODULE': 'backend.core.settings',
+            'POSTGRES_DB': connection.settings_dict['NAME'],
+            'PYTHONPATH': os.getcwd(),
+            **extra,
+        }
+        env.pop('POSTGRES_REPLICA_HOSTS', None)
+        return env
+
+    def get_servers(self, options):
+        workers = str(options['workers'])
+        port = str(options['port'])
+        uvicorn = [
+            sys.executable, '-m', 'uvicorn', 'backend.core.asgi:application',
+            '--port', port, '--workers', workers,
+        ]
+        gunicorn = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'backend.core.asgi:application']
+        gunicorn_env = {'PORT': port, 'WEB_CONCURRENCY': workers}
+        return {
+            'uvicorn': (uvicorn, {'API_ONLY': 'False'}),
+            'gunicorn': (gunicorn, {**gunicorn_env, 'GUNICORN_PRELOAD': 'False'}),
+            'gunicorn-preload': (gunicorn, {**gunicorn_env, 'GUNICORN_PRELOAD': 'True'}),
+        }
+
+    def run(self, options):
+        catalog = self.prepare_catalog(options)
+        results = {'boot': {}, 'servers': {}}
+
+        self.stdout.write(
+            f"{'worker boot':<18} {'import ms':>10} {'request ms':>11} {'boot ms':>8} "
+            f"{'modules':>8} {'rss MB':>7}  (median of {options['boots']})"
+        )
+        for name, extra in PROFILES.items():
+            if not self.selected(options, name):
+                continue
+            probes = [run_probe(PATH, self.get_env(**extra)) for _ in range(options['boots'])]
+            result = {
+                key: statistics.median(probe[key] for probe in probes)
+                for key in ('import_ms', 'first_request_ms', 'boot_ms', 'modules', 'max_rss_mb')
+            }
+            results['boot'][name] = result
+            self.stdout.write(
+                f"{name:<18} {result['import_ms']:>10.1f} {result['first_request_ms']:>11.1f} "
+                f"{result['boot_ms']:>8.1f} {result['modules']:>8.0f} {result['max_rss_mb']:>7.1f}"
+            )
+
+        self.stdout.write(
+            f"\n{'server':<18} {'first response s':>16} {'workers ready s':>16} "
+            f"{'PSS MB':>8} {'private MB':>11}  ({options['workers']} workers)"
+        )
+        url = f"http://127.0.0.1:{options['port']}{PATH}"
+        for name, (command, extra) in self.get_servers(options).items():
+            if not self.selected(options, name):
+                continue
+            result = run_server(
+                command, self.get_env(**extra), url, options['workers'], requests=options['requests']
+            )
+            results['servers'][name] = result
+            line = (
+                f"{name:<18} {result['first_response_s']:>16.3f} {result['workers_ready_s']:>16.3f} "
+                f"{result['pss_mb']:>8.1f} {result['private_mb']:>11.1f}"
+            )
+            if result['errors']:
+                self.stdout.write(self.style.ERROR(f"{line}  {result['errors']} failed requests"))
+            else:
+                self.stdout.write(line)
+
+        return {
+            'meta': {**self.get_meta(options, catalog), 'workers': options['workers']},
+            'results': results,
+        }
@@ -0,0 +1,54 @@
+import sys
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.api.v1.export import FORMAT_JSONL, FORMATS, export, parse_since
+
+
+class Command(BaseCommand):
+    help = (
+        'Stream the product catalog in one language as JSON Lines, CSV or a Google Merchant RSS feed. '
+        'With --since, export every product updated after that time, deactivated ones included, '
+        'and the products deleted since then. Deletions are kept for EXPORT_TOMBSTONE_RETENTION '
+        'days; an older --since needs a full export instead.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output-format', choices=FORMATS, default=FORMAT_JSONL)
+        parser.add_argument('--language', default=settings.PARLER_DEFAULT_LANGUAGE_CODE)
+        parser.add_argument('--since', help='ISO 8601 date or date-time, e.g. the cutoff of the last export.')
+        parser.add_argument('--output', help='Write to this file instead of stdout.')
+        parser.add_argument(
+            '--base-url',
+            default=settings.EXPORT_SITE_URL,
+            help='Prefix of image URLs (default: EXPORT_SITE_URL).',
+        )
+
+    def handle(self, *args, **options):
+        language = options['language']
+        if language not in dict(settings.LANGUAGES):
+            raise CommandError(f'Unknown language "{language}".')
+        since = None
+        if options['since']:
+            try:
+                since = parse_since(options['since'])
+            except ValueError as exc:
+                raise CommandError(exc)
+
+        base_url = options['base_url']
+        cutoff, chunks = export(
+            options['output_format'],
+            language,
+            since,
+            absolute_url=lambda url: urljoin(f'{base_url.rstrip("/")}/', url) if base_url else url,
+        )
+        output = open(options['output'], 'w', encoding='utf-8') if options['output'] else sys.stdout
+        try:
+            for chunk in chunks:
+                output.write(chunk)
+        finally:
+            if options['output']:
+                output.close()
+        self.stderr.write(f'Exported products changed up to {cutoff.isoformat()}; pass it as --since next time.')
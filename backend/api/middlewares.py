@@ -3,65 +3,137 @@ Custom Language Middleware.
 Extracts language from Accept-Language header and sets it for the request.
 """
 from django.utils import translation
+from django.utils.cache import patch_vary_headers
 from django.utils.deprecation import MiddlewareMixin
 from django.conf import settings
 
+from backend.api import profiling
+from backend.api.cdn import set_cache_control
+
 
 class LanguageMiddleware(MiddlewareMixin):
     """
     Middleware to handle multi-language requests.
     Follows Single Responsibility Principle (SOLID).
+    
+    Language variants are normalized to the supported primary languages
+    (``de-AT`` -> ``de``). Responses vary on Accept-Language and get
+    Cache-Control headers (see backend/api/cdn.py).
+
+    Shared caches key variants by the raw header value, so a CDN can pass the
+    language it normalized at the edge in ``CDN_LANGUAGE_HEADER``. That header
+    then takes precedence over Accept-Language and responses vary on it only,
+    giving one cached variant per language.
     """
     
     def process_request(self, request):
         """
-        Process incoming request and set language from Accept-Language header.
-        Falls back to default language if header is not present.
+        Process incoming request and set language from ``?lang``, POST data,
+        the ``CDN_LANGUAGE_HEADER`` or the Accept-Language header, in that order.
+        Falls back to default language if none of them is supported.
         """
         language = self._get_language_from_request(request)
         
-        # Validate language is supported
-        supported_languages = [lang[0] for lang in settings.LANGUAGES]
-        if language not in supported_languages:
-            language = settings.LANGUAGE_CODE
-        
         # Set language for this request
         translation.activate(language)
         request.LANGUAGE_CODE = language
     
     def process_response(self, request, response):
         """
-        Add Content-Language header to response.
+        Add Content-Language, Vary and Cache-Control headers to response.
         """
         if hasattr(request, 'LANGUAGE_CODE'):
             response['Content-Language'] = request.LANGUAGE_CODE
-        return response
+        patch_vary_headers(response, (self._get_language_header(request),))
+        return set_cache_control(request, response)
+    
+    @staticmethod
+    def _get_language_header(request):
+        """Return the request header the language was negotiated from."""
+        if settings.CDN_LANGUAGE_HEADER and settings.CDN_LANGUAGE_HEADER in request.headers:
+            return settings.CDN_LANGUAGE_HEADER
+        return 'Accept-Language'
     
     @staticmethod
-    def _get_language_from_request(request):
+    def normalize_language(language):
+        """
+        Return the supported language matching a language tag, or None.
+        Tags are matched case-insensitively, first exactly, then by primary subtag.
+        """
+        language = language.strip().lower().replace('_', '-')
+        supported = {code.lower(): code for code, _ in settings.LANGUAGES}
+        if language in supported:
+            return supported[language]
+        return supported.get(language.split('-')[0])
+    
+    @classmethod
+    def _get_language_from_request(cls, request):
         """
-        Extract language from Accept-Language header.
+        Extract language from the request.
         Returns default language if not found.
         """
         # Check for explicit language parameter first
         lang_param = request.GET.get('lang') or request.POST.get('lang')
         if lang_param:
-            return lang_param.lower()
+            language = cls.normalize_language(lang_param)
+            if language:
+                return language
+        
+        # Language normalized by the CDN
+        if settings.CDN_LANGUAGE_HEADER:
+            language = cls.normalize_language(request.headers.get(settings.CDN_LANGUAGE_HEADER, ''))
+            if language:
+                return language
         
-        # Check Accept-Language header
+        # Check Accept-Language header (e.g., "en-US,en;q=0.9,de;q=0.8"),
+        # most preferred first
         accept_language = request.META.get('HTTP_ACCEPT_LANGUAGE', '')
-        if accept_language:
-            # Parse Accept-Language header (e.g., "en-US,en;q=0.9,de;q=0.8")
-            languages = []
-            for item in accept_language.split(','):
-                lang = item.split(';')[0].strip().lower()
-                # Handle language codes like 'en-US' -> 'en'
-                if '-' in lang:
-                    lang = lang.split('-')[0]
-                languages.append(lang)
-            
-            if languages:
-                return languages[0]
+        for lang in cls._parse_accept_language(accept_language):
+            language = cls.normalize_language(lang)
+            if language:
+                return language
         
         # Fallback to default
-        return settings.LANGUAGE_CODE
\ No newline at end of file
+        return cls.normalize_language(settings.LANGUAGE_CODE) or settings.LANGUAGES[0][0]
+    
+    @staticmethod
+    def _parse_accept_language(header):
+        """Return the language ranges of an Accept-Language header by descending quality."""
+        ranges = []
+        for position, item in enumerate(header.split(',')):
+            lang, _, params = item.partition(';')
+            lang = lang.strip()
+            if not lang or lang == '*':
+                continue
+            quality = 1.0
+            params = params.strip()
+            if params.startswith('q='):
+                try:
+                    quality = float(params[2:])
+                except ValueError:
+                    continue
+            if quality > 0:
+                ranges.append((-quality, position, lang))
+        return [lang for _, _, lang in sorted(ranges)]
+
+
+class ProfilingMiddleware(MiddlewareMixin):
+    """
+    Report query count and database, serialization, render and total time
+    as ``Server-Timing`` headers while profiling is enabled.
+    Listed last so rendering is timed from right before DRF renders.
+    """
+    
+    def process_request(self, request):
+        if profiling.is_enabled():
+            profiling.start()
+    
+    def process_template_response(self, request, response):
+        profiling.mark_render_started()
+        return response
+    
+    def process_response(self, request, response):
+        server_timing = profiling.stop()
+        if server_timing is not None:
+            response['Server-Timing'] = server_timing
+        return response
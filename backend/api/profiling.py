@@ -0,0 +1,198 @@
+"""
+Per-request profiling reported as ``Server-Timing`` headers.
+
+While profiling is enabled, every request records its query count and the
+time spent in the database, in serialization and in rendering. Statements
+slower than ``PROFILING_SLOW_QUERY_MS`` are logged with the project code that
+issued them and kept in a short per-process list.
+
+Profiling starts from ``PROFILING_ENABLED`` and can be switched at runtime
+through a cache flag, which every process picks up within
+``PROFILING_REFRESH_SECONDS``. When it is off, the query recorder and the
+spans return after a context variable lookup.
+"""
+import contextvars
+import logging
+import os
+import time
+import traceback
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+ENABLED_KEY = 'profiling:enabled'
+
+# Server-Timing metrics in reporting order
+METRICS = ('db', 'serialize', 'render')
+
+
+@dataclass
+class Profile:
+    """Timings of the current request, in seconds."""
+    started: float = field(default_factory=time.perf_counter)
+    queries: int = 0
+    timings: dict = field(default_factory=dict)
+    active: set = field(default_factory=set)
+    render_started: float = None
+
+    def add(self, name, duration):
+        self.timings[name] = self.timings.get(name, 0) + duration
+
+    def server_timing(self, total):
+        metrics = [f'db;dur={self.timings.get("db", 0) * 1000:.1f};desc="{self.queries} queries"']
+        metrics.extend(
+            f'{name};dur={self.timings[name] * 1000:.1f}'
+            for name in METRICS[1:] if name in self.timings
+        )
+        metrics.append(f'total;dur={total * 1000:.1f}')
+        return ', '.join(metrics)
+
+
+_profile = contextvars.ContextVar('request_profile', default=None)
+
+slow_queries = deque(maxlen=settings.PROFILING_SLOW_QUERY_LOG_SIZE)
+
+_enabled = False
+_enabled_checked_at = float('-inf')
+
+
+def is_enabled():
+    """Return whether profiling is on, refreshing the runtime flag periodically."""
+    global _enabled, _enabled_checked_at
+    now = time.monotonic()
+    if now - _enabled_checked_at >= settings.PROFILING_REFRESH_SECONDS:
+        flag = cache.get(ENABLED_KEY)
+        _enabled = settings.PROFILING_ENABLED if flag is None else flag
+        _enabled_checked_at = now
+    return _enabled
+
+
+def set_enabled(enabled):
+    """Switch profiling on or off in every process."""
+    global _enabled_checked_at
+    cache.set(ENABLED_KEY, enabled, timeout=None)
+    _enabled_checked_at = float('-inf')
+
+
+def start():
+    """Start profiling the current request."""
+    for connection in connections.all(initialized_only=True):
+        install_query_recorder(connection)
+    profile = Profile()
+    _profile.set(profile)
+    return profile
+
+
+def stop():
+    """Stop profiling the current request and return its ``Server-Timing`` value."""
+    profile = _profile.get()
+    if profile is None:
+        return None
+    _profile.set(None)
+    now = time.perf_counter()
+    if profile.render_started is not None:
+        profile.add('render', now - profile.render_started)
+    return profile.server_timing(now - profile.started)
+
+
+def mark_render_started():
+    profile = _profile.get()
+    if profile is not None:
+        profile.render_started = time.perf_counter()
+
+
+@contextmanager
+def span(name):
+    """Add the time spent in the block to the ``name`` metric; nested spans count once."""
+    profile = _profile.get()
+    if profile is None or name in profile.active:
+        yield
+        return
+    profile.active.add(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add(name, time.perf_counter() - started)
+        profile.active.discard(name)
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper counting and timing the queries of profiled requests."""
+    profile = _profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - started
+        profile.queries += 1
+        profile.add('db', duration)
+        if duration * 1000 >= settings.PROFILING_SLOW_QUERY_MS:
+            capture_slow_query(sql, duration, context['connection'].alias)
+
+
+def capture_slow_query(sql, duration, alias):
+    call_site = get_call_site()
+    slow_queries.append({
+        'sql': sql,
+        'duration_ms': round(duration * 1000, 3),
+        'database': alias,
+        'call_site': call_site,
+    })
+    logger.warning(
+        'Slow query (%.1f ms on %s) from %s: %s',
+        duration * 1000, alias, call_site or 'unknown code', sql
+    )
+
+
+def get_call_site():
+    """Return the innermost project frame outside this module as ``path:line in function``."""
+    root = os.path.join(settings.BASE_DIR, 'backend')
+    for frame in reversed(traceback.extract_stack()):
+        if frame.filename.startswith(root) and frame.filename != __file__:
+            path = os.path.relpath(frame.filename, settings.BASE_DIR)
+            return f'{path}:{frame.lineno} in {frame.name}'
+    return None
+
+
+def install_query_recorder(connection):
+    if record_query not in connection.execute_wrappers:
+        # First in the list, so ``execute_wrapper()`` blocks still pop their own
+        connection.execute_wrappers.insert(0, record_query)
+
+
+@receiver(connection_created)
+def on_connection_created(sender, connection, **kwargs):
+    install_query_recorder(connection)
+
+
+class ProfiledListSerializer(serializers.ListSerializer):
+    """List serializer timing top-level serialization."""
+
+    @property
+    def data(self):
+        with span('serialize'):
+            return super().data
+
+
+class ProfiledSerializerMixin:
+    """
+    Time top-level serialization as the ``serialize`` metric.
+    Set ``Meta.list_serializer_class`` to ProfiledListSerializer for ``many=True``.
+    """
+
+    @property
+    def data(self):
+        with span('serialize'):
+            return super().data
@@ -0,0 +1,73 @@
+"""
+Fast response renderers built on optional dependencies.
+
+``FastJSONRenderer`` encodes with orjson when it is installed and otherwise
+is DRF's ``JSONRenderer``. Its output is byte for byte what ``JSONRenderer``
+produces with the default settings (compact, UTF-8, ``\\u2028``/``\\u2029``
+escaped): datetimes, decimals and everything else orjson does not encode
+itself go through DRF's ``JSONEncoder.default``. The one difference is the
+exponent of floats below 1e-4 (``1.5e-7`` instead of ``1.5e-07``); catalog
+prices and weights are strings. Pretty-printing and non-default JSON
+settings fall back to ``JSONRenderer``.
+
+``MessagePackRenderer`` serves ``application/msgpack`` (``?format=msgpack``
+or ``Accept``) when msgpack is installed, with the same values as the JSON
+representation.
+
+Install both with ``pip install .[renderers]``.
+"""
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Non-native values, datetimes included, are converted the way JSONRenderer
+# converts them
+_encode_default = JSONEncoder().default
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS if orjson else None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer encoding with orjson, when installed."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or not self.strict
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=_encode_default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # Integers beyond 64 bits and other corner cases
+            return super().render(data, accepted_media_type, renderer_context)
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Renderer serializing to MessagePack; requires msgpack."""
+
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_encode_default, datetime=False)
@@ -0,0 +1,91 @@
+"""
+Signal handlers retiring cached API responses, in the response cache and in
+the shared (CDN) cache, when catalog data changes.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from backend.api import cache, cdn
+from backend.app import category_stats
+from backend.app.catalog_import import catalog_imported
+from backend.app.images import renditions_generated
+from backend.app.models import Category, Product, ProductImage
+from backend.app.reservations import stock_changed
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Category._parler_meta.root_model)
+@receiver(post_delete, sender=Category._parler_meta.root_model)
+def invalidate_categories(sender, raw=False, **kwargs):
+    """Categories are embedded in product responses, so both namespaces go."""
+    if not raw:
+        cache.invalidate(cache.NAMESPACE_CATEGORIES, cache.NAMESPACE_PRODUCTS)
+        cdn.purge(cdn.KEY_CATEGORIES)
+
+
+def moves_counters(instance, previous):
+    """Whether a product save changes the category counters (see ``remember_product_state``)."""
+    if previous is None:
+        return True
+    return previous['category_id'] != instance.category_id or (
+        category_stats.product_contribution(previous['is_active'], previous['stock_quantity'])
+        != category_stats.product_contribution(instance.is_active, instance.stock_quantity)
+    )
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_products(sender, instance, raw=False, **kwargs):
+    """Product changes may also move the category counters every response embeds."""
+    if raw:
+        return
+    cache.invalidate(cache.NAMESPACE_PRODUCTS, cache.NAMESPACE_CATEGORIES)
+    # Deletions always move the counters
+    previous = None
+    if kwargs['signal'] is post_save:
+        previous = getattr(instance, '_previous_state', None)
+    category_ids = {instance.category_id, *([previous['category_id']] if previous else [])}
+    keys = cdn.product_change_keys(instance.pk, *category_ids)
+    if moves_counters(instance, previous):
+        keys.append(cdn.KEY_CATEGORIES)
+    cdn.purge(*keys)
+
+
+@receiver(post_save, sender=Product._parler_meta.root_model)
+@receiver(post_delete, sender=Product._parler_meta.root_model)
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+@receiver(renditions_generated, sender=ProductImage)
+def invalidate_product_details(sender, instance, raw=False, **kwargs):
+    """Translations and images only appear in product responses."""
+    if not raw:
+        cache.invalidate(cache.NAMESPACE_PRODUCTS)
+        product_id = instance.product_id if sender is ProductImage else instance.master_id
+        category_id = Product.objects.filter(pk=product_id).values_list(
+            'category_id', flat=True
+        ).first()
+        cdn.purge(*cdn.product_change_keys(product_id, category_id))
+
+
+@receiver(catalog_imported)
+def invalidate_imported(sender, **kwargs):
+    """Bulk imports and backfills bypass model signals and may touch any catalog response."""
+    cache.invalidate(cache.NAMESPACE_CATEGORIES, cache.NAMESPACE_PRODUCTS)
+    cdn.purge(cdn.KEY_CATEGORIES, cdn.KEY_PRODUCTS)
+
+
+@receiver(stock_changed)
+def invalidate_stock(sender, products, moves_counters, **kwargs):
+    """Stock shows in product responses; going in or out of stock also moves the counters."""
+    keys = [
+        key
+        for product_id, category_id in products
+        for key in cdn.product_change_keys(product_id, category_id)
+    ]
+    if moves_counters:
+        cache.invalidate(cache.NAMESPACE_PRODUCTS, cache.NAMESPACE_CATEGORIES)
+        keys.append(cdn.KEY_CATEGORIES)
+    else:
+        cache.invalidate(cache.NAMESPACE_PRODUCTS)
+    cdn.purge(*keys)
@@ -0,0 +1,28 @@
+import logging
+import urllib.request
+
+from django.conf import settings
+
+from backend.core.celery import app
+
+logger = logging.getLogger(__name__)
+
+
+@app.task(autoretry_for=(OSError,), retry_backoff=True, max_retries=5)
+def purge_surrogate_keys(keys):
+    """
+    Ask the shared cache to drop every response tagged with one of ``keys``.
+
+    Sends ``CDN_PURGE_METHOD CDN_PURGE_URL`` with the keys, space-separated,
+    in the ``CDN_SURROGATE_KEY_HEADER`` header (Varnish xkey and Fastly
+    conventions). Connection failures and error statuses are retried.
+    """
+    headers = {settings.CDN_SURROGATE_KEY_HEADER: ' '.join(keys)}
+    if settings.CDN_PURGE_TOKEN:
+        headers['Authorization'] = f'Bearer {settings.CDN_PURGE_TOKEN}'
+    request = urllib.request.Request(
+        settings.CDN_PURGE_URL, method=settings.CDN_PURGE_METHOD, headers=headers
+    )
+    with urllib.request.urlopen(request, timeout=settings.CDN_PURGE_TIMEOUT) as response:
+        logger.info('Purged surrogate keys %s (%s)', ' '.join(keys), response.status)
+        return response.status
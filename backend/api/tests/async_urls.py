@@ -0,0 +1,8 @@
+"""URLs with the async catalog views enabled, as with API_ASYNC_VIEWS=True."""
+from django.urls import include, path
+
+from backend.api.v1 import urls as v1_urls
+
+urlpatterns = [
+    path('api/v1/', include((v1_urls.async_urlpatterns + v1_urls.sync_urlpatterns, v1_urls.app_name))),
+]
@@ -0,0 +1,69 @@
+import pytest
+from django.urls import resolve
+
+from backend.api.v1.async_views import AsyncViewSetMixin
+
+pytestmark = pytest.mark.django_db
+
+ASYNC_URLCONF = 'backend.api.tests.async_urls'
+
+
+@pytest.fixture
+def catalog(make_category, make_product):
+    rings = make_category('rings')
+    gold = make_category('gold-rings', parent=rings)
+    products = [make_product(gold, f'R-{n}', price=100 + n, is_featured=n % 2) for n in range(3)]
+    products[0].set_current_language('de')
+    products[0].name = 'Ring'
+    products[0].description = 'Handgemacht'
+    products[0].save()
+    return products
+
+
+def fetch(client, settings, urlconf, path, language):
+    settings.ROOT_URLCONF = urlconf
+    response = client.get(path, headers={'Accept-Language': language})
+    return response.status_code, response.json()
+
+
+@pytest.mark.parametrize('language', ['en', 'de'])
+@pytest.mark.parametrize('path', [
+    '/api/v1/products/',
+    '/api/v1/products/?ordering=price&page_size=2&page=2',
+    '/api/v1/products/?category=rings&include_descendants=true',
+    '/api/v1/products/?pagination=cursor&page_size=1',
+    '/api/v1/products/?single_language=true',
+    '/api/v1/products/featured/?limit=1',
+    '/api/v1/products/by_category/?category_slug=gold-rings',
+    '/api/v1/products/by_category/',
+    '/api/v1/products/999999/',
+    '/api/v1/categories/tree/',
+])
+def test_async_views_respond_like_the_sync_views(client, settings, catalog, path, language):
+    expected = fetch(client, settings, settings.ROOT_URLCONF, path, language)
+
+    assert fetch(client, settings, ASYNC_URLCONF, path, language) == expected
+
+
+def test_detail_matches_the_sync_view(client, settings, catalog):
+    path = f'/api/v1/products/{catalog[0].pk}/'
+    expected = fetch(client, settings, settings.ROOT_URLCONF, path, 'de')
+
+    assert fetch(client, settings, ASYNC_URLCONF, path, 'de') == expected
+
+
+def test_reads_are_routed_to_the_async_views(settings):
+    settings.ROOT_URLCONF = ASYNC_URLCONF
+
+    assert issubclass(resolve('/api/v1/products/').func.cls, AsyncViewSetMixin)
+    assert issubclass(resolve('/api/v1/products/1/').func.cls, AsyncViewSetMixin)
+    assert not issubclass(resolve('/api/v1/products/facets/').func.cls, AsyncViewSetMixin)
+
+
+def test_async_views_cache_and_revalidate(client, settings, catalog):
+    settings.ROOT_URLCONF = ASYNC_URLCONF
+    first = client.get('/api/v1/products/')
+
+    assert first['X-Cache'] == 'MISS'
+    assert client.get('/api/v1/products/')['X-Cache'] == 'HIT'
+    assert client.get('/api/v1/products/', headers={'If-None-Match': first['ETag']}).status_code == 304
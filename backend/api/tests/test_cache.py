@@ -0,0 +1,100 @@
+import pytest
+
+from backend.api import cache
+
+pytestmark = pytest.mark.django_db
+
+# A page whose body holds an absolute next link
+KEYSET_PAGE = '/api/v1/products/?pagination=cursor&page_size=1'
+
+
+@pytest.fixture
+def catalog(make_category, make_product):
+    rings = make_category('rings')
+    return [make_product(rings, f'R-{n}', price=100 + n) for n in range(3)]
+
+
+def get(client, path, **kwargs):
+    response = client.get(path, **kwargs)
+    assert response.status_code == 200
+    return response
+
+
+def test_repeated_requests_are_served_from_the_cache(client, catalog):
+    assert get(client, '/api/v1/products/')['X-Cache'] == 'MISS'
+
+    hit = get(client, '/api/v1/products/')
+
+    assert hit['X-Cache'] == 'HIT'
+    assert [product['sku'] for product in hit.json()['results']] == ['R-2', 'R-1', 'R-0']
+
+
+def test_query_parameter_order_does_not_matter(client, catalog):
+    get(client, '/api/v1/products/?min_price=100&in_stock=true')
+
+    assert get(client, '/api/v1/products/?in_stock=true&min_price=100')['X-Cache'] == 'HIT'
+
+
+def test_languages_are_cached_separately(client, catalog):
+    get(client, '/api/v1/products/', headers={'Accept-Language': 'en'})
+
+    assert get(client, '/api/v1/products/', headers={'Accept-Language': 'de'})['X-Cache'] == 'MISS'
+
+
+def test_hosts_do_not_share_entries(client, catalog):
+    """A forged Host header must not leak its absolute URLs to other clients."""
+    get(client, KEYSET_PAGE, headers={'Host': 'evil.example'})
+
+    response = get(client, KEYSET_PAGE, headers={'Host': 'shop.example'})
+
+    assert response['X-Cache'] == 'MISS'
+    assert response.json()['next'].startswith('http://shop.example/')
+
+
+def test_schemes_do_not_share_entries(client, catalog):
+    get(client, KEYSET_PAGE)
+
+    response = get(client, KEYSET_PAGE, secure=True)
+
+    assert response['X-Cache'] == 'MISS'
+    assert response.json()['next'].startswith('https://')
+
+
+def test_product_changes_retire_cached_lists(client, catalog, django_capture_on_commit_callbacks):
+    get(client, '/api/v1/products/')
+
+    with django_capture_on_commit_callbacks(execute=True):
+        catalog[0].price = 1
+        catalog[0].save()
+
+    response = get(client, '/api/v1/products/')
+    assert response['X-Cache'] == 'MISS'
+    assert response.json()['results'][-1]['price'] == '1.00'
+
+
+def test_invalidate_bumps_only_the_given_namespaces(django_capture_on_commit_callbacks):
+    before = cache.get_namespace_versions(cache.NAMESPACES)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        cache.invalidate(cache.NAMESPACE_PRODUCTS)
+
+    categories, products = cache.get_namespace_versions(cache.NAMESPACES)
+    assert categories == before[0]
+    assert products != before[1]
+
+
+@pytest.mark.parametrize('rate, counted', [(1, 2), (0, 0)])
+def test_statistics_are_sampled(client, catalog, settings, rate, counted):
+    settings.API_CACHE_STATS_SAMPLE_RATE = rate
+    cache.reset_stats()
+
+    get(client, '/api/v1/products/')
+    get(client, '/api/v1/products/')
+
+    counts = cache.get_stats()['ProductViewSet.list']
+    assert counts['hit'] + counts['miss'] == counted
+
+
+def test_routed_endpoints_are_registered_at_startup():
+    """The statistics list every cached view, sync and async, without importing the views first."""
+    assert {'ProductViewSet.list', 'AsyncProductViewSet.alist', 'AsyncCategoryViewSet.atree'} <= set(cache.endpoints)
@@ -0,0 +1,50 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = pytest.mark.django_db
+
+
+def count_queries(client, path):
+    with CaptureQueriesContext(connection) as context:
+        assert client.get(path).status_code == 200
+    return len(context.captured_queries)
+
+
+def test_tree_nests_children_with_counters(client, make_category, make_product):
+    rings = make_category('rings')
+    gold = make_category('gold-rings', parent=rings)
+    make_category('hidden-rings', parent=rings, is_active=False)
+    make_product(gold, 'R-1')
+
+    data = client.get('/api/v1/categories/tree/').json()
+
+    roots = {node['slug']: node for node in data}
+    assert roots['rings']['full_path'] == 'Rings'
+    assert [child['slug'] for child in roots['rings']['children']] == ['gold-rings']
+    child = roots['rings']['children'][0]
+    assert child['products_count'] == 1
+    assert child['descendant_products_count'] == 1
+
+
+def test_tree_queries_do_not_grow_with_the_tree(client, make_category, settings):
+    settings.API_CACHE_ENABLED = False
+    root = make_category('root')
+    parent = make_category('level-1', parent=root)
+    small = count_queries(client, '/api/v1/categories/tree/')
+
+    for level in range(2, 10):
+        parent = make_category(f'level-{level}', parent=parent)
+
+    assert count_queries(client, '/api/v1/categories/tree/') == small
+    assert len(client.get('/api/v1/categories/tree/').json()) == 10
+
+
+def test_detail_lists_active_children(client, make_category):
+    rings = make_category('rings')
+    make_category('gold-rings', parent=rings)
+    make_category('hidden-rings', parent=rings, is_active=False)
+
+    data = client.get('/api/v1/categories/rings/').json()
+
+    assert [child['slug'] for child in data['children']] == ['gold-rings']
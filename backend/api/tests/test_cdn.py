@@ -0,0 +1,135 @@
+import pytest
+
+from backend.api import tasks
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def purged(settings, monkeypatch):
+    """Surrogate keys purged per committed transaction."""
+    settings.CDN_PURGE_URL = 'http://cdn.test/purge'
+    purges = []
+    monkeypatch.setattr(tasks.purge_surrogate_keys, 'delay', purges.append)
+    return purges
+
+
+@pytest.fixture
+def catalog(make_category, make_product):
+    rings = make_category('rings')
+    gold = make_category('gold-rings', parent=rings)
+    return make_product(gold, 'R-1'), make_product(make_category('necklaces'), 'N-1')
+
+
+def surrogate_keys(response):
+    assert response.status_code in (200, 304)
+    return response['Surrogate-Key'].split()
+
+
+@pytest.fixture
+def save(django_capture_on_commit_callbacks):
+    """Change and save an object in a committed transaction."""
+    def save(obj, **changes):
+        for field, value in changes.items():
+            setattr(obj, field, value)
+        with django_capture_on_commit_callbacks(execute=True):
+            obj.save()
+    return save
+
+
+@pytest.mark.parametrize('path, keys', [
+    ('/api/v1/products/', ['categories', 'products']),
+    ('/api/v1/products/?category=rings&include_descendants=true', ['categories', 'category-rings']),
+    ('/api/v1/products/by_category/?category_slug=gold-rings', ['categories', 'category-gold-rings']),
+    ('/api/v1/categories/rings/', ['categories', 'category-rings']),
+    ('/api/v1/categories/tree/', ['categories']),
+])
+def test_responses_are_tagged_with_their_data(client, catalog, path, keys):
+    assert surrogate_keys(client.get(path)) == keys
+
+
+def test_details_and_revalidations_are_tagged(client, catalog):
+    path = f'/api/v1/products/{catalog[0].pk}/'
+    response = client.get(path)
+
+    assert surrogate_keys(response) == ['categories', f'product-{catalog[0].pk}']
+    assert 's-maxage' in response['Cache-Control']
+    revalidated = client.get(path, headers={'If-None-Match': response['ETag']})
+    assert surrogate_keys(revalidated) == surrogate_keys(response)
+
+
+def test_product_edits_purge_the_product_and_its_categories(catalog, purged, save):
+    ring = catalog[0]
+    save(ring, price=250)
+
+    assert purged == [
+        sorted(['products', f'product-{ring.pk}', 'category-rings', 'category-gold-rings'])
+    ]
+
+
+def test_counter_changes_purge_every_category_response(catalog, purged, save):
+    save(catalog[0], stock_quantity=0)
+
+    assert 'categories' in purged[0]
+
+
+def test_moved_products_purge_both_categories(catalog, purged, save):
+    ring, necklace = catalog
+    save(ring, category=necklace.category)
+
+    assert {'category-rings', 'category-gold-rings', 'category-necklaces', 'categories'} <= set(purged[0])
+
+
+def test_translations_purge_the_product_only(catalog, purged, save):
+    ring = catalog[0]
+    ring.set_current_language('de')
+    save(ring, name='Goldring')
+
+    assert purged
+    assert all('categories' not in keys and 'category-necklaces' not in keys for keys in purged)
+    assert f'product-{ring.pk}' in purged[-1]
+
+
+def test_category_changes_purge_every_category_response(catalog, purged, save):
+    save(catalog[1].category, order=5)
+
+    assert ['categories'] in purged
+
+
+@pytest.fixture
+def catalog_stack(settings):
+    """Serve requests through the lean middleware stack of the catalog paths."""
+    settings.MIDDLEWARE = settings.CATALOG_MIDDLEWARE
+
+
+def language_vary(response):
+    return [header for header in response['Vary'].split(', ') if 'Lang' in header]
+
+
+def test_responses_vary_on_accept_language_by_default(client, catalog_stack, catalog):
+    response = client.get('/api/v1/products/', headers={'Accept-Language': 'de-AT'})
+
+    assert response['Content-Language'] == 'de'
+    assert language_vary(response) == ['Accept-Language']
+
+
+def test_responses_vary_on_the_negotiated_format(client, catalog_stack, catalog):
+    path = f'/api/v1/products/{catalog[0].pk}/'
+    client.get(path)
+
+    hit = client.get(path)
+
+    assert hit['X-Cache'] == 'HIT'
+    assert 'Accept' in hit['Vary'].split(', ')
+    assert language_vary(hit) == ['Accept-Language']
+
+def test_responses_vary_on_the_language_normalized_by_the_cdn(client, catalog_stack, catalog, settings):
+    settings.CDN_LANGUAGE_HEADER = 'X-Language'
+    headers = {'Accept-Language': 'en', 'X-Language': 'de'}
+
+    response = client.get('/api/v1/products/', headers=headers)
+
+    assert response['Content-Language'] == 'de'
+    assert language_vary(response) == ['X-Language']
+    direct = client.get('/api/v1/products/', headers={'Accept-Language': 'de'})
+    assert language_vary(direct) == ['Accept-Language']
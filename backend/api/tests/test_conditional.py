@@ -0,0 +1,84 @@
+import pytest
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def catalog(make_category, make_product):
+    rings = make_category('rings')
+    return [make_product(rings, f'R-{n}') for n in range(2)]
+
+
+def revalidate(client, path, etag, language='en'):
+    return client.get(path, headers={'If-None-Match': etag, 'Accept-Language': language})
+
+
+@pytest.mark.parametrize('path', [
+    '/api/v1/products/',
+    '/api/v1/products/?pagination=cursor&page_size=1',
+    '/api/v1/products/featured/',
+    '/api/v1/products/by_category/?category_slug=rings',
+    '/api/v1/categories/tree/',
+])
+def test_matching_etag_is_answered_without_queries(client, catalog, path, django_assert_num_queries):
+    etag = client.get(path)['ETag']
+
+    with django_assert_num_queries(0):
+        response = revalidate(client, path, etag)
+
+    assert response.status_code == 304
+    assert response['ETag'] == etag
+
+
+def test_detail_etags_depend_on_the_lookup(client, catalog):
+    first = client.get(f'/api/v1/products/{catalog[0].pk}/')['ETag']
+
+    assert client.get(f'/api/v1/products/{catalog[1].pk}/')['ETag'] != first
+    assert revalidate(client, f'/api/v1/products/{catalog[1].pk}/', first).status_code == 200
+
+
+def test_etags_change_with_language_and_query(client, catalog):
+    etag = client.get('/api/v1/products/')['ETag']
+
+    assert revalidate(client, '/api/v1/products/', etag, language='de').status_code == 200
+    assert revalidate(client, '/api/v1/products/?in_stock=true', etag).status_code == 200
+
+
+def test_committed_changes_retire_etags(client, catalog, django_capture_on_commit_callbacks):
+    list_etag = client.get('/api/v1/products/')['ETag']
+    tree_etag = client.get('/api/v1/categories/tree/')['ETag']
+
+    with django_capture_on_commit_callbacks(execute=True):
+        catalog[0].is_active = False
+        catalog[0].save()
+
+    response = revalidate(client, '/api/v1/products/', list_etag)
+    assert response.status_code == 200
+    assert len(response.json()['results']) == 1
+    assert revalidate(client, '/api/v1/categories/tree/', tree_etag).status_code == 200
+
+
+def test_missing_products_get_no_etag(client, catalog):
+    response = client.get('/api/v1/products/999999/')
+
+    assert response.status_code == 404
+    assert 'ETag' not in response
+
+
+def test_if_modified_since_is_answered_from_the_version_tokens(
+    client, catalog, django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    last_modified = client.get('/api/v1/products/')['Last-Modified']
+
+    with django_assert_num_queries(0):
+        response = client.get('/api/v1/products/', headers={'If-Modified-Since': last_modified})
+
+    assert response.status_code == 304
+    assert response['Last-Modified'] == last_modified
+
+    with django_capture_on_commit_callbacks(execute=True):
+        catalog[0].price = 1
+        catalog[0].save()
+    stale = client.get('/api/v1/products/', headers={'If-Modified-Since': 'Thu, 01 Jan 2015 00:00:00 GMT'})
+    assert stale.status_code == 200
+    assert 'Last-Modified' in stale
@@ -0,0 +1,72 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def catalog(make_category, make_product):
+    rings = make_category('rings')
+    gold = make_category('gold-rings', parent=rings)
+    wedding = make_category('wedding-rings', parent=gold)
+    necklaces = make_category('necklaces')
+    make_product(rings, 'R-1')
+    make_product(gold, 'G-1')
+    make_product(wedding, 'W-1')
+    make_product(necklaces, 'N-1')
+    return {'rings': rings, 'gold': gold, 'wedding': wedding}
+
+
+def skus(client, path, **params):
+    response = client.get(path, params)
+    assert response.status_code == 200
+    data = response.json()
+    products = data['results'] if isinstance(data, dict) else data
+    return sorted(product['sku'] for product in products)
+
+
+@pytest.mark.parametrize('path, param', [
+    ('/api/v1/products/', 'category'),
+    ('/api/v1/products/by_category/', 'category_slug'),
+])
+def test_subtrees_include_every_level(client, catalog, path, param):
+    assert skus(client, path, **{param: 'rings'}) == ['R-1']
+    assert skus(client, path, **{param: 'rings', 'include_descendants': 'true'}) == ['G-1', 'R-1', 'W-1']
+    assert skus(client, path, **{param: 'gold-rings', 'include_descendants': 'true'}) == ['G-1', 'W-1']
+    assert skus(client, path, **{param: 'missing', 'include_descendants': 'true'}) == []
+
+
+def test_single_language_projection_filters_subtrees(client, catalog):
+    assert skus(
+        client, '/api/v1/products/by_category/',
+        category_slug='rings', include_descendants='true', single_language='true'
+    ) == ['G-1', 'R-1', 'W-1']
+
+
+def test_moved_categories_move_their_products(client, catalog, django_capture_on_commit_callbacks):
+    skus(client, '/api/v1/products/', category='rings', include_descendants='true')
+
+    with django_capture_on_commit_callbacks(execute=True):
+        catalog['gold'].parent = None
+        catalog['gold'].save()
+
+    assert skus(client, '/api/v1/products/', category='rings', include_descendants='true') == ['R-1']
+
+
+def test_subtree_queries_do_not_grow_with_depth(client, catalog, make_category, make_product):
+    def count_queries(slug):
+        path = '/api/v1/products/by_category/'
+        params = {'category_slug': slug, 'include_descendants': 'true', 'single_language': 'true'}
+        skus(client, path, **params, warm=slug)  # Builds the category tree snapshot
+        with CaptureQueriesContext(connection) as queries:
+            skus(client, path, **params)
+        return len(queries)
+
+    shallow = count_queries('wedding-rings')
+    parent = catalog['wedding']
+    for depth in range(8):
+        parent = make_category(f'level-{depth}', parent=parent)
+        make_product(parent, f'L-{depth}')
+
+    assert count_queries('rings') == shallow
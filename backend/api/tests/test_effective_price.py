@@ -0,0 +1,55 @@
+import pytest
+from django.db import connection
+
+from backend.app.models import Product
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def catalog(make_category, make_product):
+    rings = make_category('rings')
+    return {
+        'full': make_product(rings, 'R-1', price=200),
+        'discounted': make_product(rings, 'R-2', price=300, discount_price=150),
+        'zero': make_product(rings, 'R-3', price=250, discount_price=0),
+    }
+
+
+def skus(client, **params):
+    response = client.get('/api/v1/products/', params)
+    assert response.status_code == 200
+    return [product['sku'] for product in response.json()['results']]
+
+
+def effective_price(product):
+    return Product.objects.values_list('effective_price', flat=True).get(pk=product.pk)
+
+
+def test_database_keeps_the_effective_price(catalog):
+    assert effective_price(catalog['full']) == 200
+    assert effective_price(catalog['discounted']) == 150
+    # A zero discount means no discount
+    assert effective_price(catalog['zero']) == 250
+
+    Product.objects.filter(pk=catalog['full'].pk).update(discount_price=120)
+    assert effective_price(catalog['full']) == 120
+
+
+def test_price_filters_apply_discounts(client, catalog):
+    assert skus(client, max_price=180) == ['R-2']
+    assert sorted(skus(client, min_price=180)) == ['R-1', 'R-3']
+    assert skus(client, min_price=150, max_price=150) == ['R-2']
+
+
+def test_ordering_by_effective_price(client, catalog):
+    assert skus(client, ordering='effective_price') == ['R-2', 'R-1', 'R-3']
+    assert skus(client, ordering='-effective_price', pagination='cursor') == ['R-3', 'R-1', 'R-2']
+
+
+def test_active_price_range_uses_the_index(catalog):
+    queryset = Product.objects.filter(is_active=True, effective_price__gte=100, effective_price__lte=200)
+    with connection.cursor() as cursor:
+        cursor.execute('SET LOCAL enable_seqscan = off')
+
+    assert 'product_effective_price' in queryset.order_by('effective_price', 'id').explain()
@@ -0,0 +1,149 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncClient
+from django.utils import timezone
+
+from backend.api.v1.export import CUTOFF_HEADER, FIELDS, export_cutoff
+from backend.app.models import DeletedProduct
+from backend.app.tasks import prune_deleted_products
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def catalog(make_category, make_product):
+    rings = make_category('rings')
+    return [make_product(rings, f'R-{n}', price=100 + n) for n in range(3)]
+
+
+@pytest.fixture
+def changes(catalog):
+    """Deactivate one product and delete another after a ``since`` point."""
+    since = timezone.now()
+    catalog[0].is_active = False
+    catalog[0].save()
+    catalog[1].delete()
+    return since
+
+
+def export(client, **params):
+    response = client.get('/api/v1/products/export/', params)
+    assert response.status_code == 200
+    return response, b''.join(response.streaming_content).decode()
+
+
+def jsonl(body):
+    return [json.loads(line) for line in body.splitlines()]
+
+
+def test_full_export_lists_the_active_products(client, catalog, changes):
+    response, body = export(client)
+
+    records = jsonl(body)
+    assert [record['sku'] for record in records] == ['R-2']
+    assert records[0]['is_deleted'] is False
+    assert response['Content-Type'] == 'application/x-ndjson'
+
+
+def test_incremental_export_reports_deactivations_and_deletions(client, catalog, changes):
+    _, body = export(client, since=changes.isoformat())
+
+    records = {record['sku']: record for record in jsonl(body)}
+    assert records.keys() == {'R-0', 'R-1'}
+    assert records['R-0']['is_active'] is False
+    assert records['R-0']['is_deleted'] is False
+    deleted = records['R-1']
+    assert (deleted['is_active'], deleted['is_deleted'], deleted['name']) == (False, True, None)
+
+
+def test_tombstones_are_pruned_after_the_retention_window(client, catalog, changes, settings):
+    settings.EXPORT_TOMBSTONE_RETENTION = 30
+    DeletedProduct.objects.create(product_id=999, sku='R-OLD')
+    DeletedProduct.objects.filter(sku='R-OLD').update(deleted_at=timezone.now() - timedelta(days=31))
+
+    assert prune_deleted_products() == 1
+
+    assert list(DeletedProduct.objects.values_list('sku', flat=True)) == ['R-1']
+    _, body = export(client, since=changes.isoformat())
+    assert 'R-1' in {record['sku'] for record in jsonl(body)}
+
+
+def test_csv_export_has_the_deletion_column(client, catalog, changes):
+    _, body = export(client, output='csv', since=changes.isoformat())
+
+    reader = csv.DictReader(io.StringIO(body))
+    assert tuple(reader.fieldnames) == FIELDS
+    assert {row['sku']: row['is_deleted'] for row in reader} == {'R-0': 'False', 'R-1': 'True'}
+
+
+def test_merchant_feed_marks_removed_products_out_of_stock(client, catalog, changes):
+    _, body = export(client, output='xml', since=changes.isoformat())
+
+    assert '<item><g:id>R-0</g:id><g:availability>out_of_stock</g:availability></item>' in body
+    assert '<item><g:id>R-1</g:id><g:availability>out_of_stock</g:availability></item>' in body
+
+
+def test_cutoff_waits_for_open_transactions(settings):
+    settings.EXPORT_CUTOFF_LAG = 0
+    other = connection.copy()
+    try:
+        other.set_autocommit(False)
+        with other.cursor() as cursor:
+            cursor.execute('SELECT transaction_timestamp()')
+            (started,) = cursor.fetchone()
+
+        assert export_cutoff() <= started
+    finally:
+        other.rollback()
+        other.close()
+
+
+def test_cutoff_allows_for_clock_skew(settings):
+    settings.EXPORT_CUTOFF_LAG = 60
+
+    assert export_cutoff() <= timezone.now() - timedelta(seconds=60)
+
+
+def test_cutoff_is_returned_as_a_header(client, catalog):
+    response, _ = export(client)
+
+    assert datetime.fromisoformat(response[CUTOFF_HEADER]) <= timezone.now()
+
+
+def test_asgi_requests_stream_chunk_by_chunk(catalog, settings):
+    settings.EXPORT_CHUNK_SIZE = 1
+
+    async def fetch():
+        response = await AsyncClient().get('/api/v1/products/export/')
+        return response, [chunk async for chunk in response.streaming_content]
+
+    response, chunks = async_to_sync(fetch)()
+
+    assert response.is_async
+    assert len(chunks) == 3
+    assert [json.loads(chunk)['sku'] for chunk in chunks] == ['R-0', 'R-1', 'R-2']
+
+
+def test_wsgi_requests_stream_synchronously(client, catalog, settings):
+    settings.EXPORT_CHUNK_SIZE = 1
+
+    response = client.get('/api/v1/products/export/')
+
+    assert not response.is_async
+    assert len(list(response.streaming_content)) == 3
+
+
+def test_command_exports_deletions_since(catalog, changes, tmp_path):
+    output = tmp_path / 'products.jsonl'
+
+    call_command('export_products', since=changes.isoformat(), output=str(output))
+
+    records = jsonl(output.read_text())
+    assert [(record['sku'], record['is_deleted']) for record in records] == [('R-0', False), ('R-1', True)]
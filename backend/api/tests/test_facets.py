@@ -0,0 +1,82 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from backend.api.v1.facets import price_ranges
+
+pytestmark = pytest.mark.django_db
+
+FACETS = '/api/v1/products/facets/'
+
+
+@pytest.fixture(autouse=True)
+def price_bounds(settings):
+    settings.FACET_PRICE_BOUNDS = ['100', '500']
+
+
+@pytest.fixture
+def catalog(make_category, make_product):
+    rings = make_category('rings')
+    gold = make_category('gold-rings', parent=rings)
+    necklaces = make_category('necklaces')
+    make_product(gold, 'R-1', price=80, material='Gold')
+    make_product(gold, 'R-2', price=300, discount_price=90, material='Gold', stock_quantity=0)
+    make_product(rings, 'R-3', price=600, material='Silver')
+    make_product(necklaces, 'N-1', price=200, material='Silver')
+    make_product(necklaces, 'N-2', price=250)
+    make_product(necklaces, 'N-3', price=150, material='Gold', is_active=False)
+
+
+def facets(client, **params):
+    response = client.get(FACETS, params)
+    assert response.status_code == 200
+    return response
+
+
+def test_price_ranges_are_open_ended(settings):
+    assert price_ranges() == [(None, 100), (100, 500), (500, None)]
+
+
+def test_facets_count_the_active_catalog(client, catalog):
+    data = facets(client).json()
+
+    assert data['total'] == 5
+    assert data['materials'] == [{'value': 'Gold', 'count': 2}, {'value': 'Silver', 'count': 2}]
+    assert [(bucket['min'], bucket['max'], bucket['count']) for bucket in data['price_ranges']] == [
+        (None, '100.00', 2), ('100.00', '500.00', 2), ('500.00', None, 1),
+    ]
+    assert data['stock'] == {'in_stock': 4, 'out_of_stock': 1}
+
+
+def test_category_counts_include_descendants(client, catalog):
+    categories = {category['slug']: category for category in facets(client).json()['categories']}
+
+    assert {slug: category['count'] for slug, category in categories.items()} == {
+        'rings': 3, 'gold-rings': 2, 'necklaces': 2,
+    }
+    assert categories['gold-rings']['parent'] == categories['rings']['id']
+    assert categories['rings']['name'] == 'Rings'
+
+
+def test_facets_follow_the_list_filters(client, catalog):
+    data = facets(client, category='rings', include_descendants='true', in_stock='true').json()
+
+    assert data['total'] == 2
+    assert data['stock'] == {'in_stock': 2, 'out_of_stock': 0}
+    assert data['materials'] == [{'value': 'Gold', 'count': 1}, {'value': 'Silver', 'count': 1}]
+
+
+def test_facets_take_two_queries(client, catalog):
+    facets(client, min_price=50)  # Warms the category tree
+
+    with CaptureQueriesContext(connection) as queries:
+        facets(client, min_price=60)
+
+    assert len(queries) == 2
+
+
+def test_facets_are_cached_per_filter_signature(client, catalog):
+    assert facets(client, in_stock='true')['X-Cache'] == 'MISS'
+
+    assert facets(client, in_stock='true', page=3, ordering='price')['X-Cache'] == 'HIT'
+    assert facets(client, in_stock='false')['X-Cache'] == 'MISS'
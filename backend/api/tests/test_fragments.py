@@ -0,0 +1,100 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import translation
+
+from backend.api.v1.serializers import ProductListSerializer
+from backend.app import reservations
+from backend.app.models import Product
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def catalog(make_category, make_product):
+    rings = make_category('rings')
+    return [make_product(rings, f'R-{n}', price=100 + n) for n in range(3)]
+
+
+def render(language='en'):
+    """Serialize the catalog like a list page; returns the data and the query count."""
+    queryset = Product.objects.select_related('category__stats', 'primary_image').order_by('sku')
+    with translation.override(language), CaptureQueriesContext(connection) as queries:
+        data = ProductListSerializer(queryset, many=True).data
+    return data, len(queries)
+
+
+def names(data, language='en'):
+    return [product['translations'][language]['name'] for product in data]
+
+
+def test_cached_fragments_skip_serialization_prefetches(catalog):
+    data, cold = render()
+
+    cached, warm = render()
+
+    assert cached == data
+    assert warm == 1
+    assert cold > warm
+
+
+def test_disabled_cache_renders_the_same(catalog, settings):
+    data, _ = render()
+    settings.API_FRAGMENT_CACHE_ENABLED = False
+
+    assert render()[0] == data
+
+
+def test_languages_get_their_own_fragments(catalog):
+    render('en')
+
+    assert render('de')[1] > 1
+
+
+def test_translation_changes_retire_the_fragment(catalog, django_capture_on_commit_callbacks):
+    render()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        catalog[1].name = 'Renamed'
+        catalog[1].save()
+
+    assert names(render()[0]) == ['Product R-0', 'Renamed', 'Product R-2']
+
+
+def test_category_changes_retire_the_fragments(catalog, django_capture_on_commit_callbacks):
+    render()
+    category = catalog[0].category
+
+    with django_capture_on_commit_callbacks(execute=True):
+        category.name = 'Wedding rings'
+        category.save()
+
+    data, _ = render()
+    assert {product['category']['translations']['en']['name'] for product in data} == {'Wedding rings'}
+
+
+def test_stock_changes_retire_the_fragment(catalog):
+    render()
+
+    reservations.reserve(catalog[2].pk, 5)
+
+    data, _ = render()
+    assert [(product['stock_quantity'], product['is_in_stock']) for product in data] == [
+        (5, True), (5, True), (0, False),
+    ]
+
+
+def test_async_loading_shares_the_fragments(catalog):
+    data, _ = render()
+    queryset = Product.objects.select_related('category__stats', 'primary_image').order_by('sku')
+
+    async def serialize():
+        serializer = ProductListSerializer([product async for product in queryset], many=True)
+        await serializer.aload()
+        representation = serializer.data
+        await serializer.astore()
+        return representation
+
+    with translation.override('en'):
+        assert async_to_sync(serialize)() == data
@@ -0,0 +1,85 @@
+import base64
+import json
+
+import pytest
+
+pytestmark = pytest.mark.django_db
+
+KEYSET = '/api/v1/products/?pagination=cursor&page_size=2'
+DEFAULT_ORDERING = ['-created_at', '-pk']
+
+
+@pytest.fixture
+def catalog(make_category, make_product):
+    rings = make_category('rings')
+    return [make_product(rings, f'R-{n}', price=100 + n % 2) for n in range(5)]
+
+
+def get_page(client, url):
+    response = client.get(url)
+    assert response.status_code == 200
+    data = response.json()
+    return [product['sku'] for product in data['results']], data
+
+
+def encode(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+
+def test_pages_follow_the_ordering_both_ways(client, catalog):
+    first, data = get_page(client, KEYSET)
+    second, data = get_page(client, data['next'])
+    third, data = get_page(client, data['next'])
+
+    assert first + second + third == ['R-4', 'R-3', 'R-2', 'R-1', 'R-0']
+    assert data['next'] is None
+    assert get_page(client, data['previous'])[0] == second
+
+
+def test_ties_are_broken_by_the_primary_key(client, catalog):
+    skus, data = get_page(client, f'{KEYSET}&ordering=price')
+    while data['next']:
+        page, data = get_page(client, data['next'])
+        skus += page
+
+    assert skus == ['R-0', 'R-2', 'R-4', 'R-1', 'R-3']
+
+
+def test_annotated_orderings_are_paginated(client, catalog):
+    skus, data = get_page(client, f'{KEYSET}&ordering=-effective_price')
+
+    assert skus == ['R-3', 'R-1']
+    assert get_page(client, data['next'])[0] == ['R-4', 'R-2']
+
+
+def test_count_estimate_is_opt_in(client, catalog):
+    assert 'count_estimate' not in get_page(client, KEYSET)[1]
+    assert 'count' not in get_page(client, KEYSET)[1]
+
+    assert isinstance(get_page(client, f'{KEYSET}&count=estimate')[1]['count_estimate'], int)
+
+
+def test_cursors_for_another_ordering_are_not_found(client, catalog):
+    cursor = encode({'o': ['price', 'pk'], 'p': ['100', 1]})
+
+    assert client.get(f'{KEYSET}&cursor={cursor}').status_code == 404
+    assert client.get(f'{KEYSET}&cursor=not-base64!').status_code == 404
+
+
+@pytest.mark.parametrize('position', [
+    ['abc', 1],
+    ['2020-01-01T00:00:00+00:00', 'abc'],
+    ['2020-01-01T00:00:00+00:00', [1]],
+    [None, 1],
+    ['2020-01-01T00:00:00+00:00'],
+])
+def test_tampered_positions_are_not_found(client, catalog, position):
+    cursor = encode({'o': DEFAULT_ORDERING, 'p': position})
+
+    assert client.get(f'{KEYSET}&cursor={cursor}').status_code == 404
+
+
+def test_well_formed_positions_are_accepted(client, catalog):
+    cursor = encode({'o': DEFAULT_ORDERING, 'p': ['2020-01-01T00:00:00+00:00', 1]})
+
+    assert get_page(client, f'{KEYSET}&cursor={cursor}')[0] == []
@@ -0,0 +1,57 @@
+import pytest
+
+from backend.api import profiling
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch, settings):
+    settings.API_CACHE_ENABLED = False
+    monkeypatch.setattr(profiling, '_enabled_checked_at', float('-inf'))
+    profiling.slow_queries.clear()
+
+
+@pytest.fixture
+def catalog(make_category, make_product):
+    return make_product(make_category('rings'), 'R-1')
+
+
+def metrics(response):
+    return {metric.split(';')[0]: metric for metric in response['Server-Timing'].split(', ')}
+
+
+def test_requests_are_not_profiled_by_default(client, catalog):
+    assert 'Server-Timing' not in client.get('/api/v1/products/')
+
+
+def test_profiled_requests_report_server_timing(client, catalog, settings):
+    settings.PROFILING_ENABLED = True
+
+    reported = metrics(client.get('/api/v1/products/'))
+
+    assert set(reported) == {'db', 'serialize', 'render', 'total'}
+    assert 'queries"' in reported['db'] and 'desc="0 queries"' not in reported['db']
+
+
+def test_slow_queries_are_kept_with_their_call_site(client, catalog, settings):
+    settings.PROFILING_ENABLED = True
+    settings.PROFILING_SLOW_QUERY_MS = 0
+
+    client.get('/api/v1/products/')
+
+    assert profiling.slow_queries
+    assert all(query['database'] == 'default' for query in profiling.slow_queries)
+    assert any(query['call_site'].startswith('backend/') for query in profiling.slow_queries)
+
+
+def switch(client, enabled):
+    return client.post('/api/v1/profiling/', {'enabled': enabled}, content_type='application/json')
+
+
+def test_staff_switch_profiling_at_runtime(client, admin_client, catalog):
+    assert switch(client, True).status_code == 403
+    assert switch(admin_client, 'yes').status_code == 400
+
+    assert switch(admin_client, True).json()['enabled'] is True
+    assert 'Server-Timing' in client.get('/api/v1/products/')
@@ -0,0 +1,67 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from backend.app import tasks
+from backend.app.models import ProductImage
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def uncached(settings, monkeypatch):
+    settings.API_CACHE_ENABLED = False
+    monkeypatch.setattr(tasks.generate_product_image_renditions, 'delay', lambda pk: None)
+
+
+@pytest.fixture
+def catalog(make_category, make_product, django_capture_on_commit_callbacks):
+    rings = make_category('rings')
+    gold = make_category('gold-rings', parent=rings, order=1)
+    translated = make_product(gold, 'R-1', discount_price=90)
+    translated.set_current_language('de')
+    translated.name = 'Goldring'
+    translated.description = 'Handgemacht'
+    translated.save()
+    with django_capture_on_commit_callbacks(execute=True):
+        ProductImage.objects.create(product=translated, image='products/r-1.jpg', alt_text='Ring')
+    make_product(rings, 'R-2', stock_quantity=0)
+    return translated
+
+
+def in_language(data, language):
+    """Keep only the translation a single-language response would serve."""
+    if isinstance(data, list):
+        return [in_language(item, language) for item in data]
+    if not isinstance(data, dict):
+        return data
+    data = {key: in_language(value, language) for key, value in data.items()}
+    translations = data.get('translations')
+    if translations:
+        served = language if language in translations else next(iter(translations))
+        data['translations'] = {served: translations[served]}
+    return data
+
+
+@pytest.mark.parametrize('path', ['/api/v1/products/', '/api/v1/categories/'])
+@pytest.mark.parametrize('language', ['en', 'de'])
+def test_projection_matches_the_serializers(client, catalog, path, language):
+    headers = {'Accept-Language': language}
+    full = client.get(path, headers=headers).json()
+
+    projected = client.get(path, {'single_language': 'true'}, headers=headers).json()
+
+    assert projected == in_language(full, language)
+
+
+def test_projection_queries_do_not_grow_with_the_page(client, catalog, make_product):
+    def count_queries():
+        with CaptureQueriesContext(connection) as context:
+            client.get('/api/v1/products/', {'single_language': 'true'})
+        return len(context.captured_queries)
+
+    small = count_queries()
+    for n in range(5):
+        make_product(catalog.category, f'R-{n + 10}')
+
+    assert count_queries() == small
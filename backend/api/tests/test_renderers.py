@@ -0,0 +1,73 @@
+import datetime
+import decimal
+import json
+import uuid
+
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from backend.api.renderers import FastJSONRenderer, MessagePackRenderer, msgpack
+
+pytestmark = pytest.mark.django_db
+
+requires_msgpack = pytest.mark.skipif(msgpack is None, reason='msgpack is not installed')
+
+EDGE_CASES = {
+    'decimal': decimal.Decimal('1234.50'),
+    'datetime': datetime.datetime(2026, 10, 18, 12, 30, 5, 123456, tzinfo=datetime.timezone.utc),
+    'naive': datetime.datetime(2026, 10, 18, 12, 30),
+    'date': datetime.date(2026, 10, 18),
+    'uuid': uuid.UUID(int=1),
+    'separators': 'line\u2028paragraph\u2029',
+    'unicode': 'Goldene Ringe – 18 kt',
+    'big': 2 ** 70,
+    'keys': {1: 'one'},
+    'nested': [None, True, 1.5, ('tuple',)],
+}
+
+
+@pytest.fixture
+def catalog(make_category, make_product):
+    rings = make_category('rings')
+    return [make_product(rings, f'R-{n}', price=100 + n, discount_price=90, weight='3.25') for n in range(3)]
+
+
+def test_fast_json_matches_json_renderer():
+    assert FastJSONRenderer().render(EDGE_CASES) == JSONRenderer().render(EDGE_CASES)
+
+
+def test_pretty_printing_falls_back(client, catalog):
+    response = client.get('/api/v1/products/', headers={'Accept': 'application/json; indent=2'})
+
+    assert response.content.startswith(b'{\n  "count"')
+
+
+def test_product_pages_are_byte_identical(client, catalog, settings):
+    fast = client.get('/api/v1/products/?page_size=3').content
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK, 'DEFAULT_RENDERER_CLASSES': ['rest_framework.renderers.JSONRenderer'],
+    }
+
+    # A different query, so the response cache does not answer
+    assert client.get('/api/v1/products/?page_size=3&format=json').content == fast
+
+
+@requires_msgpack
+@pytest.mark.parametrize('request_kwargs', [
+    {'headers': {'Accept': 'application/msgpack'}},
+    {'data': {'format': 'msgpack'}},
+])
+def test_msgpack_is_negotiated(client, catalog, request_kwargs):
+    expected = client.get('/api/v1/products/').json()
+
+    response = client.get('/api/v1/products/', **request_kwargs)
+
+    assert response['Content-Type'] == 'application/msgpack'
+    assert msgpack.unpackb(response.content) == expected
+
+
+@requires_msgpack
+def test_msgpack_encodes_like_json():
+    data = {key: EDGE_CASES[key] for key in ('decimal', 'datetime', 'date', 'uuid', 'unicode')}
+
+    assert msgpack.unpackb(MessagePackRenderer().render(data)) == json.loads(JSONRenderer().render(data))
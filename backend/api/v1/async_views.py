@@ -0,0 +1,224 @@
+"""
+Native async handlers for the catalog read endpoints.
+
+Under ASGI these views serve the product list, detail, ``featured`` and
+``by_category`` endpoints and the category tree without running the whole
+request in a worker thread. Querysets are evaluated through the async ORM and
+everything the serializers read, cached list fragments included, is loaded
+beforehand, so serialization and rendering happen on the event loop without
+touching the database. URLs, filtering,
+pagination, response shapes, the response cache and conditional GET behave
+exactly like the sync viewsets these classes extend.
+
+Requests the async path does not cover (keyset pagination, the
+single-language projection, methods other than GET and HEAD) are handed to
+the sync viewset. Enabled with the ``API_ASYNC_VIEWS`` setting.
+"""
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import Http404, HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.response import Response
+
+from backend.api.cache import NAMESPACE_CATEGORIES, NAMESPACE_PRODUCTS, cache_response
+from backend.api.cdn import (
+    category_keys,
+    product_detail_keys,
+    product_list_keys,
+    surrogate_keys,
+)
+from backend.api.profiling import span
+from backend.api.conditional import conditional_response
+from backend.app.category_tree import aget_category_tree
+from backend.app.models import CategoryStats
+from backend.api.v1.projections import is_single_language
+from backend.api.v1.views import CategoryViewSet, ProductViewSet
+from backend.core.db_router import aselect_replica
+
+# Rows fetched per round trip when streaming unpaginated product lists
+CHUNK_SIZE = 500
+
+
+class AsyncViewSetMixin:
+    """
+    Serve selected actions of a read-only viewset with coroutine methods.
+
+    ``async_actions`` maps action names to the coroutine methods serving
+    them. Like the sync catalog viewsets, they do not authenticate requests.
+    """
+
+    async_actions = {}
+
+    @classmethod
+    def as_async_view(cls, action, **initkwargs):
+        """Return an async view for one action, falling back to the sync viewset."""
+        actions = {'get': action, 'head': action}
+        sync_view = sync_to_async(cls.as_view(actions, **initkwargs))
+        handler_name = cls.async_actions[action]
+
+        async def view(request, *args, **kwargs):
+            self = cls(**initkwargs)
+            self.action_map = actions
+            for method, action_name in actions.items():
+                setattr(self, method, getattr(self, action_name))
+            self.args = args
+            self.kwargs = kwargs
+            drf_request = self.initialize_request(request, *args, **kwargs)
+            if request.method not in ('GET', 'HEAD') or not self.supports_async(drf_request):
+                return await sync_view(request, *args, **kwargs)
+            return await self.adispatch(getattr(self, handler_name), drf_request, *args, **kwargs)
+
+        view.cls = cls
+        view.initkwargs = initkwargs
+        view.actions = actions
+        return csrf_exempt(view)
+
+    def supports_async(self, request):
+        """Return False for requests that must be served by the sync viewset."""
+        return True
+
+    async def adispatch(self, handler, request, *args, **kwargs):
+        """Async counterpart of ``APIView.dispatch``."""
+        self.request = request
+        self.headers = self.default_response_headers
+        try:
+            self.format_kwarg = self.get_format_suffix(**kwargs)
+            request.accepted_renderer, request.accepted_media_type = (
+                self.perform_content_negotiation(request)
+            )
+            request.version, request.versioning_scheme = self.determine_version(
+                request, *args, **kwargs
+            )
+            self.check_permissions(request)
+            self.check_throttles(request)
+            await aselect_replica()
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        response = self.finalize_response(request, response, *args, **kwargs)
+        return self.render_response(response)
+
+    @staticmethod
+    def render_response(response):
+        """
+        Render a DRF response into a plain HttpResponse.
+        Django would otherwise render it in a worker thread.
+        """
+        if not hasattr(response, 'render'):
+            return response
+        with span('render'):
+            response.render()
+        rendered = HttpResponse(response.content, status=response.status_code)
+        for header, value in response.items():
+            rendered[header] = value
+        return rendered
+
+
+class AsyncCategoryViewSet(AsyncViewSetMixin, CategoryViewSet):
+    """Async category tree."""
+
+    async_actions = {'tree': 'atree'}
+
+    @surrogate_keys(category_keys)
+    @conditional_response(NAMESPACE_CATEGORIES)
+    @cache_response(NAMESPACE_CATEGORIES)
+    async def atree(self, request):
+        tree = await aget_category_tree()
+        serializer = self.get_tree_serializer(tree, await CategoryStats.objects.ain_bulk())
+        return Response(serializer.data)
+
+
+class AsyncProductViewSet(AsyncViewSetMixin, ProductViewSet):
+    """Async product list, detail, featured and by-category endpoints."""
+
+    async_actions = {
+        'list': 'alist',
+        'retrieve': 'aretrieve',
+        'featured': 'afeatured',
+        'by_category': 'aby_category',
+    }
+
+    def supports_async(self, request):
+        if is_single_language(request):
+            return False
+        return not (self.action == 'list' and self.paginator.use_keyset(request))
+
+    async def adispatch(self, handler, request, *args, **kwargs):
+        if request.query_params.get('include_descendants') == 'true':
+            # Subtree filters read the snapshot without awaiting it
+            self.category_tree = await aget_category_tree()
+        return await super().adispatch(handler, request, *args, **kwargs)
+
+    @surrogate_keys(product_list_keys)
+    @conditional_response(NAMESPACE_PRODUCTS, NAMESPACE_CATEGORIES)
+    @cache_response(NAMESPACE_PRODUCTS, NAMESPACE_CATEGORIES)
+    async def alist(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = await self.paginator.apaginate_queryset(queryset, request, view=self)
+        if page is not None:
+            return self.get_paginated_response(await self.aserialize_list(page))
+
+        products = [product async for product in queryset.aiterator(chunk_size=CHUNK_SIZE)]
+        return Response(await self.aserialize_list(products))
+
+    @surrogate_keys(product_detail_keys)
+    @conditional_response(NAMESPACE_PRODUCTS, NAMESPACE_CATEGORIES)
+    @cache_response(NAMESPACE_PRODUCTS, NAMESPACE_CATEGORIES)
+    async def aretrieve(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        # Same outcomes as rest_framework.generics.get_object_or_404
+        try:
+            instance = await queryset.aget(**{self.lookup_field: kwargs[lookup_url_kwarg]})
+        except queryset.model.DoesNotExist:
+            raise Http404(f'No {queryset.model._meta.object_name} matches the given query.')
+        except (TypeError, ValueError, ValidationError):
+            raise Http404
+        self.check_object_permissions(request, instance)
+
+        # The category serializer reads the tree snapshot and child counters
+        tree = await aget_category_tree()
+        children = tree.children(instance.category_id, active_only=True)
+        category_stats = await CategoryStats.objects.ain_bulk([child.id for child in children])
+        serializer = self.get_serializer(instance, context={
+            **self.get_serializer_context(),
+            'tree': tree,
+            'category_stats': category_stats,
+        })
+        return Response(serializer.data)
+
+    @surrogate_keys(product_list_keys)
+    @conditional_response(NAMESPACE_PRODUCTS, NAMESPACE_CATEGORIES)
+    @cache_response(NAMESPACE_PRODUCTS, NAMESPACE_CATEGORIES)
+    async def afeatured(self, request):
+        language = getattr(request, 'LANGUAGE_CODE', 'en')
+        limit = int(request.query_params.get('limit', 10))
+        products = self.get_featured_queryset(language)[:limit]
+        return Response(await self.aserialize_list([product async for product in products]))
+
+    @surrogate_keys(product_list_keys)
+    @conditional_response(NAMESPACE_PRODUCTS, NAMESPACE_CATEGORIES)
+    @cache_response(NAMESPACE_PRODUCTS, NAMESPACE_CATEGORIES)
+    async def aby_category(self, request):
+        category_slug = request.query_params.get('category_slug')
+        if not category_slug:
+            return Response(
+                {'error': 'category_slug parameter is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        language = getattr(request, 'LANGUAGE_CODE', 'en')
+        products = self.get_category_products_queryset(language, category_slug)
+        return Response(await self.aserialize_list(
+            [product async for product in products.aiterator(chunk_size=CHUNK_SIZE)]
+        ))
+
+    async def aserialize_list(self, products):
+        """Serialize products, reading and writing list fragments through the async cache API."""
+        serializer = self.get_serializer(products, many=True)
+        await serializer.aload()
+        data = serializer.data
+        await serializer.astore()
+        return data
@@ -0,0 +1,325 @@
+"""
+Streaming product feed export.
+
+Products are read with one flat ``.values()`` query, translations joined as
+in the single-language projection, through a server-side cursor and written
+out chunk by chunk as JSON Lines, CSV or a Google Merchant RSS feed, so memory
+use does not grow with the catalog.
+
+A full export contains the active products. With ``since`` it contains every
+product updated after that time, deactivated ones included, followed by the
+products deleted since then (``is_deleted``), so consumers can apply changes
+incrementally; the cutoff to pass as the next ``since`` is returned with the
+export. Deletions are only known for ``EXPORT_TOMBSTONE_RETENTION`` days, so
+a consumer whose ``since`` is older has to start over with a full export.
+Exports read from the primary database, where the cutoff can account
+for transactions that have not committed yet.
+
+Under ASGI the chunks are produced through ``sync_to_async`` one at a time;
+Django would otherwise collect a synchronous iterator into a list first.
+"""
+import csv
+import io
+import itertools
+import json
+from datetime import datetime, time, timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.xmlutils import SimplerXMLGenerator
+from rest_framework.negotiation import BaseContentNegotiation
+
+from backend.api.v1.projections import (
+    _decimal,
+    _translation_columns,
+    _translations,
+    filter_translated,
+    with_translation,
+)
+from backend.app.models import Category, DeletedProduct, Product, ProductImage
+
+FORMAT_JSONL = 'jsonl'
+FORMAT_CSV = 'csv'
+FORMAT_XML = 'xml'
+FORMATS = (FORMAT_JSONL, FORMAT_CSV, FORMAT_XML)
+
+CONTENT_TYPES = {
+    FORMAT_JSONL: 'application/x-ndjson',
+    FORMAT_CSV: 'text/csv',
+    FORMAT_XML: 'application/rss+xml',
+}
+
+CUTOFF_HEADER = 'X-Export-Cutoff'
+
+# Prices are stored in euros (see Product.price)
+CURRENCY = 'EUR'
+
+MERCHANT_NAMESPACE = 'http://base.google.com/ns/1.0'
+
+# Start of the oldest transaction still open in this database, other than the
+# export's own. Sessions of other roles only show it with pg_read_all_stats.
+OLDEST_TRANSACTION_SQL = '''
+    SELECT least(statement_timestamp(), min(xact_start))
+    FROM pg_stat_activity
+    WHERE datname = current_database() AND pid <> pg_backend_pid()
+'''
+
+FIELDS = (
+    'id', 'sku', 'language', 'name', 'short_description', 'description',
+    'category', 'category_name', 'price', 'discount_price', 'effective_price', 'currency',
+    'stock_quantity', 'is_in_stock', 'is_active', 'is_deleted', 'is_featured', 'material', 'weight',
+    'image', 'url', 'updated_at',
+)
+
+
+def parse_since(value):
+    """Parse an ISO 8601 date or date-time; naive values are in the current time zone."""
+    since = parse_datetime(value)
+    if since is None:
+        date = parse_date(value)
+        if date is None:
+            raise ValueError(f'"{value}" is not an ISO 8601 date or date-time')
+        since = datetime.combine(date, time.min)
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def export_rows(language, since=None):
+    """Project the products to export, oldest change first."""
+    queryset = Product.objects.all()
+    if since is None:
+        queryset = queryset.filter(is_active=True)
+    else:
+        queryset = queryset.filter(updated_at__gt=since)
+    queryset = with_translation(queryset, language)
+    queryset = with_translation(
+        queryset, language,
+        relation='category__translations',
+        prefix='category_translation'
+    )
+    queryset = filter_translated(queryset, language)
+    return queryset.order_by('updated_at', 'id').values(
+        'id', 'sku', 'price', 'discount_price', 'effective_price', 'stock_quantity', 'is_active', 'is_featured',
+        'material', 'weight', 'updated_at', 'category__slug', 'primary_image__image',
+        *_translation_columns(Product, 'translation', language),
+        *_translation_columns(Category, 'category_translation', language),
+    )
+
+
+def deleted_rows(since):
+    """Tombstones of the products deleted after ``since``."""
+    return DeletedProduct.objects.filter(deleted_at__gt=since).order_by(
+        'deleted_at', 'id'
+    ).values('product_id', 'sku', 'deleted_at')
+
+
+def export_record(row, language, absolute_url):
+    """Build the flat export record of a projected row."""
+    translations = _translations(Product, row, 'translation', language)
+    code, translation = next(iter(translations.items()), (None, {}))
+    category = next(iter(_translations(Category, row, 'category_translation', language).values()), {})
+    image = row['primary_image__image']
+    if image:
+        image = absolute_url(ProductImage._meta.get_field('image').storage.url(image))
+    return {
+        'id': row['id'],
+        'sku': row['sku'],
+        'language': code,
+        'name': translation.get('name'),
+        'short_description': translation.get('short_description'),
+        'description': translation.get('description'),
+        'category': row['category__slug'],
+        'category_name': category.get('name'),
+        'price': _decimal(row['price']),
+        'discount_price': _decimal(row['discount_price']),
+        'effective_price': _decimal(row['effective_price']),
+        'currency': CURRENCY,
+        'stock_quantity': row['stock_quantity'],
+        'is_in_stock': row['stock_quantity'] > 0,
+        'is_active': row['is_active'],
+        'is_deleted': False,
+        'is_featured': row['is_featured'],
+        'material': row['material'],
+        'weight': _decimal(row['weight']),
+        'image': image or None,
+        'url': product_url(row['id'], row['sku'], code),
+        'updated_at': row['updated_at'].isoformat(),
+    }
+
+
+def deletion_record(row, language):
+    """Build the export record of a deleted product; only its identity is known."""
+    record = dict.fromkeys(FIELDS)
+    record.update(
+        id=row['product_id'],
+        sku=row['sku'],
+        language=language,
+        is_in_stock=False,
+        is_active=False,
+        is_deleted=True,
+        updated_at=row['deleted_at'].isoformat(),
+    )
+    return record
+
+
+def product_url(pk, sku, language):
+    """Storefront URL of a product from ``EXPORT_PRODUCT_URL``, if configured."""
+    if not settings.EXPORT_PRODUCT_URL:
+        return None
+    return settings.EXPORT_PRODUCT_URL.format(id=pk, sku=sku, language=language)
+
+
+def _chunks(records):
+    while chunk := list(itertools.islice(records, settings.EXPORT_CHUNK_SIZE)):
+        yield chunk
+
+
+def write_jsonl(records):
+    for chunk in _chunks(records):
+        yield ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in chunk)
+
+
+def write_csv(records):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=FIELDS)
+    writer.writeheader()
+    for chunk in _chunks(records):
+        writer.writerows(chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def write_merchant_xml(records, language):
+    """
+    Write a Google Merchant RSS 2.0 feed. Deactivated and deleted products,
+    which only incremental exports contain, become out of stock items with
+    just their id, like in a supplemental feed.
+    """
+    buffer = io.StringIO()
+    xml = SimplerXMLGenerator(buffer, 'utf-8', short_empty_elements=True)
+    xml.startDocument()
+    xml.startElement('rss', {'version': '2.0', 'xmlns:g': MERCHANT_NAMESPACE})
+    xml.startElement('channel', {})
+    xml.addQuickElement('title', f'{settings.EXPORT_FEED_TITLE} ({language})')
+    xml.addQuickElement('link', settings.EXPORT_SITE_URL)
+    xml.addQuickElement('description', 'Product feed')
+    for chunk in _chunks(records):
+        for record in chunk:
+            if record['is_active']:
+                write_merchant_item(xml, record)
+            else:
+                write_merchant_removal(xml, record)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    xml.endElement('channel')
+    xml.endElement('rss')
+    yield buffer.getvalue()
+
+
+def write_merchant_item(xml, record):
+    xml.startElement('item', {})
+    xml.addQuickElement('g:id', record['sku'])
+    xml.addQuickElement('title', record['name'])
+    xml.addQuickElement('description', record['description'] or record['short_description'] or '')
+    if record['url']:
+        xml.addQuickElement('link', record['url'])
+    if record['image']:
+        xml.addQuickElement('g:image_link', record['image'])
+    xml.addQuickElement('g:availability', 'in_stock' if record['is_in_stock'] else 'out_of_stock')
+    xml.addQuickElement('g:price', f'{record["price"]} {CURRENCY}')
+    if record['effective_price'] != record['price']:
+        xml.addQuickElement('g:sale_price', f'{record["effective_price"]} {CURRENCY}')
+    if record['category_name']:
+        xml.addQuickElement('g:product_type', record['category_name'])
+    if record['material']:
+        xml.addQuickElement('g:material', record['material'])
+    if record['weight']:
+        xml.addQuickElement('g:shipping_weight', f'{record["weight"]} g')
+    xml.addQuickElement('g:condition', 'new')
+    xml.addQuickElement('g:identifier_exists', 'no')
+    xml.endElement('item')
+
+
+def write_merchant_removal(xml, record):
+    xml.startElement('item', {})
+    xml.addQuickElement('g:id', record['sku'])
+    xml.addQuickElement('g:availability', 'out_of_stock')
+    xml.endElement('item')
+
+
+def export_cutoff(using=DEFAULT_DB_ALIAS):
+    """
+    Return the time to pass as ``since`` to the next export.
+
+    ``updated_at`` is set when a row is saved, but the row only becomes
+    visible when its transaction commits. The cutoff therefore goes back to
+    the start of the oldest open transaction, less ``EXPORT_CUTOFF_LAG``
+    seconds for clock skew between the application servers and the database,
+    and changes made around it may appear in two consecutive exports.
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute(OLDEST_TRANSACTION_SQL)
+        (oldest,) = cursor.fetchone()
+    return oldest - timedelta(seconds=settings.EXPORT_CUTOFF_LAG)
+
+
+def export(file_format, language, since=None, absolute_url=str):
+    """
+    Return ``(cutoff, chunks)``: the time to pass as the next ``since`` and an
+    iterator of text chunks. Rows are fetched ``EXPORT_CHUNK_SIZE`` at a time.
+    """
+    cutoff = export_cutoff()
+    rows = export_rows(language, since).using(DEFAULT_DB_ALIAS)
+    records = (
+        export_record(row, language, absolute_url)
+        for row in rows.iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+    )
+    if since is not None:
+        deletions = deleted_rows(since).using(DEFAULT_DB_ALIAS)
+        records = itertools.chain(records, (
+            deletion_record(row, language)
+            for row in deletions.iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+        ))
+    if file_format == FORMAT_JSONL:
+        return cutoff, write_jsonl(records)
+    if file_format == FORMAT_CSV:
+        return cutoff, write_csv(records)
+    return cutoff, write_merchant_xml(records, language)
+
+
+async def _async_chunks(chunks):
+    # Thread-sensitive, so every chunk is read through the same connection
+    # and its server-side cursor
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    while (chunk := await next_chunk(chunks, None)) is not None:
+        yield chunk
+
+
+def export_response(request, file_format, language, since=None):
+    """Stream an export as an attachment."""
+    cutoff, chunks = export(file_format, language, since, absolute_url=request.build_absolute_uri)
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        chunks = _async_chunks(chunks)
+    response = StreamingHttpResponse(chunks, content_type=CONTENT_TYPES[file_format])
+    response['Content-Disposition'] = f'attachment; filename="products-{language}.{file_format}"'
+    response[CUTOFF_HEADER] = cutoff.isoformat()
+    return response
+
+
+class ExportContentNegotiation(BaseContentNegotiation):
+    """Exports pick their format from ``output``; feed readers send all kinds of Accept headers."""
+
+    def select_parser(self, request, parsers):
+        return parsers[0]
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
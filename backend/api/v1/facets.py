@@ -0,0 +1,101 @@
+"""
+Facet counts for the product list filters.
+
+Counts cover the products matching the current filters and are computed in
+two queries: one grouped by category and material, and one with conditional
+aggregates for the price ranges and stock status. Category counts include
+the products of descendant categories, rolled up through the in-memory
+category tree.
+"""
+from collections import Counter
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Count, Q
+
+from backend.api.v1.projections import filter_translated, with_translation
+from backend.app.category_tree import get_category_tree
+
+# Parameters changing the order or page of the list but not what it contains
+IGNORED_PARAMS = ('ordering', 'page', 'page_size', 'pagination', 'cursor', 'count', 'single_language')
+
+
+def price_ranges():
+    """Return ``(min, max)`` pairs from ``FACET_PRICE_BOUNDS``; ``None`` is unbounded."""
+    bounds = [Decimal(bound) for bound in settings.FACET_PRICE_BOUNDS]
+    return list(zip([None, *bounds], [*bounds, None]))
+
+
+def price_range_condition(low, high):
+    condition = Q()
+    if low is not None:
+        condition &= Q(effective_price__gte=low)
+    if high is not None:
+        condition &= Q(effective_price__lt=high)
+    return condition
+
+
+def get_facets(queryset, language):
+    """Count the products of a filtered queryset per category, material, price range and stock status."""
+    queryset = filter_translated(with_translation(queryset, language), language).order_by()
+
+    categories = Counter()
+    materials = Counter()
+    for row in queryset.values('category_id', 'material').annotate(count=Count('pk')):
+        categories[row['category_id']] += row['count']
+        if row['material']:
+            materials[row['material']] += row['count']
+
+    ranges = price_ranges()
+    totals = queryset.aggregate(
+        total=Count('pk'),
+        in_stock=Count('pk', filter=Q(stock_quantity__gt=0)),
+        **{
+            f'price_{index}': Count('pk', filter=price_range_condition(low, high))
+            for index, (low, high) in enumerate(ranges)
+        },
+    )
+
+    return {
+        'total': totals['total'],
+        'categories': category_facets(categories, language),
+        'materials': [
+            {'value': material, 'count': count}
+            for material, count in sorted(materials.items(), key=lambda item: (-item[1], item[0]))
+        ],
+        'price_ranges': [
+            {
+                'min': None if low is None else f'{low:.2f}',
+                'max': None if high is None else f'{high:.2f}',
+                'count': totals[f'price_{index}'],
+            }
+            for index, (low, high) in enumerate(ranges)
+        ],
+        'stock': {
+            'in_stock': totals['in_stock'],
+            'out_of_stock': totals['total'] - totals['in_stock'],
+        },
+    }
+
+
+def category_facets(counts, language):
+    """Roll product counts up to ancestor categories and list active categories with products."""
+    tree = get_category_tree()
+    rolled_up = Counter()
+    for category_id, count in counts.items():
+        node = tree.get(category_id)
+        if node is None:
+            continue
+        for pk in (*node.ancestor_ids, category_id):
+            rolled_up[pk] += count
+    return [
+        {
+            'id': node.id,
+            'slug': node.slug,
+            'name': node.get_translation(language).get('name'),
+            'parent': node.parent_id,
+            'count': rolled_up[node.id],
+        }
+        for node in tree.all(active_only=True)
+        if rolled_up[node.id]
+    ]
@@ -0,0 +1,97 @@
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramSimilarity,
+    TrigramWordSimilarity,
+)
+from django.db.models import Exists, F, FloatField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Cast, Coalesce, Greatest
+from parler.utils.i18n import get_active_language_choices
+from rest_framework import filters
+
+from backend.app.models import ProductSearchDocument
+from backend.app.search import get_search_config
+
+
+class ProductSearchFilter(filters.SearchFilter):
+    """
+    Full-text product search over per-language search documents.
+
+    Matches the request language (and its fallbacks) with the language's
+    text search configuration and ranks results by relevance. Partial SKUs
+    and misspelled names are matched by trigram similarity as a fallback.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = ' '.join(self.get_search_terms(request))
+        if not terms:
+            return queryset
+
+        language = getattr(request, 'LANGUAGE_CODE', 'en')
+        documents = ProductSearchDocument.objects.filter(product=OuterRef('pk'))
+
+        matches = Q()
+        ranks = []
+        for language_code in get_active_language_choices(language):
+            query = SearchQuery(
+                terms,
+                config=get_search_config(language_code),
+                search_type='websearch'
+            )
+            language_documents = documents.filter(language_code=language_code)
+            matches |= Q(Exists(language_documents.filter(document=query)))
+            ranks.append(Subquery(
+                language_documents.annotate(
+                    rank=SearchRank(F('document'), query)
+                ).values('rank')[:1],
+                output_field=FloatField()
+            ))
+
+        fallback_documents = documents.filter(
+            language_code__in=get_active_language_choices(language)
+        )
+        name_similarity = Subquery(
+            fallback_documents.annotate(
+                similarity=TrigramWordSimilarity(Value(terms), 'name')
+            ).order_by('-similarity').values('similarity')[:1],
+            output_field=FloatField()
+        )
+        matches |= Q(sku__trigram_similar=terms)
+        matches |= Q(Exists(fallback_documents.filter(name__trigram_word_similar=terms)))
+
+        # Ranks are real-valued; casting to double keeps them exactly
+        # comparable with values echoed back in keyset pagination cursors.
+        return queryset.annotate(
+            search_rank=Cast(Coalesce(*ranks, Value(0.0)), FloatField()),
+            search_similarity=Cast(Greatest(
+                TrigramSimilarity('sku', Value(terms)),
+                Coalesce(name_similarity, Value(0.0))
+            ), FloatField()),
+        ).filter(matches)
+
+
+class ProductOrderingFilter(filters.OrderingFilter):
+    """Ordering filter that sorts search results by relevance unless asked otherwise."""
+
+    def get_ordering(self, request, queryset, view):
+        params = request.query_params.get(self.ordering_param)
+        if not params and 'search_rank' in queryset.query.annotations:
+            return ['-search_rank', '-search_similarity', *(self.get_default_ordering(view) or [])]
+        return super().get_ordering(request, queryset, view)
+
+
+def category_filter(category_slug, tree=None):
+    """
+    Match products of the category with the given slug.
+
+    Given a category tree snapshot, products of all its descendants match as
+    well. The subtree is read from the snapshot, so the query filters the
+    indexed category foreign key on a list of ids whatever the depth of the
+    tree. Unknown slugs match nothing.
+    """
+    if tree is None:
+        return Q(category__slug=category_slug)
+    node = tree.get_by_slug(category_slug)
+    if node is None:
+        return Q(pk__in=[])
+    return Q(category_id__in=tree.descendant_ids(node.id, include_self=True))
@@ -0,0 +1,275 @@
+import base64
+import binascii
+import datetime
+import json
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage
+from django.db import connections
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def estimate_count(queryset):
+    """Return the planner's row estimate for a queryset, or None if unavailable."""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Plan']['Plan Rows']
+
+
+def get_ordering_field(queryset, name):
+    """Return the model field or annotation output field an ordering name refers to."""
+    if name in queryset.query.annotations:
+        return queryset.query.annotations[name].output_field
+    model, field = queryset.model, None
+    for part in name.split('__'):
+        field = model._meta.pk if part == 'pk' else model._meta.get_field(part)
+        model = field.related_model
+    return field
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination over the queryset ordering plus the primary key.
+
+    Pages are fetched with ``WHERE (a, b, pk) > (...)`` style conditions
+    instead of ``OFFSET``, and no ``COUNT(*)`` is run. Cursors are opaque and
+    tied to the ordering they were issued for. Ordering fields must not be
+    nullable. An estimated total from planner statistics is added with
+    ``?count=estimate``.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    count_query_param = 'count'
+    max_page_size = 100
+    invalid_cursor_message = _('Invalid cursor')
+
+    def __init__(self, page_size):
+        self.page_size = page_size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+
+        self.count_estimate = None
+        if request.query_params.get(self.count_query_param) == 'estimate':
+            self.count_estimate = estimate_count(queryset)
+
+        position, reverse = self.decode_cursor(request, queryset)
+        if reverse:
+            queryset = queryset.order_by(*(self._invert(field) for field in self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            queryset = queryset.filter(self.get_keyset_filter(position, reverse))
+
+        results = list(queryset[:page_size + 1])
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if reverse:
+            results.reverse()
+
+        has_next = has_more if not reverse else position is not None
+        has_previous = has_more if reverse else position is not None
+        self.next_position = self.get_position(results[-1]) if has_next and results else None
+        self.previous_position = self.get_position(results[0]) if has_previous and results else None
+        return results
+
+    def get_paginated_response(self, data):
+        payload = {
+            'next': self.get_link(self.next_position, reverse=False),
+            'previous': self.get_link(self.previous_position, reverse=True),
+            'results': data,
+        }
+        if self.count_estimate is not None:
+            payload = {'count_estimate': self.count_estimate, **payload}
+        return Response(payload)
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def get_ordering(self, queryset):
+        """Return the queryset ordering with the primary key as a final tie-breaker."""
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        if not any(field.lstrip('-') in ('pk', 'id') for field in ordering):
+            descending = ordering[-1].startswith('-') if ordering else False
+            ordering.append('-pk' if descending else 'pk')
+        return ordering
+
+    def get_keyset_filter(self, position, reverse):
+        """Build the lexicographic "after this row" condition for the ordering."""
+        condition = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip('-')
+            descending = field.startswith('-') != reverse
+            condition |= equal & Q(**{f'{name}__{"lt" if descending else "gt"}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def get_position(self, obj):
+        """Read ordering values from a model instance or a ``.values()`` row."""
+        position = []
+        for field in self.ordering:
+            name = field.lstrip('-')
+            if isinstance(obj, dict):
+                position.append(obj['id' if name == 'pk' else name])
+                continue
+            value = obj
+            for attr in name.split('__'):
+                value = getattr(value, attr)
+            position.append(value)
+        return position
+
+    def get_link(self, position, reverse):
+        if position is None:
+            return None
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, self.encode_cursor(position, reverse)
+        )
+
+    def encode_cursor(self, position, reverse):
+        values = [
+            value.isoformat() if isinstance(value, (datetime.date, datetime.time))
+            else str(value) if isinstance(value, Decimal)
+            else value
+            for value in position
+        ]
+        payload = {'o': self.ordering, 'p': values}
+        if reverse:
+            payload['r'] = 1
+        encoded = json.dumps(payload, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(encoded).decode().rstrip('=')
+
+    def decode_cursor(self, request, queryset):
+        """
+        Return the (position, reverse) pair encoded in the request cursor.
+
+        Position values are converted by the fields they order on, so tampered
+        cursors are rejected here rather than failing in the query.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)))
+            values, reverse = payload['p'], bool(payload.get('r'))
+            valid = payload['o'] == self.ordering and len(values) == len(self.ordering)
+            if valid:
+                position = [
+                    get_ordering_field(queryset, field.lstrip('-')).to_python(value)
+                    for field, value in zip(self.ordering, values)
+                ]
+                # Ordering fields are not nullable, and None is no lookup value
+                valid = None not in position
+        except (TypeError, ValueError, KeyError, binascii.Error, ValidationError):
+            valid = False
+        if not valid:
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    @staticmethod
+    def _invert(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+
+class ProductPagination(PageNumberPagination):
+    """
+    Page-number pagination that switches to keyset pagination per request.
+
+    Clients opt in with ``?pagination=cursor`` (or by following a ``cursor``
+    link); page-number clients keep working unchanged.
+    """
+
+    mode_query_param = 'pagination'
+    keyset_mode = 'cursor'
+
+    def __init__(self):
+        self.keyset = None
+
+    def use_keyset(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == self.keyset_mode
+            or KeysetPagination.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_keyset(request):
+            self.keyset = KeysetPagination(self.page_size)
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Page-number pagination through the async ORM, for async views.
+
+        Keyset requests are not handled here; async views hand them to the
+        sync views.
+        """
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Paginator.count is a cached property, filled in ahead of time
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(page_number=page_number, message=str(exc))
+            raise NotFound(msg)
+
+        self.page.object_list = [obj async for obj in self.page.object_list]
+        return list(self.page)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            *super().get_schema_operation_parameters(view),
+            {
+                'name': self.mode_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Set to "cursor" for keyset pagination.',
+                'schema': {'type': 'string', 'enum': [self.keyset_mode]},
+            },
+            {
+                'name': KeysetPagination.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Opaque cursor from a previous keyset page.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': KeysetPagination.count_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Set to "estimate" to add a planner-estimated total to keyset pages.',
+                'schema': {'type': 'string', 'enum': ['estimate']},
+            },
+        ]
@@ -0,0 +1,214 @@
+"""
+Single-language projections of the catalog list endpoints.
+
+With ``?single_language=true`` list responses contain only the negotiated
+language (or its fallback) in ``translations``. Rows are read with one flat
+``.values()`` query that joins the translation tables through
+``FilteredRelation`` once per candidate language, and are turned into the
+same JSON the serializers produce for that language, without building model
+instances or running DRF fields.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db.models import FilteredRelation, Q
+from parler.utils.i18n import get_active_language_choices
+from rest_framework.response import Response
+
+from backend.api.profiling import span
+from backend.app.models import Category, Product, ProductImage, ProductImageRendition
+from backend.app.category_stats import COUNTER_FIELDS
+
+SINGLE_LANGUAGE_PARAM = 'single_language'
+
+TWO_PLACES = Decimal('0.01')
+
+CATEGORY_FIELDS = ('id', 'slug', 'parent_id', 'is_active', 'order')
+PRODUCT_FIELDS = (
+    'id', 'sku', 'category_id', 'price', 'discount_price', 'effective_price', 'stock_quantity',
+    'is_featured', 'primary_image_id', 'material', 'weight',
+)
+IMAGE_FIELDS = ('image', 'alt_text', 'order', 'is_primary', 'width', 'height', 'placeholder')
+
+
+def is_single_language(request):
+    return request.query_params.get(SINGLE_LANGUAGE_PARAM) == 'true'
+
+
+def _translation_aliases(prefix, language):
+    """Return (alias, language code) pairs in fallback order."""
+    return [
+        (f'{prefix}_{index}', code)
+        for index, code in enumerate(get_active_language_choices(language))
+    ]
+
+
+def _translation_columns(model, prefix, language):
+    return [
+        f'{alias}__{field}'
+        for alias, _code in _translation_aliases(prefix, language)
+        for field in ('pk', *model._parler_meta.get_translated_fields())
+    ]
+
+
+def with_translation(queryset, language, relation='translations', prefix='translation'):
+    """Join the translations for the language and its fallback, one join each."""
+    return queryset.annotate(**{
+        alias: FilteredRelation(relation, condition=Q(**{f'{relation}__language_code': code}))
+        for alias, code in _translation_aliases(prefix, language)
+    })
+
+
+def filter_translated(queryset, language, prefix='translation'):
+    """Keep rows translated in the language or its fallback (like ``active_translations``)."""
+    condition = Q()
+    for alias, _code in _translation_aliases(prefix, language):
+        condition |= Q(**{f'{alias}__isnull': False})
+    return queryset.filter(condition)
+
+
+def _translations(model, row, prefix, language):
+    """Return the ``translations`` slice for the first available language."""
+    fields = model._parler_meta.get_translated_fields()
+    for alias, code in _translation_aliases(prefix, language):
+        if row[f'{alias}__pk'] is not None:
+            return {code: {field: row[f'{alias}__{field}'] for field in fields}}
+    return {}
+
+
+def _decimal(value):
+    if value is None:
+        return None
+    return f'{value.quantize(TWO_PLACES):f}'
+
+
+def _category_columns(language, prefix='', translation_prefix='translation'):
+    return [
+        *(f'{prefix}{field}' for field in CATEGORY_FIELDS),
+        *(f'{prefix}stats__{field}' for field in COUNTER_FIELDS),
+        *_translation_columns(Category, translation_prefix, language),
+    ]
+
+
+def _extra_columns(queryset):
+    """Annotations and ordering fields, which keyset pagination reads from rows."""
+    ordering = queryset.query.order_by or queryset.model._meta.ordering
+    return [
+        *queryset.query.annotations,
+        *(field.lstrip('-') for field in ordering if field.lstrip('-') != 'pk'),
+    ]
+
+
+def render_category(row, language, prefix='', translation_prefix='translation'):
+    """Build the CategoryListSerializer representation from a projected row."""
+    def stat(field):
+        return row[f'{prefix}stats__{field}'] or 0
+
+    return {
+        'id': row[f'{prefix}id'],
+        'slug': row[f'{prefix}slug'],
+        'translations': _translations(Category, row, translation_prefix, language),
+        'parent': row[f'{prefix}parent_id'],
+        'is_active': row[f'{prefix}is_active'],
+        'order': row[f'{prefix}order'],
+        'children_count': stat('active_children_count'),
+        'products_count': stat('active_products_count'),
+        'descendant_products_count': stat('descendant_products_count'),
+        'in_stock_products_count': stat('in_stock_products_count'),
+    }
+
+
+def category_rows(queryset, language):
+    """Project a category queryset; apply before pagination."""
+    queryset = filter_translated(with_translation(queryset, language), language)
+    columns = [*_category_columns(language), *_extra_columns(queryset)]
+    return queryset.values(*dict.fromkeys(columns))
+
+
+def render_categories(rows, language):
+    return [render_category(row, language) for row in rows]
+
+
+def product_rows(queryset, language):
+    """Project a product queryset; apply before pagination."""
+    queryset = with_translation(queryset, language)
+    queryset = with_translation(
+        queryset, language,
+        relation='category__translations',
+        prefix='category_translation'
+    )
+    queryset = filter_translated(queryset, language)
+    columns = [
+        *PRODUCT_FIELDS,
+        *_translation_columns(Product, 'translation', language),
+        *_category_columns(language, prefix='category__', translation_prefix='category_translation'),
+        *(f'primary_image__{field}' for field in IMAGE_FIELDS),
+        *_extra_columns(queryset),
+    ]
+    return queryset.values(*dict.fromkeys(columns))
+
+
+def _srcsets(image_ids):
+    """Return ``srcset`` strings per format for each image, in one query."""
+    storage = ProductImageRendition._meta.get_field('file').storage
+    candidates = defaultdict(lambda: defaultdict(list))
+    renditions = ProductImageRendition.objects.filter(image_id__in=image_ids).order_by(
+        'image_id', *ProductImageRendition._meta.ordering
+    ).values_list('image_id', 'format', 'width', 'file')
+    for image_id, fmt, width, name in renditions:
+        candidates[image_id][fmt].append(f'{storage.url(name)} {width}w')
+    return {
+        image_id: {fmt: ', '.join(urls) for fmt, urls in formats.items()}
+        for image_id, formats in candidates.items()
+    }
+
+
+def render_products(rows, language):
+    """Build the ProductListSerializer representation from projected rows."""
+    rows = list(rows)
+    image_ids = [row['primary_image_id'] for row in rows if row['primary_image_id'] is not None]
+    srcsets = _srcsets(image_ids) if image_ids else {}
+    storage = ProductImage._meta.get_field('image').storage
+
+    products = []
+    for row in rows:
+        primary_image = None
+        if row['primary_image_id'] is not None:
+            name = row['primary_image__image']
+            primary_image = {
+                'id': row['primary_image_id'],
+                'image': storage.url(name) if name else None,
+                **{field: row[f'primary_image__{field}'] for field in IMAGE_FIELDS[1:]},
+                'srcset': srcsets.get(row['primary_image_id'], {}),
+            }
+        products.append({
+            'id': row['id'],
+            'sku': row['sku'],
+            'translations': _translations(Product, row, 'translation', language),
+            'category': render_category(
+                row, language,
+                prefix='category__',
+                translation_prefix='category_translation'
+            ),
+            'price': _decimal(row['price']),
+            'discount_price': _decimal(row['discount_price']),
+            'effective_price': _decimal(row['effective_price']),
+            'stock_quantity': row['stock_quantity'],
+            'is_in_stock': row['stock_quantity'] > 0,
+            'is_featured': row['is_featured'],
+            'primary_image': primary_image,
+            'material': row['material'],
+            'weight': _decimal(row['weight']),
+        })
+    return products
+
+
+def projection_response(view, rows, render, language, paginate=True):
+    """Paginate projected rows like ``ListModelMixin.list`` and render them."""
+    page = view.paginate_queryset(rows) if paginate else None
+    if page is not None:
+        with span('serialize'):
+            data = render(page, language)
+        return view.get_paginated_response(data)
+    with span('serialize'):
+        return Response(render(rows, language))
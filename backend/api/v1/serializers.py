@@ -1,50 +1,153 @@
+from django.conf import settings
 from rest_framework import serializers
 from parler_rest.serializers import TranslatableModelSerializer, TranslatedFieldsField
-from backend.app.models import Category, Product, ProductImage
+from backend.api.fragments import FragmentListSerializer, version_of
+from backend.api.profiling import ProfiledListSerializer, ProfiledSerializerMixin
+from backend.app.category_tree import get_category_tree
+from backend.app.models import Category, CategoryStats, Product, ProductImage, StockReservation
 
 
 class ProductImageSerializer(serializers.ModelSerializer):
     """Serializer for Product Images."""
     
+    srcset = serializers.SerializerMethodField()
+    
     class Meta:
         model = ProductImage
-        fields = ['id', 'image', 'alt_text', 'order', 'is_primary']
-        read_only_fields = ['id']
+        fields = [
+            'id', 'image', 'alt_text', 'order', 'is_primary',
+            'width', 'height', 'placeholder', 'srcset'
+        ]
+        read_only_fields = ['id', 'width', 'height', 'placeholder']
+    
+    def get_srcset(self, obj):
+        """Get renditions as ``srcset`` strings keyed by format."""
+        request = self.context.get('request')
+        srcset = {}
+        for rendition in obj.renditions.all():
+            url = rendition.file.url
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            srcset.setdefault(rendition.format, []).append(f'{url} {rendition.width}w')
+        return {fmt: ', '.join(candidates) for fmt, candidates in srcset.items()}
+
+
+class CategoryStatsMixin:
+    """Counter getters shared by category serializers."""
+    
+    def get_category_stats(self, obj):
+        """Return the CategoryStats row for a category, if any."""
+        return getattr(obj, 'stats', None)
+    
+    def _get_stat(self, obj, field):
+        """Read a denormalized counter, treating missing statistics as zero."""
+        return getattr(self.get_category_stats(obj), field, 0)
+    
+    def get_children_count(self, obj):
+        """Get number of child categories."""
+        return self._get_stat(obj, 'active_children_count')
+    
+    def get_products_count(self, obj):
+        """Get number of products in category."""
+        return self._get_stat(obj, 'active_products_count')
+    
+    def get_descendant_products_count(self, obj):
+        """Get number of products in category and its subcategories."""
+        return self._get_stat(obj, 'descendant_products_count')
+    
+    def get_in_stock_products_count(self, obj):
+        """Get number of in-stock products in category."""
+        return self._get_stat(obj, 'in_stock_products_count')
 
 
-class CategoryListSerializer(TranslatableModelSerializer):
+class CategoryListSerializer(ProfiledSerializerMixin, CategoryStatsMixin, TranslatableModelSerializer):
     """Serializer for Category list view."""
     
     translations = TranslatedFieldsField(shared_model=Category)
     children_count = serializers.SerializerMethodField()
     products_count = serializers.SerializerMethodField()
+    descendant_products_count = serializers.SerializerMethodField()
+    in_stock_products_count = serializers.SerializerMethodField()
     
     class Meta:
         model = Category
+        list_serializer_class = ProfiledListSerializer
         fields = [
             'id', 'slug', 'translations', 'parent', 
-            'is_active', 'order', 'children_count', 'products_count'
+            'is_active', 'order', 'children_count', 'products_count',
+            'descendant_products_count', 'in_stock_products_count'
         ]
         read_only_fields = ['id', 'slug']
+
+
+class CategoryNodeBaseSerializer(serializers.Serializer):
+    """Base serializer for categories served from the in-memory tree snapshot."""
     
-    def get_children_count(self, obj):
-        """Get number of child categories."""
-        return obj.children.filter(is_active=True).count()
+    id = serializers.IntegerField(read_only=True)
+    slug = serializers.SlugField(read_only=True)
+    translations = serializers.SerializerMethodField()
+    parent = serializers.IntegerField(source='parent_id', read_only=True)
+    is_active = serializers.BooleanField(read_only=True)
+    order = serializers.IntegerField(read_only=True)
     
-    def get_products_count(self, obj):
-        """Get number of products in category."""
-        return obj.products.filter(is_active=True).count()
+    def get_translations(self, obj):
+        """Get translated fields for every language."""
+        return {code: dict(fields) for code, fields in obj.translations.items()}
 
 
-class CategoryDetailSerializer(TranslatableModelSerializer):
-    """Serializer for Category detail view."""
+class CategoryNodeSerializer(CategoryStatsMixin, CategoryNodeBaseSerializer):
+    """
+    Snapshot counterpart of CategoryListSerializer.
+    Counters are looked up in the ``category_stats`` context mapping.
+    """
+    
+    children_count = serializers.SerializerMethodField()
+    products_count = serializers.SerializerMethodField()
+    descendant_products_count = serializers.SerializerMethodField()
+    in_stock_products_count = serializers.SerializerMethodField()
+    
+    def get_category_stats(self, obj):
+        return self.context.get('category_stats', {}).get(obj.id)
+
+
+class CategoryNodeDetailSerializer(ProfiledSerializerMixin, CategoryNodeBaseSerializer):
+    """
+    Snapshot counterpart of CategoryDetailSerializer.
+    Expects ``tree``, ``language`` and ``category_stats`` in the context.
+    """
+    
+    children = serializers.SerializerMethodField()
+    full_path = serializers.SerializerMethodField()
+    created_at = serializers.DateTimeField(read_only=True)
+    updated_at = serializers.DateTimeField(read_only=True)
+    
+    class Meta:
+        list_serializer_class = ProfiledListSerializer
+    
+    def get_children(self, obj):
+        """Get child categories."""
+        children = self.context['tree'].children(obj.id, active_only=True)
+        return CategoryNodeSerializer(children, many=True, context=self.context).data
+    
+    def get_full_path(self, obj):
+        """Get full category path."""
+        return self.context['tree'].full_path(obj.id, self.context['language'])
+
+
+class CategoryDetailSerializer(ProfiledSerializerMixin, TranslatableModelSerializer):
+    """
+    Serializer for Category detail view.
+    A ``tree`` snapshot and ``category_stats`` mapping in the context are used
+    instead of loading them, which lets async views serialize without queries.
+    """
     
     translations = TranslatedFieldsField(shared_model=Category)
     children = serializers.SerializerMethodField()
-    full_path = serializers.CharField(source='get_full_path', read_only=True)
+    full_path = serializers.SerializerMethodField()
     
     class Meta:
         model = Category
+        list_serializer_class = ProfiledListSerializer
         fields = [
             'id', 'slug', 'translations', 'parent', 
             'is_active', 'order', 'children', 'full_path',
@@ -52,13 +155,30 @@ class CategoryDetailSerializer(TranslatableModelSerializer):
         ]
         read_only_fields = ['id', 'slug', 'created_at', 'updated_at']
     
+    def get_tree(self):
+        return self.context.get('tree') or get_category_tree()
+    
     def get_children(self, obj):
         """Get child categories."""
-        children = obj.children.filter(is_active=True)
-        return CategoryListSerializer(children, many=True, context=self.context).data
+        children = self.get_tree().children(obj.pk, active_only=True)
+        stats = self.context.get('category_stats')
+        if stats is None:
+            stats = CategoryStats.objects.in_bulk([child.id for child in children])
+        return CategoryNodeSerializer(
+            children,
+            many=True,
+            context={**self.context, 'category_stats': stats}
+        ).data
+    
+    def get_full_path(self, obj) -> str:
+        """Get full category path."""
+        tree = self.get_tree()
+        if obj.pk not in tree:
+            return obj.get_full_path()
+        return tree.full_path(obj.pk, obj.get_current_language())
 
 
-class ProductListSerializer(TranslatableModelSerializer):
+class ProductListSerializer(ProfiledSerializerMixin, TranslatableModelSerializer):
     """Serializer for Product list view."""
     
     translations = TranslatedFieldsField(shared_model=Product)
@@ -71,8 +191,13 @@ class ProductListSerializer(TranslatableModelSerializer):
     )
     is_in_stock = serializers.BooleanField(read_only=True)
     
+    # Loaded for fragment cache misses only; category__stats and
+    # primary_image are expected to be selected
+    fragment_prefetches = ('translations', 'category__translations', 'primary_image__renditions')
+    
     class Meta:
         model = Product
+        list_serializer_class = FragmentListSerializer
         fields = [
             'id', 'sku', 'translations', 'category', 
             'price', 'discount_price', 'effective_price',
@@ -81,18 +206,20 @@ class ProductListSerializer(TranslatableModelSerializer):
         ]
         read_only_fields = ['id', 'sku']
     
+    def get_fragment_version(self, obj):
+        """Version of the cached representation: the product, its category and the counters."""
+        category = obj.category
+        stats = getattr(category, 'stats', None)
+        return version_of(obj.updated_at, category.updated_at, stats and stats.updated_at)
+    
     def get_primary_image(self, obj):
         """Get primary product image."""
-        primary_image = obj.images.filter(is_primary=True).first()
-        if primary_image:
-            return ProductImageSerializer(primary_image).data
-        first_image = obj.images.first()
-        if first_image:
-            return ProductImageSerializer(first_image).data
-        return None
+        if obj.primary_image_id is None:
+            return None
+        return ProductImageSerializer(obj.primary_image).data
 
 
-class ProductDetailSerializer(TranslatableModelSerializer):
+class ProductDetailSerializer(ProfiledSerializerMixin, TranslatableModelSerializer):
     """Serializer for Product detail view."""
     
     translations = TranslatedFieldsField(shared_model=Product)
@@ -107,6 +234,7 @@ class ProductDetailSerializer(TranslatableModelSerializer):
     
     class Meta:
         model = Product
+        list_serializer_class = ProfiledListSerializer
         fields = [
             'id', 'sku', 'translations', 'category', 
             'price', 'discount_price', 'effective_price',
@@ -115,3 +243,16 @@ class ProductDetailSerializer(TranslatableModelSerializer):
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'sku', 'created_at', 'updated_at']
+
+
+class StockReservationSerializer(serializers.ModelSerializer):
+    """Serializer for stock reservations."""
+    
+    # A plain id: whether the product can be reserved is settled by the reservation itself
+    product = serializers.IntegerField(source='product_id')
+    quantity = serializers.IntegerField(min_value=1, max_value=settings.RESERVATION_MAX_QUANTITY)
+    
+    class Meta:
+        model = StockReservation
+        fields = ['id', 'product', 'quantity', 'status', 'expires_at', 'created_at']
+        read_only_fields = ['id', 'status', 'expires_at', 'created_at']
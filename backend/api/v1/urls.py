@@ -1,8 +1,13 @@
-from django.urls import path, include
+from django.conf import settings
+from django.urls import path, include, re_path
 from rest_framework.routers import DefaultRouter
+from backend.api.v1.async_views import AsyncCategoryViewSet, AsyncProductViewSet
 from backend.api.v1.views import (
     CategoryViewSet,
+    DatabasePoolView,
     ProductViewSet,
+    ProfilingView,
+    ReservationViewSet,
 )
 
 app_name = 'api_v1'
@@ -11,7 +16,43 @@ app_name = 'api_v1'
 router = DefaultRouter()
 router.register(r'categories', CategoryViewSet, basename='category')
 router.register(r'products', ProductViewSet, basename='product')
+router.register(r'reservations', ReservationViewSet, basename='reservation')
 
-urlpatterns = [
+sync_urlpatterns = [
     path('', include(router.urls)),
-]
\ No newline at end of file
+    path('db-pool/', DatabasePoolView.as_view(), name='db-pool'),
+    path('profiling/', ProfilingView.as_view(), name='profiling'),
+]
+
+# Async read endpoints shadowing the router routes with the same URLs
+async_urlpatterns = [
+    path('categories/tree/', AsyncCategoryViewSet.as_async_view('tree'), name='category-tree'),
+    path('products/', AsyncProductViewSet.as_async_view('list'), name='product-list'),
+    path(
+        'products/featured/',
+        AsyncProductViewSet.as_async_view('featured'),
+        name='product-featured'
+    ),
+    path(
+        'products/by_category/',
+        AsyncProductViewSet.as_async_view('by_category'),
+        name='product-by-category'
+    ),
+    # Keep the sync facets and export from being taken for a product id below
+    path('products/facets/', ProductViewSet.as_view({'get': 'facets'}), name='product-facets'),
+    path(
+        'products/export/',
+        ProductViewSet.as_view({'get': 'export'}, **ProductViewSet.export.kwargs),
+        name='product-export'
+    ),
+    re_path(
+        r'^products/(?P<id>[^/.]+)/$',
+        AsyncProductViewSet.as_async_view('retrieve'),
+        name='product-detail'
+    ),
+]
+
+if settings.API_ASYNC_VIEWS:
+    urlpatterns = async_urlpatterns + sync_urlpatterns
+else:
+    urlpatterns = sync_urlpatterns
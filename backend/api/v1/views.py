@@ -1,15 +1,60 @@
-from rest_framework import viewsets, filters, status
+from rest_framework import viewsets, filters, mixins, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.throttling import ScopedRateThrottle
+from rest_framework.views import APIView
+from django.conf import settings
 from django_filters.rest_framework import DjangoFilterBackend
-from drf_spectacular.utils import extend_schema, extend_schema_view
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema, extend_schema_view
 
-from backend.app.models import Category, Product
+from backend.api import profiling
+from backend.api.cache import NAMESPACE_CATEGORIES, NAMESPACE_PRODUCTS, cache_response
+from backend.api.cdn import (
+    category_keys,
+    product_detail_keys,
+    product_list_keys,
+    surrogate_keys,
+)
+from backend.api.conditional import conditional_response
+from backend.app.category_tree import get_category_tree
+from backend.core.db_pool import get_pool_stats
+from backend.app.models import Category, CategoryStats, Product, StockReservation
+from backend.app import reservations
+from backend.api.v1.export import (
+    FORMAT_JSONL,
+    FORMATS as EXPORT_FORMATS,
+    ExportContentNegotiation,
+    export_response,
+    parse_since,
+)
+from backend.api.v1.facets import IGNORED_PARAMS as FACET_IGNORED_PARAMS, get_facets
+from backend.api.v1.filters import ProductOrderingFilter, ProductSearchFilter, category_filter
+from backend.api.v1.pagination import ProductPagination
+from backend.api.v1.projections import (
+    category_rows,
+    is_single_language,
+    product_rows,
+    projection_response,
+    render_categories,
+    render_products,
+)
 from backend.api.v1.serializers import (
     CategoryListSerializer,
     CategoryDetailSerializer,
+    CategoryNodeDetailSerializer,
     ProductListSerializer,
     ProductDetailSerializer,
+    StockReservationSerializer,
+)
+
+# Serializers read every translation of a product and its category
+TRANSLATION_PREFETCHES = ('translations', 'category__translations')
+
+INCLUDE_DESCENDANTS_PARAMETER = OpenApiParameter(
+    'include_descendants',
+    OpenApiTypes.BOOL,
+    description='With true, also match products of the descendants of the category.',
 )
 
 
@@ -25,6 +70,9 @@ class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
     
     queryset = Category.objects.filter(is_active=True)
     lookup_field = 'slug'
+    # The catalog is public; not reading the session keeps responses
+    # shareable by caches (no ``Vary: Cookie``)
+    authentication_classes = []
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['parent', 'is_active']
     ordering_fields = ['order', 'created_at']
@@ -39,30 +87,68 @@ class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
     def get_queryset(self):
         """Get queryset with proper translations."""
         language = getattr(self.request, 'LANGUAGE_CODE', 'en')
-        queryset = self.queryset.active_translations(language)
+        queryset = self.queryset
         
         if self.request.query_params.get('root_only') == 'true':
             queryset = queryset.filter(parent__isnull=True)
         
-        return queryset.prefetch_related('children')
+        # The single-language projection joins translations itself
+        if self.action == 'list' and is_single_language(self.request):
+            return queryset
+        
+        return queryset.active_translations(language).select_related(
+            'stats'
+        ).prefetch_related('translations')
+    
+    @surrogate_keys(category_keys)
+    @conditional_response(NAMESPACE_CATEGORIES)
+    @cache_response(NAMESPACE_CATEGORIES)
+    def list(self, request, *args, **kwargs):
+        if not is_single_language(request):
+            return super().list(request, *args, **kwargs)
+        language = getattr(request, 'LANGUAGE_CODE', 'en')
+        rows = category_rows(self.filter_queryset(self.get_queryset()), language)
+        return projection_response(self, rows, render_categories, language)
+    
+    @surrogate_keys(category_keys)
+    @conditional_response(NAMESPACE_CATEGORIES)
+    @cache_response(NAMESPACE_CATEGORIES)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
     
     @action(detail=False, methods=['get'])
+    @surrogate_keys(category_keys)
+    @conditional_response(NAMESPACE_CATEGORIES)
+    @cache_response(NAMESPACE_CATEGORIES)
     def tree(self, request):
         """Get category tree hierarchy."""
-        language = getattr(request, 'LANGUAGE_CODE', 'en')
-        categories = Category.objects.active_translations(language).filter(
-            is_active=True
-        ).select_related('parent').prefetch_related('children')
-        serializer = CategoryDetailSerializer(
+        serializer = self.get_tree_serializer(get_category_tree(), CategoryStats.objects.in_bulk())
+        return Response(serializer.data)
+    
+    def get_tree_serializer(self, tree, category_stats):
+        """Serialize active categories translated into the request language."""
+        language = getattr(self.request, 'LANGUAGE_CODE', 'en')
+        categories = [
+            node for node in tree.all(active_only=True)
+            if node.has_translation(language)
+        ]
+        return CategoryNodeDetailSerializer(
             categories,
             many=True,
-            context={'request': request}
+            context={
+                'request': self.request,
+                'tree': tree,
+                'language': language,
+                'category_stats': category_stats,
+            }
         )
-        return Response(serializer.data)
 
 
 @extend_schema_view(
-    list=extend_schema(description='List all active products'),
+    list=extend_schema(
+        description='List all active products',
+        parameters=[INCLUDE_DESCENDANTS_PARAMETER],
+    ),
     retrieve=extend_schema(description='Retrieve a product by SKU'),
 )
 class ProductViewSet(viewsets.ReadOnlyModelViewSet):
@@ -73,15 +159,20 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
     
     queryset = Product.objects.filter(is_active=True)
     lookup_field = 'id'
+    # The catalog is public; not reading the session keeps responses
+    # shareable by caches (no ``Vary: Cookie``)
+    authentication_classes = []
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
-        filters.OrderingFilter
+        ProductSearchFilter,
+        ProductOrderingFilter
     ]
+    pagination_class = ProductPagination
     filterset_fields = ['category__slug', 'is_featured', 'is_active']
-    search_fields = ['translations__name', 'translations__description', 'sku']
-    ordering_fields = ['price', 'created_at', 'stock_quantity']
+    ordering_fields = ['price', 'effective_price', 'created_at', 'stock_quantity']
     ordering = ['-created_at']
+    # Category tree snapshot of the request, read by subtree filters
+    category_tree = None
     
     def get_serializer_class(self):
         """Return appropriate serializer based on action."""
@@ -92,22 +183,31 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
     def get_queryset(self):
         """Get queryset with proper translations and filters."""
         language = getattr(self.request, 'LANGUAGE_CODE', 'en')
-        queryset = self.queryset.active_translations(language).select_related(
-            'category'
-        ).prefetch_related('images')
+        if self.action == 'facets' or (self.action == 'list' and is_single_language(self.request)):
+            # Facets and the single-language projection join translations themselves
+            queryset = self.queryset
+        elif self.action == 'retrieve':
+            queryset = self.queryset.active_translations(language).select_related(
+                'category__stats'
+            ).prefetch_related(*TRANSLATION_PREFETCHES, 'images__renditions')
+        else:
+            # The list serializer prefetches for its fragment cache misses
+            queryset = self.queryset.active_translations(language).select_related(
+                'category__stats', 'primary_image'
+            )
         
-        # Filter by category slug
+        # Filter by category slug, optionally with its whole subtree
         category_slug = self.request.query_params.get('category')
         if category_slug:
-            queryset = queryset.filter(category__slug=category_slug)
+            queryset = queryset.filter(self.get_category_filter(category_slug))
         
-        # Filter by price range
+        # Filter by the price customers pay, discounts included
         min_price = self.request.query_params.get('min_price')
         max_price = self.request.query_params.get('max_price')
         if min_price:
-            queryset = queryset.filter(price__gte=min_price)
+            queryset = queryset.filter(effective_price__gte=min_price)
         if max_price:
-            queryset = queryset.filter(price__lte=max_price)
+            queryset = queryset.filter(effective_price__lte=max_price)
         
         # Filter in-stock only
         if self.request.query_params.get('in_stock') == 'true':
@@ -115,19 +215,56 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
         
         return queryset
     
+    def get_category_filter(self, category_slug):
+        """Filter on a category, and on its descendants with include_descendants=true."""
+        if self.request.query_params.get('include_descendants') != 'true':
+            return category_filter(category_slug)
+        if self.category_tree is None:
+            self.category_tree = get_category_tree()
+        return category_filter(category_slug, self.category_tree)
+    
+    @surrogate_keys(product_list_keys)
+    @conditional_response(NAMESPACE_PRODUCTS, NAMESPACE_CATEGORIES)
+    @cache_response(NAMESPACE_PRODUCTS, NAMESPACE_CATEGORIES)
+    def list(self, request, *args, **kwargs):
+        if not is_single_language(request):
+            return super().list(request, *args, **kwargs)
+        language = getattr(request, 'LANGUAGE_CODE', 'en')
+        rows = product_rows(self.filter_queryset(self.get_queryset()), language)
+        return projection_response(self, rows, render_products, language)
+    
+    @surrogate_keys(product_detail_keys)
+    @conditional_response(NAMESPACE_PRODUCTS, NAMESPACE_CATEGORIES)
+    @cache_response(NAMESPACE_PRODUCTS, NAMESPACE_CATEGORIES)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+    
     @action(detail=False, methods=['get'])
+    @surrogate_keys(product_list_keys)
+    @conditional_response(NAMESPACE_PRODUCTS, NAMESPACE_CATEGORIES)
+    @cache_response(NAMESPACE_PRODUCTS, NAMESPACE_CATEGORIES)
     def featured(self, request):
         """Get featured products."""
         language = getattr(request, 'LANGUAGE_CODE', 'en')
         limit = int(request.query_params.get('limit', 10))
-        products = Product.objects.active_translations(language).filter(
-            is_active=True,
-            is_featured=True
-        ).select_related('category').prefetch_related('images')[:limit]
+        if is_single_language(request):
+            rows = product_rows(
+                Product.objects.filter(is_active=True, is_featured=True), language
+            )[:limit]
+            return projection_response(self, rows, render_products, language, paginate=False)
+        
+        products = self.get_featured_queryset(language)[:limit]
         serializer = self.get_serializer(products, many=True)
         return Response(serializer.data)
     
+    @extend_schema(parameters=[
+        OpenApiParameter('category_slug', OpenApiTypes.STR, required=True),
+        INCLUDE_DESCENDANTS_PARAMETER,
+    ])
     @action(detail=False, methods=['get'])
+    @surrogate_keys(product_list_keys)
+    @conditional_response(NAMESPACE_PRODUCTS, NAMESPACE_CATEGORIES)
+    @cache_response(NAMESPACE_PRODUCTS, NAMESPACE_CATEGORIES)
     def by_category(self, request):
         """Get products by category slug."""
         category_slug = request.query_params.get('category_slug')
@@ -138,9 +275,177 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
             )
         
         language = getattr(request, 'LANGUAGE_CODE', 'en')
-        products = Product.objects.active_translations(language).filter(
-            category__slug=category_slug,
-            is_active=True
-        ).select_related('category').prefetch_related('images')
+        if is_single_language(request):
+            rows = product_rows(
+                Product.objects.filter(self.get_category_filter(category_slug), is_active=True),
+                language
+            )
+            return projection_response(self, rows, render_products, language, paginate=False)
+        
+        products = self.get_category_products_queryset(language, category_slug)
         serializer = self.get_serializer(products, many=True)
         return Response(serializer.data)
+    
+    @extend_schema(
+        description=(
+            'Count the products matching the list filters per category (descendants '
+            'included), material, price range (min inclusive, max exclusive) and stock status.'
+        ),
+        responses={200: OpenApiTypes.OBJECT},
+    )
+    @action(detail=False, methods=['get'])
+    @surrogate_keys(product_list_keys)
+    @conditional_response(NAMESPACE_PRODUCTS, NAMESPACE_CATEGORIES)
+    @cache_response(NAMESPACE_PRODUCTS, NAMESPACE_CATEGORIES, ignored_params=FACET_IGNORED_PARAMS)
+    def facets(self, request):
+        """Get filter facet counts."""
+        language = getattr(request, 'LANGUAGE_CODE', 'en')
+        return Response(get_facets(self.filter_queryset(self.get_queryset()), language))
+    
+    @extend_schema(
+        description=(
+            'Stream the catalog in the request language as JSON Lines, CSV or a '
+            'Google Merchant RSS feed. With since, every product updated after that '
+            'time, deactivated ones included, and the products deleted since then; '
+            'the X-Export-Cutoff header holds the since of the next incremental export. '
+            'Deletions are kept for EXPORT_TOMBSTONE_RETENTION days; older since values '
+            'need a full export.'
+        ),
+        parameters=[
+            OpenApiParameter('output', enum=EXPORT_FORMATS, default=FORMAT_JSONL),
+            OpenApiParameter('since', OpenApiTypes.DATETIME),
+        ],
+        responses={200: OpenApiTypes.BINARY},
+    )
+    @action(detail=False, methods=['get'], content_negotiation_class=ExportContentNegotiation)
+    @surrogate_keys(product_list_keys)
+    def export(self, request):
+        """Stream a product feed export."""
+        file_format = request.query_params.get('output', FORMAT_JSONL)
+        if file_format not in EXPORT_FORMATS:
+            return Response(
+                {'error': f'output must be one of {", ".join(EXPORT_FORMATS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        since = request.query_params.get('since')
+        if since:
+            try:
+                since = parse_since(since)
+            except ValueError as exc:
+                return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        language = getattr(request, 'LANGUAGE_CODE', 'en')
+        return export_response(request, file_format, language, since or None)
+    
+    def get_featured_queryset(self, language):
+        return self.get_list_queryset(language).filter(is_featured=True)
+    
+    def get_category_products_queryset(self, language, category_slug):
+        return self.get_list_queryset(language).filter(self.get_category_filter(category_slug))
+    
+    def get_list_queryset(self, language):
+        """Active products with what the list serializer expects to be selected."""
+        return Product.objects.active_translations(language).filter(
+            is_active=True
+        ).select_related('category__stats', 'primary_image')
+
+
+@extend_schema_view(
+    create=extend_schema(
+        description=(
+            'Hold stock of a product for checkout. The hold expires after '
+            'RESERVATION_TTL_SECONDS unless confirmed; 409 when not enough is left.'
+        ),
+    ),
+    retrieve=extend_schema(description='Retrieve a reservation by id'),
+)
+class ReservationViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    ViewSet for stock reservations.
+    Anyone may place a hold; its random id is the handle to release it.
+    """
+    
+    queryset = StockReservation.objects.all()
+    serializer_class = StockReservationSerializer
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'reservations'
+    
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            reservation = reservations.reserve(
+                serializer.validated_data['product_id'],
+                serializer.validated_data['quantity']
+            )
+        except reservations.ProductUnavailable as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_404_NOT_FOUND)
+        except reservations.InsufficientStock as exc:
+            return Response(
+                {'error': str(exc), 'available': exc.available},
+                status=status.HTTP_409_CONFLICT
+            )
+        return Response(self.get_serializer(reservation).data, status=status.HTTP_201_CREATED)
+    
+    @extend_schema(request=None, responses={200: StockReservationSerializer})
+    @action(detail=True, methods=['post'], permission_classes=[permissions.IsAdminUser])
+    def confirm(self, request, pk=None):
+        """Confirm a hold once the order is paid. Staff only."""
+        return self.change(reservations.confirm)
+    
+    @extend_schema(request=None, responses={200: StockReservationSerializer})
+    @action(detail=True, methods=['post'])
+    def release(self, request, pk=None):
+        """Release a hold and return its stock."""
+        return self.change(reservations.release)
+    
+    def change(self, operation):
+        try:
+            reservation = operation(self.get_object().pk)
+        except reservations.ReservationNotHeld as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_409_CONFLICT)
+        return Response(self.get_serializer(reservation).data)
+
+
+@extend_schema(exclude=True)
+class DatabasePoolView(APIView):
+    """
+    Connection pool statistics of the worker serving the request.
+    Staff only; poll repeatedly to sample every worker.
+    """
+    
+    permission_classes = [permissions.IsAdminUser]
+    
+    def get(self, request):
+        return Response(get_pool_stats())
+
+
+@extend_schema(exclude=True)
+class ProfilingView(APIView):
+    """
+    Request profiling status and the slow queries of the worker serving the request.
+    Staff only; POST ``{"enabled": true|false}`` switches profiling in every worker.
+    """
+    
+    permission_classes = [permissions.IsAdminUser]
+    
+    def get(self, request):
+        return Response(self.get_status())
+    
+    def post(self, request):
+        enabled = request.data.get('enabled')
+        if not isinstance(enabled, bool):
+            return Response(
+                {'error': 'enabled must be true or false'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        profiling.set_enabled(enabled)
+        return Response(self.get_status())
+    
+    @staticmethod
+    def get_status():
+        return {
+            'enabled': profiling.is_enabled(),
+            'slow_query_ms': settings.PROFILING_SLOW_QUERY_MS,
+            'slow_queries': list(profiling.slow_queries),
+        }
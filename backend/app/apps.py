@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'backend.app'
+
+    def ready(self):
+        # Register signal handlers
+        from backend.app import signals  # noqa: F401
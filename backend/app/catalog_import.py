@@ -0,0 +1,338 @@
+"""
+Bulk catalog import from CSV or JSON Lines.
+
+Records are streamed from the file and handled in chunks. Every record of a
+chunk is validated on its own; the valid ones are then upserted in one
+transaction with a single ``INSERT ... ON CONFLICT DO UPDATE`` per table
+(categories or products, then their translations), so a chunk costs a
+handful of statements however many rows it holds. Records are matched on
+``slug`` (categories) and ``sku`` (products); translations on their language.
+
+JSON Lines records look like::
+
+    {"sku": "R-100", "category": "rings", "price": "120.00",
+     "translations": {"en": {"name": "Ring", "description": "..."}}}
+
+CSV files use one column per field and ``<field>_<language>`` columns for
+translations (``name_en``, ``description_de``, ...). Categories take
+``slug``, ``parent`` (a slug), ``order`` and ``is_active``; products take
+``sku``, ``category`` (a slug) and the other product fields. Categories must
+exist before products referencing them are imported.
+
+Model signals do not run for bulk writes. Search documents are refreshed per
+chunk; category statistics and the category tree are rebuilt once at the end,
+and ``catalog_imported`` is sent so response caches are retired.
+"""
+import csv
+import json
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.dispatch import Signal
+
+from backend.app.category_stats import rebuild_category_stats
+from backend.app.category_tree import invalidate_category_tree
+from backend.app.models import Category, Product
+from backend.app.search import update_search_documents
+
+# Sent with ``kind`` and ``count`` (records written) after an import
+catalog_imported = Signal()
+
+KIND_CATEGORIES = 'categories'
+KIND_PRODUCTS = 'products'
+
+FORMATS = ('csv', 'jsonl')
+
+CATEGORY_FIELDS = ('is_active', 'order')
+PRODUCT_FIELDS = (
+    'price', 'discount_price', 'stock_quantity', 'is_active', 'is_featured', 'weight', 'material',
+)
+
+TRUE_VALUES = {'1', 'true', 't', 'yes', 'y'}
+FALSE_VALUES = {'0', 'false', 'f', 'no', 'n'}
+
+
+class RecordError(ValueError):
+    """A record that cannot be imported."""
+
+
+def get_format(path):
+    """Guess the format from the file extension."""
+    extension = str(path).rsplit('.', 1)[-1].lower()
+    return 'jsonl' if extension in ('jsonl', 'ndjson') else extension
+
+
+def read_records(path, file_format):
+    """
+    Yield ``(line, data)`` for every record of a file.
+
+    ``data`` is a dict shaped like a JSON Lines record, or a RecordError for
+    lines that cannot be decoded.
+    """
+    languages = [code for code, _ in settings.LANGUAGES]
+    with open(path, newline='', encoding='utf-8') as fp:
+        if file_format == 'csv':
+            reader = csv.DictReader(fp)
+            for row in reader:
+                yield reader.line_num, csv_record(row, languages)
+            return
+        for line, text in enumerate(fp, 1):
+            if not text.strip():
+                continue
+            try:
+                data = json.loads(text)
+            except ValueError as exc:
+                yield line, RecordError(f'Invalid JSON: {exc}')
+                continue
+            if not isinstance(data, dict):
+                yield line, RecordError('A record must be a JSON object')
+                continue
+            yield line, data
+
+
+def csv_record(row, languages):
+    """Turn a CSV row into a JSON Lines record, grouping ``<field>_<language>`` columns."""
+    record = {}
+    translations = {}
+    for column, value in row.items():
+        if column is None:
+            continue
+        name, _, suffix = column.rpartition('_')
+        if name and suffix in languages:
+            if value:
+                translations.setdefault(suffix, {})[name] = value
+        else:
+            record[column] = value
+    record['translations'] = translations
+    return record
+
+
+def parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValueError(f'"{value}" is not a boolean')
+
+
+def clean_value(model, name, value):
+    """Validate a value for a model field, applying the field default when it is missing."""
+    model_field = model._meta.get_field(name)
+    if value is None or value == '':
+        if model_field.null:
+            return None
+        if model_field.has_default():
+            return model_field.get_default()
+        if model_field.blank:
+            return ''
+        raise RecordError(f'{name} is required')
+    try:
+        if isinstance(model_field, models.BooleanField):
+            return parse_bool(value)
+        if isinstance(value, float):
+            # Avoid binary float artifacts in decimal fields
+            value = Decimal(str(value))
+        return model_field.clean(value, None)
+    except (ValueError, ValidationError) as exc:
+        messages = exc.messages if isinstance(exc, ValidationError) else [str(exc)]
+        raise RecordError(f'{name}: {" ".join(messages)}')
+
+
+def clean_translations(model, data):
+    """Validate the ``translations`` mapping of a record."""
+    translations = data.get('translations')
+    if not isinstance(translations, dict) or not translations:
+        raise RecordError('At least one translation is required')
+    languages = {code for code, _ in settings.LANGUAGES}
+    translation_model = model._parler_meta.root_model
+    fields = model._parler_meta.get_translated_fields()
+    cleaned = {}
+    for language, values in translations.items():
+        if language not in languages:
+            raise RecordError(f'Unsupported language "{language}"')
+        if not isinstance(values, dict):
+            raise RecordError(f'Translation "{language}" must be an object')
+        cleaned[language] = {
+            name: clean_value(translation_model, name, values.get(name)) for name in fields
+        }
+    return cleaned
+
+
+def clean_category(data):
+    slug = clean_value(Category, 'slug', data.get('slug'))
+    return {
+        'slug': slug,
+        'parent': data.get('parent') or None,
+        'values': {name: clean_value(Category, name, data.get(name)) for name in CATEGORY_FIELDS},
+        'translations': clean_translations(Category, data),
+    }
+
+
+def clean_product(data):
+    sku = clean_value(Product, 'sku', data.get('sku'))
+    category = data.get('category')
+    if not category:
+        raise RecordError('category is required')
+    return {
+        'sku': sku,
+        'category': category,
+        'values': {name: clean_value(Product, name, data.get(name)) for name in PRODUCT_FIELDS},
+        'translations': clean_translations(Product, data),
+    }
+
+
+CLEANERS = {KIND_CATEGORIES: clean_category, KIND_PRODUCTS: clean_product}
+
+
+@dataclass
+class ChunkResult:
+    created: int = 0
+    updated: int = 0
+    errors: list = field(default_factory=list)
+
+
+def upsert_translations(model, objects, records):
+    """Insert or update the translations of upserted objects."""
+    translation_model = model._parler_meta.root_model
+    fields = model._parler_meta.get_translated_fields()
+    translation_model.objects.bulk_create(
+        [
+            translation_model(master_id=obj.pk, language_code=language, **values)
+            for obj, record in zip(objects, records)
+            for language, values in record['translations'].items()
+        ],
+        update_conflicts=True,
+        unique_fields=['language_code', 'master'],
+        update_fields=fields,
+    )
+
+
+def import_categories(records, category_ids):
+    """
+    Upsert a chunk of cleaned category records.
+
+    Parents are resolved through ``category_ids`` (slug to id, updated in
+    place) and may appear earlier in the same chunk; categories are written
+    level by level so parents always get their id first.
+    """
+    result = ChunkResult()
+    by_slug = {record['slug']: (line, record) for line, record in records}
+    existing = set(Category.objects.filter(slug__in=by_slug).values_list('slug', flat=True))
+    missing_parents = {
+        record['parent'] for _, record in by_slug.values()
+        if record['parent'] and record['parent'] not in category_ids
+    } - by_slug.keys()
+    category_ids.update(Category.objects.filter(slug__in=missing_parents).values_list('slug', 'pk'))
+
+    pending = dict(by_slug)
+    while pending:
+        level = [
+            (line, record) for line, record in pending.values()
+            if not record['parent'] or record['parent'] in category_ids
+        ]
+        if not level:
+            break
+        categories = Category.objects.bulk_create(
+            [
+                Category(
+                    slug=record['slug'],
+                    parent_id=category_ids.get(record['parent']),
+                    **record['values'],
+                )
+                for _, record in level
+            ],
+            update_conflicts=True,
+            unique_fields=['slug'],
+            update_fields=['parent', *CATEGORY_FIELDS, 'updated_at'],
+        )
+        upsert_translations(Category, categories, [record for _, record in level])
+        for category in categories:
+            category_ids[category.slug] = category.pk
+            del pending[category.slug]
+            if category.slug in existing:
+                result.updated += 1
+            else:
+                result.created += 1
+
+    for line, record in pending.values():
+        result.errors.append((line, f'Unknown parent category "{record["parent"]}"'))
+    return result
+
+
+def import_products(records, category_ids):
+    """Upsert a chunk of cleaned product records and refresh their search documents."""
+    result = ChunkResult()
+    missing = {record['category'] for _, record in records} - category_ids.keys()
+    category_ids.update(Category.objects.filter(slug__in=missing).values_list('slug', 'pk'))
+
+    valid = []
+    for line, record in records:
+        if record['category'] in category_ids:
+            valid.append(record)
+        else:
+            result.errors.append((line, f'Unknown category "{record["category"]}"'))
+    if not valid:
+        return result
+
+    existing = set(
+        Product.objects.filter(sku__in=[record['sku'] for record in valid]).values_list('sku', flat=True)
+    )
+    products = Product.objects.bulk_create(
+        [
+            Product(sku=record['sku'], category_id=category_ids[record['category']], **record['values'])
+            for record in valid
+        ],
+        update_conflicts=True,
+        unique_fields=['sku'],
+        update_fields=['category', *PRODUCT_FIELDS, 'updated_at'],
+    )
+    upsert_translations(Product, products, valid)
+    update_search_documents(product_ids=[product.pk for product in products])
+    result.updated = len(existing)
+    result.created = len(products) - result.updated
+    return result
+
+
+IMPORTERS = {KIND_CATEGORIES: import_categories, KIND_PRODUCTS: import_products}
+
+
+def import_chunk(kind, chunk, category_ids):
+    """
+    Validate and upsert a chunk of ``(line, data)`` records in one transaction.
+
+    Records repeating a key within the chunk override the earlier ones.
+    """
+    clean = CLEANERS[kind]
+    key = 'slug' if kind == KIND_CATEGORIES else 'sku'
+    cleaned = {}
+    errors = []
+    for line, data in chunk:
+        try:
+            if isinstance(data, RecordError):
+                raise data
+            record = clean(data)
+        except RecordError as exc:
+            errors.append((line, str(exc)))
+            continue
+        cleaned.pop(record[key], None)
+        cleaned[record[key]] = (line, record)
+
+    with transaction.atomic():
+        result = IMPORTERS[kind](list(cleaned.values()), category_ids)
+    result.errors = sorted(errors + result.errors)
+    return result
+
+
+def finish_import(kind, count):
+    """Rebuild the data signals would have maintained and retire cached responses."""
+    with transaction.atomic():
+        rebuild_category_stats()
+        if kind == KIND_CATEGORIES:
+            invalidate_category_tree()
+        catalog_imported.send(sender=None, kind=kind, count=count)
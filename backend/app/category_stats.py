@@ -0,0 +1,136 @@
+"""
+Maintenance of the denormalized CategoryStats counters.
+
+Signal handlers translate model changes into counter deltas that are applied
+with ``UPDATE ... SET x = x + n`` statements, so a single product save only
+touches its own category and that category's ancestors.
+``rebuild_category_stats`` recomputes everything from scratch and is meant
+for bulk changes that bypass model signals (``QuerySet.update``, imports).
+"""
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from backend.app.models import Category, CategoryStats, Product
+
+COUNTER_FIELDS = (
+    'active_children_count',
+    'active_products_count',
+    'descendant_products_count',
+    'in_stock_products_count',
+)
+
+
+def product_contribution(is_active, stock_quantity):
+    """Return the (active, in_stock) counters a single product contributes."""
+    if not is_active:
+        return 0, 0
+    return 1, int(stock_quantity > 0)
+
+
+def get_category_chain(category_id):
+    """Return the category id followed by the ids of all its ancestors."""
+    chain = []
+    while category_id is not None and category_id not in chain:
+        chain.append(category_id)
+        category_id = Category.objects.filter(pk=category_id).values_list(
+            'parent_id', flat=True
+        ).first()
+    return chain
+
+
+def apply_product_delta(category_id, active, in_stock):
+    """Shift product counters of a category (and its ancestors) by a delta."""
+    if not active and not in_stock:
+        return
+    now = timezone.now()
+    CategoryStats.objects.filter(pk=category_id).update(
+        active_products_count=F('active_products_count') + active,
+        in_stock_products_count=F('in_stock_products_count') + in_stock,
+        updated_at=now,
+    )
+    if active:
+        apply_descendant_delta(get_category_chain(category_id), active, now=now)
+
+
+def apply_descendant_delta(category_ids, delta, now=None):
+    """Shift descendant product counters of the given categories by a delta."""
+    if not delta or not category_ids:
+        return
+    CategoryStats.objects.filter(pk__in=category_ids).update(
+        descendant_products_count=F('descendant_products_count') + delta,
+        updated_at=now or timezone.now(),
+    )
+
+
+def apply_children_delta(category_id, delta):
+    """Shift the active children counter of a category by a delta."""
+    if not delta or category_id is None:
+        return
+    CategoryStats.objects.filter(pk=category_id).update(
+        active_children_count=F('active_children_count') + delta,
+        updated_at=timezone.now(),
+    )
+
+
+def compute_category_stats(categories, product_counts):
+    """
+    Compute counters for every category in memory.
+
+    ``categories`` yields ``(id, parent_id, is_active)`` tuples and
+    ``product_counts`` yields ``(category_id, active, in_stock)`` tuples
+    for active products. Returns ``{category_id: {counter: value}}``.
+    """
+    parents = {}
+    stats = {}
+    for category_id, parent_id, is_active in categories:
+        parents[category_id] = parent_id
+        stats[category_id] = dict.fromkeys(COUNTER_FIELDS, 0)
+
+    for category_id, parent_id, is_active in categories:
+        if is_active and parent_id in stats:
+            stats[parent_id]['active_children_count'] += 1
+
+    for category_id, active, in_stock in product_counts:
+        if category_id not in stats:
+            continue
+        stats[category_id]['active_products_count'] = active
+        stats[category_id]['in_stock_products_count'] = in_stock
+        seen = set()
+        while category_id in stats and category_id not in seen:
+            seen.add(category_id)
+            stats[category_id]['descendant_products_count'] += active
+            category_id = parents[category_id]
+
+    return stats
+
+
+def rebuild_category_stats():
+    """Recompute all category counters with two aggregate queries."""
+    categories = list(Category.objects.values_list('id', 'parent_id', 'is_active'))
+    product_counts = (
+        Product.objects.filter(is_active=True)
+        .order_by()
+        .values('category_id')
+        .annotate(
+            active=Count('id'),
+            in_stock=Count('id', filter=Q(stock_quantity__gt=0)),
+        )
+        .values_list('category_id', 'active', 'in_stock')
+    )
+    stats = compute_category_stats(categories, product_counts)
+
+    now = timezone.now()
+    rows = [
+        CategoryStats(category_id=category_id, updated_at=now, **counters)
+        for category_id, counters in stats.items()
+    ]
+    with transaction.atomic():
+        CategoryStats.objects.bulk_create(
+            rows,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['category'],
+            update_fields=[*COUNTER_FIELDS, 'updated_at'],
+        )
+    return len(rows)
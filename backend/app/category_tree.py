@@ -0,0 +1,236 @@
+"""
+Process-wide, immutable snapshot of the category hierarchy.
+
+The snapshot is built from a single query. Nodes are numbered by a pre-order
+walk (nested set), so ancestors, children and descendants of any category are
+served from memory without touching the database.
+
+Every snapshot carries the version token it was built for. The current token
+lives in the Django cache and is replaced whenever a category or one of its
+translations changes; each process compares tokens on access and rebuilds its
+snapshot lazily. Cross-process invalidation therefore requires a shared cache
+backend.
+"""
+import threading
+import uuid
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from parler.utils.i18n import get_active_language_choices
+
+from backend.app.models import Category
+
+VERSION_CACHE_KEY = 'catalog:category_tree:version'
+
+_snapshot = None
+_lock = threading.Lock()
+
+
+@dataclass(frozen=True, eq=False)
+class CategoryNode:
+    """A single category inside a tree snapshot."""
+
+    id: int
+    parent_id: int | None
+    slug: str
+    is_active: bool
+    order: int
+    created_at: object
+    updated_at: object
+    translations: MappingProxyType
+    ancestor_ids: tuple
+    children_ids: tuple
+    lft: int
+    rgt: int
+
+    def has_translation(self, language_code):
+        """Check whether the node has a translation for the language or its fallbacks."""
+        return any(code in self.translations for code in get_active_language_choices(language_code))
+
+    def get_translation(self, language_code):
+        """Return translated fields for the language, falling back like parler does."""
+        for code in get_active_language_choices(language_code):
+            if code in self.translations:
+                return self.translations[code]
+        return next(iter(self.translations.values()), {})
+
+
+class CategoryTree:
+    """Immutable category hierarchy with O(1) node, path and subtree lookups."""
+
+    def __init__(self, nodes, version):
+        self.version = version
+        self._nodes = nodes
+        self._by_slug = {node.slug: node for node in nodes.values()}
+        self._preorder = tuple(sorted(
+            (node for node in nodes.values() if node.lft >= 0),
+            key=lambda node: node.lft
+        ))
+        self._ordered = tuple(sorted(nodes.values(), key=lambda node: (node.order, node.id)))
+
+    def __contains__(self, category_id):
+        return category_id in self._nodes
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def get(self, category_id):
+        return self._nodes.get(category_id)
+
+    def get_by_slug(self, slug):
+        return self._by_slug.get(slug)
+
+    def all(self, active_only=False):
+        """Return all nodes in the default category ordering."""
+        return [node for node in self._ordered if node.is_active or not active_only]
+
+    def roots(self, active_only=False):
+        return [
+            node for node in self._ordered
+            if node.parent_id is None and (node.is_active or not active_only)
+        ]
+
+    def children(self, category_id, active_only=False):
+        node = self._nodes[category_id]
+        children = (self._nodes[child_id] for child_id in node.children_ids)
+        return [child for child in children if child.is_active or not active_only]
+
+    def ancestors(self, category_id):
+        """Return ancestors of a category, root first."""
+        return [self._nodes[ancestor_id] for ancestor_id in self._nodes[category_id].ancestor_ids]
+
+    def descendants(self, category_id, active_only=False):
+        """Return all descendants of a category in pre-order."""
+        node = self._nodes[category_id]
+        if node.lft < 0:
+            return []
+        subtree = self._preorder[node.lft + 1:node.rgt]
+        return [child for child in subtree if child.is_active or not active_only]
+
+    def descendant_ids(self, category_id, include_self=False, active_only=False):
+        ids = [node.id for node in self.descendants(category_id, active_only=active_only)]
+        if include_self:
+            ids.insert(0, category_id)
+        return ids
+
+    def full_path(self, category_id, language_code):
+        """Get full category path (e.g., Parent > Child > Current)."""
+        path = [*self.ancestors(category_id), self._nodes[category_id]]
+        return ' > '.join(node.get_translation(language_code).get('name', '') for node in path)
+
+
+def build_category_tree(version=None):
+    """Build a new snapshot from a single query over categories and translations."""
+    translated_fields = Category._parler_meta.get_translated_fields()
+    # Snapshots live until the next category change, so never read a lagging replica
+    rows = Category.objects.using(DEFAULT_DB_ALIAS).order_by('order', 'id', 'translations__id').values_list(
+        'id', 'parent_id', 'slug', 'is_active', 'order', 'created_at', 'updated_at',
+        'translations__language_code',
+        *[f'translations__{field}' for field in translated_fields]
+    )
+
+    categories = {}
+    translations = {}
+    for pk, parent_id, slug, is_active, order, created_at, updated_at, language_code, *values in rows:
+        if pk not in categories:
+            categories[pk] = (parent_id, slug, is_active, order, created_at, updated_at)
+            translations[pk] = {}
+        if language_code is not None:
+            translations[pk][language_code] = MappingProxyType(dict(zip(translated_fields, values)))
+
+    children = {pk: [] for pk in categories}
+    roots = []
+    for pk, (parent_id, *_) in categories.items():
+        if parent_id in children:
+            children[parent_id].append(pk)
+        else:
+            roots.append(pk)
+
+    # Iterative pre-order walk assigning nested-set bounds; nodes caught in a
+    # parent cycle are unreachable from the roots and keep lft == rgt == -1.
+    bounds = {}
+    ancestors = {}
+    counter = 0
+    stack = [(pk, (), False) for pk in reversed(roots)]
+    while stack:
+        pk, path, visited = stack.pop()
+        if visited:
+            bounds[pk] = (bounds[pk][0], counter)
+            continue
+        bounds[pk] = (counter, counter)
+        ancestors[pk] = path
+        counter += 1
+        stack.append((pk, path, True))
+        for child_id in reversed(children[pk]):
+            if child_id not in bounds:
+                stack.append((child_id, (*path, pk), False))
+
+    nodes = {}
+    for pk, (parent_id, slug, is_active, order, created_at, updated_at) in categories.items():
+        lft, rgt = bounds.get(pk, (-1, -1))
+        nodes[pk] = CategoryNode(
+            id=pk,
+            parent_id=parent_id,
+            slug=slug,
+            is_active=is_active,
+            order=order,
+            created_at=created_at,
+            updated_at=updated_at,
+            translations=MappingProxyType(translations[pk]),
+            ancestor_ids=ancestors.get(pk, ()),
+            children_ids=tuple(children[pk]),
+            lft=lft,
+            rgt=rgt,
+        )
+    return CategoryTree(nodes, version)
+
+
+def get_tree_version():
+    """Return the current version token, creating one if the cache lost it."""
+    version = cache.get(VERSION_CACHE_KEY)
+    if version is None:
+        cache.add(VERSION_CACHE_KEY, uuid.uuid4().hex, timeout=None)
+        version = cache.get(VERSION_CACHE_KEY)
+    return version
+
+
+def get_category_tree():
+    """Return the snapshot for the current version, rebuilding it if stale."""
+    global _snapshot
+    version = get_tree_version()
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+    with _lock:
+        snapshot = _snapshot
+        if snapshot is None or snapshot.version != version:
+            snapshot = build_category_tree(version)
+            _snapshot = snapshot
+    return snapshot
+
+
+async def aget_category_tree():
+    """
+    Async counterpart of ``get_category_tree``.
+
+    The version check uses the async cache API; rebuilding a stale snapshot
+    runs in a worker thread.
+    """
+    version = await cache.aget(VERSION_CACHE_KEY)
+    snapshot = _snapshot
+    if version is not None and snapshot is not None and snapshot.version == version:
+        return snapshot
+    return await sync_to_async(get_category_tree)()
+
+
+def invalidate_category_tree():
+    """Publish a new version token once the current transaction commits."""
+    def bump():
+        global _snapshot
+        cache.set(VERSION_CACHE_KEY, uuid.uuid4().hex, timeout=None)
+        _snapshot = None
+
+    transaction.on_commit(bump)
@@ -0,0 +1,205 @@
+"""
+Product image rendition pipeline.
+
+Every uploaded ProductImage is decoded once, measured, summarised as a
+BlurHash placeholder and re-encoded into several widths per configured
+format (WebP and AVIF by default). Formats the installed Pillow cannot
+encode are skipped.
+
+Pillow is imported on first use: web workers load this module for
+``renditions_generated`` only.
+"""
+import io
+import math
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.dispatch import Signal
+
+from backend.app.models import ProductImage, ProductImageRendition
+
+DEFAULT_RENDITION_WIDTHS = [320, 640, 960, 1280]
+DEFAULT_RENDITION_FORMATS = [
+    ProductImageRendition.FORMAT_WEBP,
+    ProductImageRendition.FORMAT_AVIF,
+]
+DEFAULT_RENDITION_QUALITY = {
+    ProductImageRendition.FORMAT_WEBP: 80,
+    ProductImageRendition.FORMAT_AVIF: 60,
+}
+
+# Sent with the ProductImage as ``instance`` after its renditions were replaced
+renditions_generated = Signal()
+
+BLURHASH_COMPONENTS = (4, 3)
+BLURHASH_SAMPLE_SIZE = 32
+BASE83_CHARACTERS = (
+    '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    'abcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~'
+)
+
+
+def get_rendition_widths():
+    return sorted(getattr(settings, 'PRODUCT_IMAGE_RENDITION_WIDTHS', DEFAULT_RENDITION_WIDTHS))
+
+
+def get_rendition_formats():
+    """Return configured formats that the installed Pillow can encode."""
+    from PIL import features
+
+    formats = getattr(settings, 'PRODUCT_IMAGE_RENDITION_FORMATS', DEFAULT_RENDITION_FORMATS)
+    return [fmt for fmt in formats if features.check(fmt)]
+
+
+def get_rendition_quality(fmt):
+    quality = getattr(settings, 'PRODUCT_IMAGE_RENDITION_QUALITY', DEFAULT_RENDITION_QUALITY)
+    return quality.get(fmt, 80)
+
+
+def _encode_base83(value, length):
+    result = ''
+    for i in range(1, length + 1):
+        digit = (value // 83 ** (length - i)) % 83
+        result += BASE83_CHARACTERS[digit]
+    return result
+
+
+def _srgb_to_linear(value):
+    value = value / 255
+    if value <= 0.04045:
+        return value / 12.92
+    return ((value + 0.055) / 1.055) ** 2.4
+
+
+def _linear_to_srgb(value):
+    value = max(0.0, min(1.0, value))
+    if value <= 0.0031308:
+        return int(value * 12.92 * 255 + 0.5)
+    return int((1.055 * value ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def _sign_pow(value, exponent):
+    return math.copysign(abs(value) ** exponent, value)
+
+
+def encode_blurhash(image, components=BLURHASH_COMPONENTS):
+    """Encode a Pillow image as a BlurHash string (https://blurha.sh)."""
+    x_components, y_components = components
+    sample = image.convert('RGB')
+    sample.thumbnail((BLURHASH_SAMPLE_SIZE, BLURHASH_SAMPLE_SIZE))
+    width, height = sample.size
+    pixels = [
+        (_srgb_to_linear(r), _srgb_to_linear(g), _srgb_to_linear(b))
+        for r, g, b in sample.getdata()
+    ]
+
+    factors = []
+    for j in range(y_components):
+        cos_y = [math.cos(math.pi * j * y / height) for y in range(height)]
+        for i in range(x_components):
+            cos_x = [math.cos(math.pi * i * x / width) for x in range(width)]
+            normalisation = 1 if i == 0 and j == 0 else 2
+            r = g = b = 0.0
+            for y in range(height):
+                row = y * width
+                for x in range(width):
+                    basis = cos_x[x] * cos_y[y]
+                    pr, pg, pb = pixels[row + x]
+                    r += basis * pr
+                    g += basis * pg
+                    b += basis * pb
+            scale = normalisation / (width * height)
+            factors.append((r * scale, g * scale, b * scale))
+
+    dc, ac = factors[0], factors[1:]
+    result = _encode_base83((x_components - 1) + (y_components - 1) * 9, 1)
+
+    if ac:
+        actual_max = max(abs(value) for factor in ac for value in factor)
+        quantised_max = max(0, min(82, int(math.floor(actual_max * 166 - 0.5))))
+        max_value = (quantised_max + 1) / 166
+        result += _encode_base83(quantised_max, 1)
+    else:
+        max_value = 1
+        result += _encode_base83(0, 1)
+
+    dc_value = (_linear_to_srgb(dc[0]) << 16) + (_linear_to_srgb(dc[1]) << 8) + _linear_to_srgb(dc[2])
+    result += _encode_base83(dc_value, 4)
+
+    for factor in ac:
+        r, g, b = (
+            max(0, min(18, int(math.floor(_sign_pow(value / max_value, 0.5) * 9 + 9.5))))
+            for value in factor
+        )
+        result += _encode_base83(r * 19 * 19 + g * 19 + b, 2)
+
+    return result
+
+
+def _load_original(product_image):
+    from PIL import Image, ImageOps
+
+    with product_image.image.open('rb') as fp:
+        original = Image.open(fp)
+        original.load()
+    original = ImageOps.exif_transpose(original)
+    if original.mode not in ('RGB', 'RGBA'):
+        has_alpha = original.mode in ('LA', 'PA') or 'transparency' in original.info
+        original = original.convert('RGBA' if has_alpha else 'RGB')
+    return original
+
+
+def _render(original, fmt, width):
+    from PIL import Image
+
+    height = max(1, round(original.height * width / original.width))
+    resized = original if width == original.width else original.resize(
+        (width, height), Image.Resampling.LANCZOS
+    )
+    buffer = io.BytesIO()
+    resized.save(buffer, format=fmt.upper(), quality=get_rendition_quality(fmt))
+    return height, buffer.getvalue()
+
+
+def generate_renditions(product_image):
+    """
+    (Re)generate renditions, dimensions and placeholder for a product image.
+
+    Returns the number of renditions written.
+    """
+    original = _load_original(product_image)
+    configured_widths = get_rendition_widths()
+    widths = [width for width in configured_widths if width < original.width]
+    if len(widths) < len(configured_widths):
+        # Never upscale: images narrower than the largest width keep their own
+        widths.append(original.width)
+
+    stem = PurePosixPath(product_image.image.name).stem
+    renditions = []
+    for fmt in get_rendition_formats():
+        for width in widths:
+            height, content = _render(original, fmt, width)
+            rendition = ProductImageRendition(
+                image=product_image,
+                format=fmt,
+                width=width,
+                height=height,
+            )
+            rendition.file.save(f'{stem}-{width}w.{fmt}', ContentFile(content), save=False)
+            renditions.append(rendition)
+
+    placeholder = encode_blurhash(original)
+    with transaction.atomic():
+        # Deleting row by row lets the post_delete handler remove stale files
+        for stale in product_image.renditions.all():
+            stale.delete()
+        ProductImageRendition.objects.bulk_create(renditions)
+        ProductImage.objects.filter(pk=product_image.pk).update(
+            width=original.width,
+            height=original.height,
+            placeholder=placeholder,
+        )
+    renditions_generated.send(sender=ProductImage, instance=product_image)
+    return len(renditions)
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+
+from backend.app.images import generate_renditions
+from backend.app.models import ProductImage
+from backend.app.tasks import generate_product_image_renditions
+
+
+class Command(BaseCommand):
+    help = 'Regenerate product image renditions, placeholders and dimensions.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sku',
+            action='append',
+            default=[],
+            help='Only process images of the given product SKU (repeatable).',
+        )
+        parser.add_argument(
+            '--missing',
+            action='store_true',
+            help='Only process images that have no renditions yet.',
+        )
+        parser.add_argument(
+            '--sync',
+            action='store_true',
+            help='Generate renditions in this process instead of queueing Celery tasks.',
+        )
+
+    def handle(self, *args, **options):
+        images = ProductImage.objects.order_by('pk')
+        if options['sku']:
+            images = images.filter(product__sku__in=options['sku'])
+        if options['missing']:
+            images = images.filter(renditions__isnull=True)
+
+        processed = 0
+        for image in images.iterator(chunk_size=500):
+            if options['sync']:
+                count = generate_renditions(image)
+                self.stdout.write(f'{image.image.name}: {count} renditions')
+            else:
+                generate_product_image_renditions.delay(image.pk)
+            processed += 1
+
+        action = 'Processed' if options['sync'] else 'Queued'
+        self.stdout.write(self.style.SUCCESS(f'{action} {processed} images.'))
@@ -0,0 +1,142 @@
+import itertools
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.app.catalog_import import (
+    FORMATS,
+    KIND_CATEGORIES,
+    KIND_PRODUCTS,
+    finish_import,
+    get_format,
+    import_chunk,
+    read_records,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Import categories or products with their translations from a CSV or JSON Lines file, '
+        'upserting by slug or SKU in batches.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or JSON Lines (.jsonl) file.')
+        parser.add_argument('--type', choices=(KIND_CATEGORIES, KIND_PRODUCTS), default=KIND_PRODUCTS)
+        parser.add_argument('--format', choices=FORMATS, help='Defaults to the file extension.')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Records validated and written per transaction.',
+        )
+        parser.add_argument('--errors', help='Write rejected records as JSON Lines to this file.')
+        parser.add_argument(
+            '--max-errors',
+            type=int,
+            help='Stop once more records than this have been rejected.',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Skip the records committed by a previous run of the same file.',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Progress file used by --resume (default: <path>.checkpoint.json).',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        kind = options['type']
+        file_format = options['format'] or get_format(path)
+        if file_format not in FORMATS:
+            raise CommandError(f'Unknown format "{file_format}", use --format.')
+        if not os.path.isfile(path):
+            raise CommandError(f'{path} does not exist.')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive.')
+
+        checkpoint_path = options['checkpoint'] or f'{path}.checkpoint.json'
+        source = self.get_source(path, kind)
+        progress = {'records': 0, 'created': 0, 'updated': 0, 'rejected': 0}
+        if options['resume']:
+            progress = self.load_checkpoint(checkpoint_path, source) or progress
+            if progress['records']:
+                self.stdout.write(f"Resuming after {progress['records']} records.")
+
+        records = itertools.islice(read_records(path, file_format), progress['records'], None)
+        errors = open(options['errors'], 'a' if options['resume'] else 'w') if options['errors'] else None
+        category_ids = {}
+        written = 0
+        started = time.perf_counter()
+        try:
+            while chunk := list(itertools.islice(records, options['batch_size'])):
+                result = import_chunk(kind, chunk, category_ids)
+                written += result.created + result.updated
+                progress['records'] += len(chunk)
+                progress['created'] += result.created
+                progress['updated'] += result.updated
+                progress['rejected'] += len(result.errors)
+                self.save_checkpoint(checkpoint_path, source, progress)
+
+                for line, message in result.errors:
+                    if errors:
+                        errors.write(json.dumps({'line': line, 'error': message}) + '\n')
+                    elif options['verbosity'] > 1:
+                        self.stderr.write(f'Line {line}: {message}')
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"  {progress['records']} records: {progress['created']} created, "
+                    f"{progress['updated']} updated, {progress['rejected']} rejected "
+                    f'({written / elapsed:.0f} records/s)'
+                )
+                if options['max_errors'] is not None and progress['rejected'] > options['max_errors']:
+                    raise CommandError(
+                        f"{progress['rejected']} records rejected, stopping. "
+                        'Fix the file and run the import again without --resume; --resume only '
+                        'continues an unchanged file and skips the records already rejected.'
+                    )
+        finally:
+            if errors:
+                errors.close()
+            if written:
+                finish_import(kind, written)
+
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {progress['created'] + progress['updated']} {kind} "
+            f"({progress['created']} created, {progress['updated']} updated, "
+            f"{progress['rejected']} rejected) in {time.perf_counter() - started:.1f}s."
+        ))
+
+    @staticmethod
+    def get_source(path, kind):
+        """Identify the file, so a checkpoint is not applied to a different one."""
+        stat = os.stat(path)
+        return {'path': os.path.abspath(path), 'type': kind, 'size': stat.st_size, 'mtime': stat.st_mtime}
+
+    @staticmethod
+    def load_checkpoint(checkpoint_path, source):
+        try:
+            with open(checkpoint_path) as fp:
+                checkpoint = json.load(fp)
+        except FileNotFoundError:
+            return None
+        if checkpoint.get('source') != source:
+            raise CommandError(
+                f'{checkpoint_path} belongs to another file or an older version of it; '
+                'remove it to start over.'
+            )
+        return checkpoint['progress']
+
+    @staticmethod
+    def save_checkpoint(checkpoint_path, source, progress):
+        """Record the committed progress, replacing the file atomically."""
+        temporary = f'{checkpoint_path}.tmp'
+        with open(temporary, 'w') as fp:
+            json.dump({'source': source, 'progress': progress}, fp)
+        os.replace(temporary, checkpoint_path)
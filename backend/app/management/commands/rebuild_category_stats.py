@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from backend.app.category_stats import rebuild_category_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute denormalized category statistics from scratch.'
+
+    def handle(self, *args, **options):
+        count = rebuild_category_stats()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt statistics for {count} categories.'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from backend.app.search import update_search_documents
+
+
+class Command(BaseCommand):
+    help = 'Rebuild full-text search documents for all product translations.'
+
+    def handle(self, *args, **options):
+        count = update_search_documents()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} product translations.'))
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from backend.app.catalog_import import KIND_PRODUCTS, catalog_imported
+from backend.app.models import Product, ProductImage
+
+
+class Command(BaseCommand):
+    help = 'Backfill Product.primary_image and report products whose pointer is stale.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report inconsistencies and exit with an error if any are found.',
+        )
+
+    def handle(self, *args, **options):
+        expected = Subquery(
+            ProductImage.objects.filter(
+                product=OuterRef('pk')
+            ).order_by('-is_primary', 'order', 'id').values('pk')[:1]
+        )
+        stale = Product.objects.annotate(expected_image=expected).filter(
+            Q(primary_image__isnull=True, expected_image__isnull=False)
+            | Q(primary_image__isnull=False, expected_image__isnull=True)
+            | (
+                Q(primary_image__isnull=False, expected_image__isnull=False)
+                & ~Q(primary_image=F('expected_image'))
+            )
+        )
+        stale_skus = list(stale.values_list('sku', flat=True))
+
+        if options['check']:
+            for sku in stale_skus:
+                self.stdout.write(f'Stale primary image pointer: {sku}')
+            if stale_skus:
+                raise CommandError(f'{len(stale_skus)} products have a stale primary image pointer.')
+            self.stdout.write(self.style.SUCCESS('All primary image pointers are consistent.'))
+            return
+
+        # Touch the products so their list fragments change; the bulk update
+        # bypasses model signals, so cached responses are retired like after
+        # an import
+        with transaction.atomic():
+            updated = Product.objects.filter(sku__in=stale_skus).update(
+                primary_image=expected, updated_at=timezone.now()
+            )
+            if updated:
+                catalog_imported.send(sender=None, kind=KIND_PRODUCTS, count=updated)
+        self.stdout.write(self.style.SUCCESS(f'Updated primary image pointer for {updated} products.'))
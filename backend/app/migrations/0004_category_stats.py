@@ -0,0 +1,53 @@
+# Generated by Django 5.2.7 on 2026-10-18 15:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_category_stats(apps, schema_editor):
+    from backend.app.category_stats import compute_category_stats
+
+    Category = apps.get_model('app', 'Category')
+    CategoryStats = apps.get_model('app', 'CategoryStats')
+    Product = apps.get_model('app', 'Product')
+
+    categories = list(Category.objects.values_list('id', 'parent_id', 'is_active'))
+    product_counts = (
+        Product.objects.filter(is_active=True)
+        .order_by()
+        .values('category_id')
+        .annotate(active=Count('id'), in_stock=Count('id', filter=Q(stock_quantity__gt=0)))
+        .values_list('category_id', 'active', 'in_stock')
+    )
+    stats = compute_category_stats(categories, product_counts)
+    CategoryStats.objects.bulk_create(
+        [CategoryStats(category_id=pk, **counters) for pk, counters in stats.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0003_remove_menuitemtranslation_master_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryStats',
+            fields=[
+                ('category', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='app.category')),
+                ('active_children_count', models.IntegerField(default=0)),
+                ('active_products_count', models.IntegerField(default=0)),
+                ('descendant_products_count', models.IntegerField(default=0, help_text='Active products in this category and all of its descendants')),
+                ('in_stock_products_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Category Statistics',
+                'verbose_name_plural': 'Category Statistics',
+            },
+        ),
+        migrations.RunPython(backfill_category_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-18 15:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_primary_image(apps, schema_editor):
+    Product = apps.get_model('app', 'Product')
+    ProductImage = apps.get_model('app', 'ProductImage')
+    first_image = ProductImage.objects.filter(
+        product=OuterRef('pk')
+    ).order_by('-is_primary', 'order', 'id').values('pk')[:1]
+    Product.objects.update(primary_image=Subquery(first_image))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0004_category_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='primary_image',
+            field=models.ForeignKey(blank=True, editable=False, help_text='Image shown in listings, maintained automatically', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='app.productimage'),
+        ),
+        migrations.RunPython(backfill_primary_image, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.7 on 2026-10-18 15:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0005_product_primary_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productimage',
+            name='height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Height'),
+        ),
+        migrations.AddField(
+            model_name='productimage',
+            name='placeholder',
+            field=models.CharField(blank=True, editable=False, help_text='BlurHash of the image, rendered by clients while loading', max_length=64, verbose_name='Placeholder'),
+        ),
+        migrations.AddField(
+            model_name='productimage',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Width'),
+        ),
+        migrations.CreateModel(
+            name='ProductImageRendition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('format', models.CharField(choices=[('webp', 'WebP'), ('avif', 'AVIF')], max_length=10, verbose_name='Format')),
+                ('width', models.PositiveIntegerField(verbose_name='Width')),
+                ('height', models.PositiveIntegerField(verbose_name='Height')),
+                ('file', models.ImageField(upload_to='products/renditions/%Y/%m/')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('image', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='renditions', to='app.productimage')),
+            ],
+            options={
+                'verbose_name': 'Product Image Rendition',
+                'verbose_name_plural': 'Product Image Renditions',
+                'ordering': ['format', 'width'],
+                'constraints': [models.UniqueConstraint(fields=('image', 'format', 'width'), name='unique_product_image_rendition')],
+            },
+        ),
+    ]
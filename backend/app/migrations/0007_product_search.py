@@ -0,0 +1,78 @@
+# Generated by Django 5.2.7 on 2026-10-18 15:49
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+BACKFILL_SEARCH_DOCUMENTS = """
+INSERT INTO app_productsearchdocument (product_id, language_code, name, document, updated_at)
+SELECT
+    t.master_id,
+    t.language_code,
+    t.name,
+    setweight(to_tsvector(c.config, coalesce(t.name, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce(p.sku, '') || ' ' || coalesce(p.material, '')), 'A')
+        || setweight(to_tsvector(c.config, coalesce(t.short_description, '')), 'B')
+        || setweight(to_tsvector(c.config, coalesce(t.description, '')), 'C'),
+    now()
+FROM app_product_translation t
+JOIN app_product p ON p.id = t.master_id
+CROSS JOIN LATERAL (
+    SELECT (CASE t.language_code
+        WHEN 'en' THEN 'english'
+        WHEN 'de' THEN 'german'
+        WHEN 'fr' THEN 'french'
+        ELSE 'simple'
+    END)::regconfig AS config
+) c
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0006_product_image_renditions'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.CreateModel(
+            name='ProductSearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language_code', models.CharField(max_length=15, verbose_name='Language')),
+                ('name', models.CharField(help_text='Copy of the translated name used for trigram typo matching', max_length=200, verbose_name='Name')),
+                ('document', django.contrib.postgres.search.SearchVectorField(null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Product Search Document',
+                'verbose_name_plural': 'Product Search Documents',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['sku'], name='product_sku_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddField(
+            model_name='productsearchdocument',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_documents', to='app.product'),
+        ),
+        migrations.AddIndex(
+            model_name='productsearchdocument',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['document'], name='product_search_document_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='productsearchdocument',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='product_search_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddConstraint(
+            model_name='productsearchdocument',
+            constraint=models.UniqueConstraint(fields=('product', 'language_code'), name='unique_product_search_document'),
+        ),
+        migrations.RunSQL(BACKFILL_SEARCH_DOCUMENTS, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:01
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0009_product_updated_keyset'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='effective_price',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.comparison.Coalesce(django.db.models.functions.comparison.NullIf('discount_price', models.Value(0)), 'price'), output_field=models.DecimalField(decimal_places=2, max_digits=10), verbose_name='Effective Price'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'effective_price', 'id'], name='product_effective_price'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0011_stock_reservations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletedProduct',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_id', models.PositiveBigIntegerField(verbose_name='Product ID')),
+                ('sku', models.CharField(max_length=100, verbose_name='SKU')),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Deleted Product',
+                'verbose_name_plural': 'Deleted Products',
+                'ordering': ['deleted_at', 'id'],
+                'indexes': [models.Index(fields=['deleted_at', 'id'], name='deleted_product_keyset')],
+            },
+        ),
+    ]
@@ -1 +1,4 @@
-from .products import *
\ No newline at end of file
+from .products import *
+from .search import *
+from .stats import *
+from .reservations import *
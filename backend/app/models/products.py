@@ -1,4 +1,7 @@
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
+from django.db.models import Value
+from django.db.models.functions import Coalesce, NullIf
 from django.utils.translation import gettext_lazy as _
 from parler.models import TranslatableModel, TranslatedFields
 
@@ -39,6 +42,12 @@ class Category(TranslatableModel):
     
     def get_full_path(self):
         """Get full category path (e.g., Parent > Child > Current)."""
+        from backend.app.category_tree import get_category_tree
+
+        tree = get_category_tree()
+        if self.pk in tree:
+            return tree.full_path(self.pk, self.get_current_language())
+
         path = [self]
         parent = self.parent
         while parent:
@@ -69,6 +78,14 @@ class Product(TranslatableModel):
         null=True,
         blank=True
     )
+    # The discount price when there is one, maintained by the database so
+    # price filters and ordering can use an index
+    effective_price = models.GeneratedField(
+        expression=Coalesce(NullIf('discount_price', Value(0)), 'price'),
+        output_field=models.DecimalField(max_digits=10, decimal_places=2),
+        db_persist=True,
+        verbose_name=_("Effective Price")
+    )
     stock_quantity = models.IntegerField(_("Stock Quantity"), default=0)
     is_active = models.BooleanField(default=True)
     is_featured = models.BooleanField(default=False)
@@ -80,6 +97,15 @@ class Product(TranslatableModel):
         blank=True
     )
     material = models.CharField(_("Material"), max_length=100, blank=True)
+    primary_image = models.ForeignKey(
+        'ProductImage',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='+',
+        help_text=_("Image shown in listings, maintained automatically")
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -99,20 +125,30 @@ class Product(TranslatableModel):
             models.Index(fields=['sku', 'is_active']),
             models.Index(fields=['category', 'is_active']),
             models.Index(fields=['is_featured', 'is_active']),
+            GinIndex(fields=['sku'], name='product_sku_trgm', opclasses=['gin_trgm_ops']),
+            # Keyset pagination over the orderable fields (see api/v1/pagination.py)
+            models.Index(fields=['-created_at', '-id'], name='product_created_keyset'),
+            models.Index(fields=['price', 'id'], name='product_price_keyset'),
+            models.Index(fields=['is_active', 'effective_price', 'id'], name='product_effective_price'),
+            models.Index(fields=['stock_quantity', 'id'], name='product_stock_keyset'),
+            # Incremental feed exports (see api/v1/export.py)
+            models.Index(fields=['updated_at', 'id'], name='product_updated_keyset'),
         ]
     
     def __str__(self):
         return self.safe_translation_getter('name', any_language=True) or f"Product {self.sku}"
     
-    @property
-    def effective_price(self):
-        """Return discount price if available, otherwise regular price."""
-        return self.discount_price if self.discount_price else self.price
-    
     @property
     def is_in_stock(self):
         """Check if product is in stock."""
         return self.stock_quantity > 0
+    
+    def refresh_primary_image(self):
+        """Point primary_image at the primary image, or the first one by order."""
+        self.primary_image_id = ProductImage.objects.filter(
+            product_id=self.pk
+        ).order_by('-is_primary', 'order', 'id').values_list('pk', flat=True).first()
+        Product.objects.filter(pk=self.pk).update(primary_image_id=self.primary_image_id)
 
 
 class ProductImage(models.Model):
@@ -127,6 +163,15 @@ class ProductImage(models.Model):
     alt_text = models.CharField(_("Alt Text"), max_length=200, blank=True)
     order = models.IntegerField(default=0)
     is_primary = models.BooleanField(default=False)
+    width = models.PositiveIntegerField(_("Width"), null=True, blank=True, editable=False)
+    height = models.PositiveIntegerField(_("Height"), null=True, blank=True, editable=False)
+    placeholder = models.CharField(
+        _("Placeholder"),
+        max_length=64,
+        blank=True,
+        editable=False,
+        help_text=_("BlurHash of the image, rendered by clients while loading")
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -141,10 +186,66 @@ class ProductImage(models.Model):
         return f"Image for {self.product.sku}"
     
     def save(self, *args, **kwargs):
-        """Ensure only one primary image per product."""
+        """Ensure only one primary image per product and keep the product pointer in sync."""
         if self.is_primary:
             ProductImage.objects.filter(
                 product=self.product,
                 is_primary=True
             ).exclude(pk=self.pk).update(is_primary=False)
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+        self.product.refresh_primary_image()
+
+
+class ProductImageRendition(models.Model):
+    """Resized, re-encoded copy of a product image used in ``srcset``."""
+    
+    FORMAT_WEBP = 'webp'
+    FORMAT_AVIF = 'avif'
+    FORMAT_CHOICES = [
+        (FORMAT_WEBP, 'WebP'),
+        (FORMAT_AVIF, 'AVIF'),
+    ]
+    
+    image = models.ForeignKey(
+        ProductImage,
+        on_delete=models.CASCADE,
+        related_name='renditions'
+    )
+    format = models.CharField(_("Format"), max_length=10, choices=FORMAT_CHOICES)
+    width = models.PositiveIntegerField(_("Width"))
+    height = models.PositiveIntegerField(_("Height"))
+    file = models.ImageField(upload_to='products/renditions/%Y/%m/')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = _("Product Image Rendition")
+        verbose_name_plural = _("Product Image Renditions")
+        ordering = ['format', 'width']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['image', 'format', 'width'],
+                name='unique_product_image_rendition'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.format} {self.width}w for image {self.image_id}"
+
+
+class DeletedProduct(models.Model):
+    """Record of a deleted product, so incremental feed exports can report the deletion."""
+    
+    product_id = models.PositiveBigIntegerField(_("Product ID"))
+    sku = models.CharField(_("SKU"), max_length=100)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = _("Deleted Product")
+        verbose_name_plural = _("Deleted Products")
+        ordering = ['deleted_at', 'id']
+        indexes = [
+            models.Index(fields=['deleted_at', 'id'], name='deleted_product_keyset'),
+        ]
+    
+    def __str__(self):
+        return f"Deleted product {self.sku}"
@@ -0,0 +1,59 @@
+import uuid
+
+from django.db import models
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+
+from .products import Product
+
+
+class StockReservation(models.Model):
+    """A hold on product stock until checkout confirms it or it is released (see backend/app/reservations.py)."""
+
+    STATUS_HELD = 'held'
+    STATUS_CONFIRMED = 'confirmed'
+    STATUS_RELEASED = 'released'
+    STATUS_EXPIRED = 'expired'
+    STATUS_CHOICES = [
+        (STATUS_HELD, _("Held")),
+        (STATUS_CONFIRMED, _("Confirmed")),
+        (STATUS_RELEASED, _("Released")),
+        (STATUS_EXPIRED, _("Expired")),
+    ]
+
+    # Random ids double as the client's handle on its reservation
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='reservations'
+    )
+    quantity = models.PositiveIntegerField(_("Quantity"))
+    status = models.CharField(
+        _("Status"),
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=STATUS_HELD
+    )
+    expires_at = models.DateTimeField(_("Expires At"))
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _("Stock Reservation")
+        verbose_name_plural = _("Stock Reservations")
+        ordering = ['-created_at']
+        indexes = [
+            # The expiry sweep only looks at holds
+            models.Index(
+                fields=['expires_at'],
+                name='reservation_held_expiry',
+                condition=Q(status='held')
+            ),
+        ]
+        constraints = [
+            models.CheckConstraint(condition=Q(quantity__gte=1), name='reservation_quantity_positive'),
+        ]
+
+    def __str__(self):
+        return f"{self.quantity} x product {self.product_id} ({self.status})"
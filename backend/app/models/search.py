@@ -0,0 +1,41 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from .products import Product
+
+
+class ProductSearchDocument(models.Model):
+    """Weighted full-text search document of a product in one language."""
+
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='search_documents'
+    )
+    language_code = models.CharField(_("Language"), max_length=15)
+    name = models.CharField(
+        _("Name"),
+        max_length=200,
+        help_text=_("Copy of the translated name used for trigram typo matching")
+    )
+    document = SearchVectorField(null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _("Product Search Document")
+        verbose_name_plural = _("Product Search Documents")
+        constraints = [
+            models.UniqueConstraint(
+                fields=['product', 'language_code'],
+                name='unique_product_search_document'
+            ),
+        ]
+        indexes = [
+            GinIndex(fields=['document'], name='product_search_document_gin'),
+            GinIndex(fields=['name'], name='product_search_name_trgm', opclasses=['gin_trgm_ops']),
+        ]
+
+    def __str__(self):
+        return f"Search document for product {self.product_id} ({self.language_code})"
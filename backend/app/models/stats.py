@@ -0,0 +1,30 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from .products import Category
+
+
+class CategoryStats(models.Model):
+    """Denormalized per-category counters, kept in sync by signal handlers."""
+
+    category = models.OneToOneField(
+        Category,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats'
+    )
+    active_children_count = models.IntegerField(default=0)
+    active_products_count = models.IntegerField(default=0)
+    descendant_products_count = models.IntegerField(
+        default=0,
+        help_text=_("Active products in this category and all of its descendants")
+    )
+    in_stock_products_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _("Category Statistics")
+        verbose_name_plural = _("Category Statistics")
+
+    def __str__(self):
+        return f"Statistics for category {self.category_id}"
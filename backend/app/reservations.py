@@ -0,0 +1,202 @@
+"""
+Stock reservations for checkout.
+
+``Product.stock_quantity`` is the stock still available for sale. A hold
+takes units off it with a single conditional ``UPDATE ... SET stock_quantity
+= stock_quantity - n WHERE stock_quantity >= n``: concurrent buyers queue on
+the row only for that statement and its short transaction, and the update
+either applies or matches nothing, so stock never goes below zero. Holds
+expire after ``RESERVATION_TTL_SECONDS`` unless confirmed; confirming keeps
+the units sold, releasing or expiring returns them. Expired holds are swept
+in batches locked with ``FOR UPDATE SKIP LOCKED``, so sweepers never wait on
+each other or on checkouts touching the same holds.
+
+Every committed stock change sends ``stock_changed``, retiring the cached
+responses showing the product; a product going in or out of stock also moves
+the category counters, which every catalog response embeds. An expiry sweep
+sends one signal per batch, so a batch retires the caches once.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.dispatch import Signal
+from django.utils import timezone
+
+from backend.app import category_stats
+from backend.app.models import Product, StockReservation
+
+# Sent after commit with ``products``, the (product_id, category_id) pairs of
+# products whose stock changed, and whether any change moved the category
+# counters (``moves_counters``)
+stock_changed = Signal()
+
+
+class ReservationError(Exception):
+    """A reservation could not be placed or changed."""
+
+
+class ProductUnavailable(ReservationError):
+    """The product does not exist or is not for sale."""
+
+
+class InsufficientStock(ReservationError):
+    """Less stock is available than requested."""
+
+    def __init__(self, available):
+        super().__init__(f'Only {available} left in stock')
+        self.available = available
+
+
+class ReservationNotHeld(ReservationError):
+    """The reservation does not exist, expired or was already confirmed or released."""
+
+
+def send_stock_changed(changes, using):
+    """Send ``stock_changed`` for ``(product_id, category_id, moves_counters)`` changes after commit."""
+    if not changes:
+        return
+    transaction.on_commit(
+        lambda: stock_changed.send(
+            sender=Product,
+            products=[(product_id, category_id) for product_id, category_id, _ in changes],
+            moves_counters=any(moves_counters for _, _, moves_counters in changes)
+        ),
+        using=using
+    )
+
+
+def adjust_stock(product_id, delta, require_active=False, changes=None):
+    """
+    Add ``delta`` to the stock of a product with one conditional UPDATE that
+    never takes the stock below zero. Returns the new stock, or None when no
+    row matched. Call inside a transaction.
+
+    The change is appended to ``changes`` when given, for the caller to send
+    ``stock_changed`` once for all of them; otherwise it is sent on its own.
+    """
+    connection = connections[router.db_for_write(StockReservation)]
+    table = connection.ops.quote_name(Product._meta.db_table)
+    conditions = ['id = %s']
+    params = [delta, timezone.now(), product_id]
+    if delta < 0:
+        conditions.append('stock_quantity >= %s')
+        params.append(-delta)
+    if require_active:
+        conditions.append('is_active')
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {table} SET stock_quantity = stock_quantity + %s, updated_at = %s '
+            f'WHERE {" AND ".join(conditions)} '
+            f'RETURNING stock_quantity, is_active, category_id',
+            params
+        )
+        row = cursor.fetchone()
+    if row is None:
+        return None
+
+    stock, is_active, category_id = row
+    in_stock = stock > 0
+    moves_counters = is_active and in_stock != (stock - delta > 0)
+    if moves_counters:
+        category_stats.apply_product_delta(category_id, 0, 1 if in_stock else -1)
+    change = (product_id, category_id, moves_counters)
+    if changes is None:
+        send_stock_changed([change], connection.alias)
+    else:
+        changes.append(change)
+    return stock
+
+
+def reserve(product_id, quantity, ttl=None):
+    """
+    Hold ``quantity`` units of an active product for ``ttl`` seconds
+    (``RESERVATION_TTL_SECONDS`` by default) and return the reservation.
+    """
+    if quantity < 1:
+        raise ReservationError('Quantity must be at least 1')
+    ttl = settings.RESERVATION_TTL_SECONDS if ttl is None else ttl
+    using = router.db_for_write(StockReservation)
+    with transaction.atomic(using=using):
+        # Insert first so the product row stays locked only until the commit
+        reservation = StockReservation.objects.using(using).create(
+            product_id=product_id,
+            quantity=quantity,
+            expires_at=timezone.now() + timedelta(seconds=ttl),
+        )
+        if adjust_stock(product_id, -quantity, require_active=True) is not None:
+            return reservation
+        # Undo the insert before looking into why, outside the hot path
+        transaction.set_rollback(True, using=using)
+
+    available = Product.objects.using(using).filter(pk=product_id, is_active=True).values_list(
+        'stock_quantity', flat=True
+    ).first()
+    if available is None:
+        raise ProductUnavailable(f'Product {product_id} is not available')
+    raise InsufficientStock(max(available, 0))
+
+
+def confirm(reservation_id):
+    """Turn an unexpired hold into a sale; its units stay off the stock."""
+    using = router.db_for_write(StockReservation)
+    now = timezone.now()
+    confirmed = StockReservation.objects.using(using).filter(
+        pk=reservation_id, status=StockReservation.STATUS_HELD, expires_at__gt=now
+    ).update(status=StockReservation.STATUS_CONFIRMED, updated_at=now)
+    if not confirmed:
+        raise ReservationNotHeld(f'Reservation {reservation_id} is not held')
+    return StockReservation.objects.using(using).get(pk=reservation_id)
+
+
+def release(reservation_id):
+    """Cancel a hold and return its units to the stock."""
+    using = router.db_for_write(StockReservation)
+    with transaction.atomic(using=using):
+        reservation = StockReservation.objects.using(using).select_for_update().filter(
+            pk=reservation_id, status=StockReservation.STATUS_HELD
+        ).first()
+        if reservation is None:
+            raise ReservationNotHeld(f'Reservation {reservation_id} is not held')
+        reservation.status = StockReservation.STATUS_RELEASED
+        reservation.save(update_fields=['status', 'updated_at'])
+        adjust_stock(reservation.product_id, reservation.quantity)
+    return reservation
+
+
+def expire_reservations(batch_size=None):
+    """
+    Return the units of expired holds to the stock, ``batch_size`` holds
+    (``RESERVATION_EXPIRY_BATCH_SIZE`` by default) per transaction, skipping
+    holds other transactions have locked. Returns the number expired.
+    """
+    batch_size = batch_size or settings.RESERVATION_EXPIRY_BATCH_SIZE
+    using = router.db_for_write(StockReservation)
+    expired = 0
+    while True:
+        with transaction.atomic(using=using):
+            now = timezone.now()
+            batch = list(
+                StockReservation.objects.using(using)
+                .select_for_update(skip_locked=True)
+                .filter(status=StockReservation.STATUS_HELD, expires_at__lte=now)
+                .order_by('expires_at')
+                .values_list('pk', 'product_id', 'quantity')[:batch_size]
+            )
+            if not batch:
+                return expired
+            StockReservation.objects.using(using).filter(pk__in=[pk for pk, _, _ in batch]).update(
+                status=StockReservation.STATUS_EXPIRED, updated_at=now
+            )
+            quantities = defaultdict(int)
+            for _, product_id, quantity in batch:
+                quantities[product_id] += quantity
+            # A fixed lock order keeps concurrent sweeps from deadlocking
+            changes = []
+            for product_id in sorted(quantities):
+                adjust_stock(product_id, quantities[product_id], changes=changes)
+            send_stock_changed(changes, using)
+        expired += len(batch)
+        if len(batch) < batch_size:
+            return expired
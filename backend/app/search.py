@@ -0,0 +1,97 @@
+"""
+Per-language full-text search documents for products.
+
+Each product translation gets a ProductSearchDocument whose ``document`` is a
+weighted ``tsvector`` built with the text search configuration of its
+language: name and SKU/material weigh most (A), then the short description
+(B) and the description (C). The translated name is also stored verbatim so
+typos can be matched with trigram similarity.
+"""
+from django.conf import settings
+from django.contrib.postgres.search import SearchVector
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from backend.app.models import Product, ProductSearchDocument
+
+ProductTranslation = Product._parler_meta.root_model
+
+DEFAULT_SEARCH_CONFIG = 'simple'
+
+
+def get_search_config(language_code):
+    """Return the PostgreSQL text search configuration for a language."""
+    configs = getattr(settings, 'PRODUCT_SEARCH_CONFIGS', {})
+    if language_code in configs:
+        return configs[language_code]
+    return configs.get(language_code.split('-')[0], DEFAULT_SEARCH_CONFIG)
+
+
+def document_vector(config):
+    """Weighted search vector expression over a ProductTranslation row."""
+    return (
+        SearchVector('name', config=config, weight='A')
+        + SearchVector('master__sku', 'master__material', config=DEFAULT_SEARCH_CONFIG, weight='A')
+        + SearchVector('short_description', config=config, weight='B')
+        + SearchVector('description', config=config, weight='C')
+    )
+
+
+def update_search_documents(product_ids=None):
+    """
+    Create or refresh search documents from product translations.
+
+    With ``product_ids`` only those products are refreshed; otherwise the
+    whole catalog is reindexed. Returns the number of documents written.
+    """
+    translations = ProductTranslation.objects.all()
+    documents = ProductSearchDocument.objects.all()
+    if product_ids is not None:
+        translations = translations.filter(master_id__in=product_ids)
+        documents = documents.filter(product_id__in=product_ids)
+
+    now = timezone.now()
+    rows = [
+        ProductSearchDocument(
+            product_id=master_id,
+            language_code=language_code,
+            name=name,
+            updated_at=now,
+        )
+        for master_id, language_code, name in translations.values_list(
+            'master_id', 'language_code', 'name'
+        ).iterator(chunk_size=2000)
+    ]
+    ProductSearchDocument.objects.bulk_create(
+        rows,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['product', 'language_code'],
+        update_fields=['name', 'updated_at'],
+    )
+
+    # Drop documents of translations that no longer exist
+    documents.exclude(
+        language_code__in=translations.filter(
+            master_id=OuterRef('product_id')
+        ).values('language_code')
+    ).delete()
+
+    # Vectors are computed in the database, one UPDATE per text search config
+    configs = getattr(settings, 'PRODUCT_SEARCH_CONFIGS', {})
+    by_config = {}
+    for language_code, config in configs.items():
+        by_config.setdefault(config, []).append(language_code)
+    for config, language_codes in by_config.items():
+        _update_vectors(documents.filter(language_code__in=language_codes), config)
+    _update_vectors(documents.exclude(language_code__in=configs), DEFAULT_SEARCH_CONFIG)
+
+    return len(rows)
+
+
+def _update_vectors(documents, config):
+    vector = ProductTranslation.objects.filter(
+        master_id=OuterRef('product_id'),
+        language_code=OuterRef('language_code'),
+    ).annotate(vector=document_vector(config)).values('vector')[:1]
+    documents.update(document=Subquery(vector))
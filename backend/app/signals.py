@@ -0,0 +1,215 @@
+"""
+Signal handlers keeping denormalized catalog data in sync with model changes.
+"""
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from backend.app import category_stats, search
+from backend.app.category_tree import invalidate_category_tree
+from backend.app.images import renditions_generated
+from backend.app.models import (
+    Category,
+    CategoryStats,
+    DeletedProduct,
+    Product,
+    ProductImage,
+    ProductImageRendition,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(pre_save, sender=Category)
+def remember_category_state(sender, instance, **kwargs):
+    """Store the persisted parent/is_active so post_save can compute deltas."""
+    instance._previous_state = None
+    if not instance._state.adding:
+        instance._previous_state = sender.objects.filter(pk=instance.pk).values(
+            'parent_id', 'is_active'
+        ).first()
+
+
+@receiver(post_save, sender=Category)
+def update_stats_on_category_save(sender, instance, created, raw=False, **kwargs):
+    """Keep parent counters in sync when a category is added, moved or toggled."""
+    if raw:
+        return
+    previous = getattr(instance, '_previous_state', None)
+    if created or previous is None:
+        CategoryStats.objects.get_or_create(category=instance)
+        category_stats.apply_children_delta(instance.parent_id, int(instance.is_active))
+        return
+
+    if previous['parent_id'] == instance.parent_id:
+        category_stats.apply_children_delta(
+            instance.parent_id,
+            int(instance.is_active) - int(previous['is_active'])
+        )
+        return
+
+    category_stats.apply_children_delta(previous['parent_id'], -int(previous['is_active']))
+    category_stats.apply_children_delta(instance.parent_id, int(instance.is_active))
+
+    # The whole subtree moves along with the category
+    subtree_products = CategoryStats.objects.filter(pk=instance.pk).values_list(
+        'descendant_products_count', flat=True
+    ).first()
+    if subtree_products:
+        category_stats.apply_descendant_delta(
+            category_stats.get_category_chain(previous['parent_id']), -subtree_products
+        )
+        category_stats.apply_descendant_delta(
+            category_stats.get_category_chain(instance.parent_id), subtree_products
+        )
+
+
+@receiver(post_delete, sender=Category)
+def update_stats_on_category_delete(sender, instance, **kwargs):
+    """Drop a deleted category from its parent's children counter."""
+    if instance.is_active:
+        category_stats.apply_children_delta(instance.parent_id, -1)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Category._parler_meta.root_model)
+@receiver(post_delete, sender=Category._parler_meta.root_model)
+def invalidate_tree_on_category_change(sender, raw=False, **kwargs):
+    """Publish a new category tree version after any category change."""
+    if not raw:
+        invalidate_category_tree()
+
+
+@receiver(pre_save, sender=Product)
+def remember_product_state(sender, instance, **kwargs):
+    """Store the persisted state so post_save handlers can compute deltas."""
+    instance._previous_state = None
+    if not instance._state.adding:
+        instance._previous_state = sender.objects.filter(pk=instance.pk).values(
+            'category_id', 'is_active', 'stock_quantity', 'sku', 'material'
+        ).first()
+
+
+@receiver(post_save, sender=Product)
+def update_stats_on_product_save(sender, instance, created, raw=False, **kwargs):
+    """Apply the counter delta caused by a product save."""
+    if raw:
+        return
+    active, in_stock = category_stats.product_contribution(
+        instance.is_active, instance.stock_quantity
+    )
+    previous = getattr(instance, '_previous_state', None)
+    if created or previous is None:
+        category_stats.apply_product_delta(instance.category_id, active, in_stock)
+        return
+
+    old_active, old_in_stock = category_stats.product_contribution(
+        previous['is_active'], previous['stock_quantity']
+    )
+    if previous['category_id'] == instance.category_id:
+        category_stats.apply_product_delta(
+            instance.category_id, active - old_active, in_stock - old_in_stock
+        )
+    else:
+        category_stats.apply_product_delta(previous['category_id'], -old_active, -old_in_stock)
+        category_stats.apply_product_delta(instance.category_id, active, in_stock)
+
+
+@receiver(post_save, sender=Product)
+def update_search_on_product_save(sender, instance, created, raw=False, **kwargs):
+    """Reindex a product when the untranslated searchable fields change."""
+    previous = getattr(instance, '_previous_state', None)
+    if raw or created or previous is None:
+        return
+    if (previous['sku'], previous['material']) != (instance.sku, instance.material):
+        search.update_search_documents([instance.pk])
+
+
+@receiver(post_save, sender=Product._parler_meta.root_model)
+@receiver(post_delete, sender=Product._parler_meta.root_model)
+def update_search_on_translation_change(sender, instance, raw=False, **kwargs):
+    """Reindex a product when one of its translations is saved or deleted."""
+    if not raw:
+        search.update_search_documents([instance.master_id])
+
+
+@receiver(post_delete, sender=Product)
+def update_stats_on_product_delete(sender, instance, **kwargs):
+    """Remove a deleted product from its category counters."""
+    active, in_stock = category_stats.product_contribution(
+        instance.is_active, instance.stock_quantity
+    )
+    category_stats.apply_product_delta(instance.category_id, -active, -in_stock)
+
+
+@receiver(post_delete, sender=Product)
+def record_product_deletion(sender, instance, **kwargs):
+    """Leave a tombstone for incremental feed exports (see api/v1/export.py)."""
+    DeletedProduct.objects.create(product_id=instance.pk, sku=instance.sku)
+
+
+@receiver(post_delete, sender=ProductImage)
+def refresh_primary_image_on_delete(sender, instance, **kwargs):
+    """Re-point the product at another image when its primary image is deleted."""
+    product = Product.objects.filter(pk=instance.product_id).first()
+    if product is not None and product.primary_image_id in (None, instance.pk):
+        product.refresh_primary_image()
+
+
+@receiver(pre_save, sender=ProductImage)
+def remember_image_file(sender, instance, **kwargs):
+    """Store the persisted file name so post_save can detect a new upload."""
+    instance._previous_image = None
+    if not instance._state.adding:
+        instance._previous_image = sender.objects.filter(pk=instance.pk).values_list(
+            'image', flat=True
+        ).first()
+
+
+@receiver(post_save, sender=ProductImage)
+def schedule_renditions(sender, instance, created, raw=False, **kwargs):
+    """Queue rendition generation after a new file has been committed."""
+    if raw or (not created and instance._previous_image == instance.image.name):
+        return
+    def enqueue():
+        from kombu.exceptions import OperationalError
+
+        from backend.app.tasks import generate_product_image_renditions
+        try:
+            generate_product_image_renditions.delay(instance.pk)
+        except OperationalError:
+            logger.exception('Could not queue renditions for product image %s', instance.pk)
+
+    transaction.on_commit(enqueue)
+
+
+@receiver(post_delete, sender=ProductImageRendition)
+def delete_rendition_file(sender, instance, **kwargs):
+    """Remove the rendition file from storage along with its row."""
+    if instance.file:
+        instance.file.delete(save=False)
+
+
+@receiver(post_save, sender=Category._parler_meta.root_model)
+@receiver(post_delete, sender=Category._parler_meta.root_model)
+@receiver(post_save, sender=Product._parler_meta.root_model)
+@receiver(post_delete, sender=Product._parler_meta.root_model)
+def touch_master_on_translation_change(sender, instance, raw=False, **kwargs):
+    """Bump updated_at of the translated object so HTTP validators change."""
+    if not raw:
+        sender.master.field.related_model.objects.filter(pk=instance.master_id).update(
+            updated_at=timezone.now()
+        )
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+@receiver(renditions_generated, sender=ProductImage)
+def touch_product_on_image_change(sender, instance, raw=False, **kwargs):
+    """Bump updated_at of the product when its images or renditions change."""
+    if not raw:
+        Product.objects.filter(pk=instance.product_id).update(updated_at=timezone.now())
@@ -0,0 +1,39 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from backend.app.images import generate_renditions
+from backend.app.models import DeletedProduct, ProductImage
+from backend.app.reservations import expire_reservations
+from backend.core.celery import app
+
+logger = logging.getLogger(__name__)
+
+
+@app.task(autoretry_for=(OSError,), retry_backoff=True, max_retries=3)
+def generate_product_image_renditions(image_id):
+    """Generate renditions for a product image in a worker."""
+    product_image = ProductImage.objects.filter(pk=image_id).first()
+    if product_image is None:
+        logger.info('Product image %s was deleted before renditions were generated', image_id)
+        return 0
+    return generate_renditions(product_image)
+
+
+@app.task
+def expire_stock_reservations():
+    """Return the stock of expired reservations; scheduled by Celery beat."""
+    return expire_reservations()
+
+
+@app.task
+def prune_deleted_products():
+    """
+    Delete product tombstones older than ``EXPORT_TOMBSTONE_RETENTION`` days;
+    scheduled by Celery beat.
+    """
+    cutoff = timezone.now() - timedelta(days=settings.EXPORT_TOMBSTONE_RETENTION)
+    deleted, _ = DeletedProduct.objects.filter(deleted_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,104 @@
+import io
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from backend.api import cache as response_cache
+from backend.app.models import Category, CategoryStats, Product, ProductSearchDocument
+
+pytestmark = pytest.mark.django_db
+
+CATEGORIES_CSV = """slug,parent,order,is_active,name_en,name_de
+gold-rings,rings,1,true,Gold rings,Goldringe
+rings,,0,yes,Rings,
+"""
+
+
+def write(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content)
+    return str(path)
+
+
+def jsonl(*records):
+    return ''.join(
+        record if isinstance(record, str) else json.dumps(record) + '\n' for record in records
+    )
+
+
+def product(sku, category='gold-rings', price='120.00', **fields):
+    return {
+        'sku': sku, 'category': category, 'price': price, 'stock_quantity': 3,
+        'translations': {'en': {'name': f'Ring {sku}', 'description': 'Handmade'}},
+        **fields,
+    }
+
+
+@pytest.fixture
+def run(django_capture_on_commit_callbacks):
+    def run(path, *args, **options):
+        with django_capture_on_commit_callbacks(execute=True):
+            call_command('import_catalog', path, *args, stdout=io.StringIO(), **options)
+    return run
+
+
+@pytest.fixture
+def categories(tmp_path, run):
+    run(write(tmp_path, 'categories.csv', CATEGORIES_CSV), type='categories')
+
+
+def test_categories_are_imported_parents_first(categories):
+    gold = Category.objects.get(slug='gold-rings')
+
+    assert gold.parent.slug == 'rings'
+    assert gold.safe_translation_getter('name', language_code='de') == 'Goldringe'
+    assert not Category.objects.get(slug='rings').has_translation('de')
+
+
+def test_products_are_upserted_by_sku(tmp_path, categories, run):
+    run(write(tmp_path, 'first.jsonl', jsonl(product('R-1'), product('R-2'))))
+    versions = response_cache.get_namespace_versions(response_cache.NAMESPACES)
+
+    run(write(tmp_path, 'second.jsonl', jsonl(product('R-1', price=99.9, is_active='false'))))
+
+    assert Product.objects.count() == 2
+    updated = Product.objects.get(sku='R-1')
+    assert (str(updated.price), updated.is_active) == ('99.90', False)
+    assert ProductSearchDocument.objects.filter(product__sku='R-2').exists()
+    stats = CategoryStats.objects.get(category__slug='rings')
+    assert stats.descendant_products_count == 1
+    assert response_cache.get_namespace_versions(response_cache.NAMESPACES) != versions
+
+
+def test_invalid_records_are_rejected_with_their_line(tmp_path, categories, run):
+    path = write(tmp_path, 'products.jsonl', jsonl(
+        product('R-1'),
+        '{not json\n',
+        product('R-2', price='cheap'),
+        product('R-3', category='missing'),
+        {**product('R-4'), 'translations': {'xx': {'name': 'Ring'}}},
+    ))
+    errors = tmp_path / 'errors.jsonl'
+
+    run(path, errors=str(errors))
+
+    assert list(Product.objects.values_list('sku', flat=True)) == ['R-1']
+    rejected = [json.loads(line) for line in errors.read_text().splitlines()]
+    assert [error['line'] for error in rejected] == [2, 3, 4, 5]
+    assert 'Unknown category "missing"' in rejected[2]['error']
+
+
+def test_interrupted_imports_resume_after_the_committed_records(tmp_path, categories, run):
+    path = write(tmp_path, 'products.jsonl', jsonl(
+        product('R-1'), product('R-2', price='cheap'), product('R-3'),
+    ))
+
+    with pytest.raises(CommandError):
+        run(path, batch_size=1, max_errors=0)
+    assert list(Product.objects.values_list('sku', flat=True)) == ['R-1']
+
+    run(path, batch_size=1, resume=True)
+
+    assert sorted(Product.objects.values_list('sku', flat=True)) == ['R-1', 'R-3']
+    assert not (tmp_path / 'products.jsonl.checkpoint.json').exists()
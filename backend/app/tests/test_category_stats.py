@@ -0,0 +1,156 @@
+import pytest
+
+from backend.app.category_stats import (
+    COUNTER_FIELDS,
+    compute_category_stats,
+    rebuild_category_stats,
+)
+from backend.app.models import CategoryStats, Product
+
+pytestmark = pytest.mark.django_db
+
+
+def get_stats(category):
+    stats = CategoryStats.objects.get(pk=category.pk)
+    return {field: getattr(stats, field) for field in COUNTER_FIELDS}
+
+
+def all_stats():
+    return {
+        stats.pk: {field: getattr(stats, field) for field in COUNTER_FIELDS}
+        for stats in CategoryStats.objects.all()
+    }
+
+
+@pytest.fixture
+def tree(make_category):
+    rings = make_category('rings')
+    gold = make_category('gold-rings', parent=rings)
+    thin = make_category('thin-gold-rings', parent=gold)
+    return rings, gold, thin
+
+
+def test_compute_category_stats_rolls_products_up_to_ancestors():
+    categories = [(1, None, True), (2, 1, True), (3, 2, False), (4, None, True)]
+    products = [(3, 2, 1), (2, 1, 1)]
+
+    stats = compute_category_stats(categories, products)
+
+    assert stats[1] == {
+        'active_children_count': 1,
+        'active_products_count': 0,
+        'descendant_products_count': 3,
+        'in_stock_products_count': 0,
+    }
+    assert stats[2]['active_children_count'] == 0
+    assert stats[2]['descendant_products_count'] == 3
+    assert stats[3]['active_products_count'] == 2
+    assert stats[3]['in_stock_products_count'] == 1
+    assert stats[4]['descendant_products_count'] == 0
+
+
+def test_compute_category_stats_survives_parent_cycles():
+    stats = compute_category_stats([(1, 2, True), (2, 1, True)], [(1, 1, 1)])
+
+    assert stats[1]['descendant_products_count'] == 1
+    assert stats[2]['descendant_products_count'] == 1
+
+
+def test_creating_a_category_creates_stats_and_counts_it_as_child(tree):
+    rings, gold, thin = tree
+
+    assert get_stats(rings)['active_children_count'] == 1
+    assert get_stats(gold)['active_children_count'] == 1
+    assert get_stats(thin)['active_children_count'] == 0
+
+
+def test_product_save_updates_category_and_ancestors(tree, make_product):
+    rings, gold, thin = tree
+    make_product(thin, 'R-1', stock_quantity=3)
+    make_product(thin, 'R-2', stock_quantity=0)
+
+    assert get_stats(thin)['active_products_count'] == 2
+    assert get_stats(thin)['in_stock_products_count'] == 1
+    assert get_stats(gold)['active_products_count'] == 0
+    assert get_stats(gold)['descendant_products_count'] == 2
+    assert get_stats(rings)['descendant_products_count'] == 2
+
+
+def test_stock_and_activity_changes_shift_counters(tree, make_product):
+    rings, gold, thin = tree
+    product = make_product(thin, 'R-1', stock_quantity=3)
+
+    product.stock_quantity = 0
+    product.save()
+    assert get_stats(thin)['in_stock_products_count'] == 0
+    assert get_stats(thin)['active_products_count'] == 1
+
+    product.is_active = False
+    product.save()
+    assert get_stats(thin)['active_products_count'] == 0
+    assert get_stats(rings)['descendant_products_count'] == 0
+
+
+def test_moving_a_product_moves_its_counters(tree, make_product):
+    rings, gold, thin = tree
+    product = make_product(thin, 'R-1')
+
+    product.category = gold
+    product.save()
+
+    assert get_stats(thin)['active_products_count'] == 0
+    assert get_stats(thin)['descendant_products_count'] == 0
+    assert get_stats(gold)['active_products_count'] == 1
+    assert get_stats(gold)['descendant_products_count'] == 1
+    assert get_stats(rings)['descendant_products_count'] == 1
+
+
+def test_moving_a_category_moves_its_subtree_counters(tree, make_category, make_product):
+    rings, gold, thin = tree
+    earrings = make_category('earrings')
+    make_product(thin, 'R-1')
+    make_product(thin, 'R-2')
+
+    thin.parent = earrings
+    thin.save()
+
+    assert get_stats(gold)['active_children_count'] == 0
+    assert get_stats(gold)['descendant_products_count'] == 0
+    assert get_stats(rings)['descendant_products_count'] == 0
+    assert get_stats(earrings)['active_children_count'] == 1
+    assert get_stats(earrings)['descendant_products_count'] == 2
+
+
+def test_deleting_a_product_removes_it_from_counters(tree, make_product):
+    rings, gold, thin = tree
+    product = make_product(thin, 'R-1')
+
+    product.delete()
+
+    assert get_stats(thin)['active_products_count'] == 0
+    assert get_stats(rings)['descendant_products_count'] == 0
+
+
+def test_rebuild_matches_signal_maintained_counters(tree, make_category, make_product):
+    rings, gold, thin = tree
+    hidden = make_category('hidden', parent=rings, is_active=False)
+    make_product(thin, 'R-1', stock_quantity=0)
+    make_product(gold, 'R-2')
+    make_product(hidden, 'R-3')
+    make_product(rings, 'R-4', is_active=False)
+    maintained = all_stats()
+
+    CategoryStats.objects.update(**dict.fromkeys(COUNTER_FIELDS, 0))
+    rebuild_category_stats()
+
+    assert all_stats() == maintained
+
+
+def test_rebuild_fixes_bulk_updates_that_bypass_signals(tree, make_product):
+    rings, gold, thin = tree
+    make_product(thin, 'R-1')
+
+    Product.objects.update(stock_quantity=0)
+    rebuild_category_stats()
+
+    assert get_stats(thin)['in_stock_products_count'] == 0
@@ -0,0 +1,79 @@
+import pytest
+
+from backend.app.category_tree import build_category_tree, get_category_tree
+from backend.app.models import Category
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def categories(make_category):
+    rings = make_category('rings', order=1)
+    gold = make_category('gold-rings', parent=rings, order=2)
+    silver = make_category('silver-rings', parent=rings, order=1)
+    thin = make_category('thin-gold-rings', parent=gold)
+    earrings = make_category('earrings', order=2, is_active=False)
+    return rings, gold, silver, thin, earrings
+
+
+def test_tree_serves_paths_and_subtrees(categories):
+    rings, gold, silver, thin, earrings = categories
+    tree = build_category_tree()
+
+    assert len(tree) == 5
+    assert tree.get_by_slug('gold-rings').id == gold.pk
+    assert [node.id for node in tree.roots()] == [rings.pk, earrings.pk]
+    assert [node.id for node in tree.roots(active_only=True)] == [rings.pk]
+    assert [node.id for node in tree.children(rings.pk)] == [silver.pk, gold.pk]
+    assert [node.id for node in tree.ancestors(thin.pk)] == [rings.pk, gold.pk]
+    assert tree.descendant_ids(rings.pk, include_self=True) == [rings.pk, silver.pk, gold.pk, thin.pk]
+    assert tree.descendant_ids(thin.pk) == []
+    assert tree.full_path(thin.pk, 'en') == 'Rings > Gold Rings > Thin Gold Rings'
+
+
+def test_descendants_can_skip_inactive_nodes(categories, make_category):
+    rings, gold, silver, thin, earrings = categories
+    make_category('old-rings', parent=rings, is_active=False)
+    tree = build_category_tree()
+
+    assert tree.descendant_ids(rings.pk, active_only=True) == [silver.pk, gold.pk, thin.pk]
+
+
+def test_translations_fall_back_like_parler(categories):
+    rings = categories[0]
+    tree = build_category_tree()
+
+    node = tree.get(rings.pk)
+    assert node.has_translation('de')
+    assert node.get_translation('de')['name'] == 'Rings'
+
+
+def test_parent_cycles_do_not_break_the_tree(categories):
+    rings, gold, silver, thin, earrings = categories
+    Category.objects.filter(pk=rings.pk).update(parent=thin)
+    tree = build_category_tree()
+
+    assert tree.roots() == [tree.get(earrings.pk)]
+    assert tree.descendants(rings.pk) == []
+
+
+def test_snapshot_is_rebuilt_after_a_committed_change(categories, django_capture_on_commit_callbacks):
+    rings, gold = categories[:2]
+    tree = get_category_tree()
+    assert get_category_tree() is tree
+
+    with django_capture_on_commit_callbacks(execute=True):
+        gold.parent = None
+        gold.save()
+
+    rebuilt = get_category_tree()
+    assert rebuilt is not tree
+    assert rebuilt.get(gold.pk).parent_id is None
+
+
+def test_get_full_path_uses_the_snapshot(categories, django_assert_num_queries):
+    thin = categories[3]
+    get_category_tree()
+
+    with django_assert_num_queries(0):
+        assert thin.get_full_path() == 'Rings > Gold Rings > Thin Gold Rings'
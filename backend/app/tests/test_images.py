@@ -0,0 +1,90 @@
+import io
+import os
+
+import pytest
+from django.core.files.base import ContentFile
+from PIL import Image
+
+from backend.app import tasks
+from backend.app.images import encode_blurhash, generate_renditions, get_rendition_formats
+from backend.app.models import ProductImage, ProductImageRendition
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path, monkeypatch):
+    settings.MEDIA_ROOT = tmp_path
+    settings.PRODUCT_IMAGE_RENDITION_WIDTHS = [320, 640, 960]
+    settings.PRODUCT_IMAGE_RENDITION_FORMATS = ['webp']
+    # Generation is exercised directly; there is no broker here
+    monkeypatch.setattr(tasks.generate_product_image_renditions, 'delay', lambda pk: None)
+    return tmp_path
+
+
+@pytest.fixture
+def product_image(make_category, make_product):
+    product = make_product(make_category('rings'), 'R-1')
+    buffer = io.BytesIO()
+    Image.new('RGB', (800, 600), (200, 150, 50)).save(buffer, format='PNG')
+    image = ProductImage(product=product)
+    image.image.save('ring.png', ContentFile(buffer.getvalue()), save=False)
+    image.save()
+    return image
+
+
+def test_renditions_never_upscale(product_image):
+    assert generate_renditions(product_image) == 3
+
+    renditions = ProductImageRendition.objects.filter(image=product_image).order_by('width')
+    assert [(r.format, r.width, r.height) for r in renditions] == [
+        ('webp', 320, 240), ('webp', 640, 480), ('webp', 800, 600),
+    ]
+    product_image.refresh_from_db()
+    assert (product_image.width, product_image.height) == (800, 600)
+    assert len(product_image.placeholder) == 28
+
+
+def test_regenerating_replaces_stale_files(product_image, media_root):
+    generate_renditions(product_image)
+    generate_renditions(product_image)
+
+    current = {rendition.file.path for rendition in product_image.renditions.all()}
+    on_disk = {
+        os.path.join(directory, name)
+        for directory, _, names in os.walk(media_root)
+        for name in names if name.endswith('.webp')
+    }
+    assert len(current) == 3
+    assert on_disk == current
+
+
+def test_unsupported_formats_are_skipped(settings):
+    settings.PRODUCT_IMAGE_RENDITION_FORMATS = ['webp', 'no-such-format']
+
+    with pytest.warns(UserWarning):
+        assert get_rendition_formats() == ['webp']
+
+
+def test_blurhash_of_a_flat_image():
+    placeholder = encode_blurhash(Image.new('RGB', (64, 48), (255, 0, 0)))
+
+    assert placeholder[0] == 'L'
+    assert len(placeholder) == 28
+
+
+def test_task_skips_deleted_images(product_image):
+    pk = product_image.pk
+    product_image.delete()
+
+    assert tasks.generate_product_image_renditions(pk) == 0
+
+
+def test_detail_exposes_srcset(client, product_image):
+    generate_renditions(product_image)
+
+    image = client.get(f'/api/v1/products/{product_image.product_id}/').json()['images'][0]
+
+    assert image['width'] == 800
+    assert image['srcset']['webp'].endswith('800w')
+    assert image['srcset']['webp'].count('w,') == 2
@@ -0,0 +1,101 @@
+import pytest
+from django.core.management import CommandError, call_command
+
+from backend.api import cache as response_cache
+from backend.app.models import Product, ProductImage
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def no_rendition_tasks(monkeypatch):
+    """Image saves queue rendition tasks on commit; there is no broker here."""
+    from backend.app import tasks
+
+    monkeypatch.setattr(tasks.generate_product_image_renditions, 'delay', lambda pk: None)
+
+
+@pytest.fixture
+def product(make_category, make_product):
+    return make_product(make_category('rings'), 'R-1')
+
+
+@pytest.fixture
+def add_image(product, django_capture_on_commit_callbacks):
+    def add(order=0, is_primary=False):
+        with django_capture_on_commit_callbacks(execute=True):
+            return ProductImage.objects.create(
+                product=product, image=f'products/r-1-{order}.jpg', order=order, is_primary=is_primary
+            )
+    return add
+
+
+def primary_image_id(product):
+    return Product.objects.values_list('primary_image_id', flat=True).get(pk=product.pk)
+
+
+def test_first_image_by_order_is_primary(product, add_image):
+    add_image(order=2)
+    first = add_image(order=1)
+
+    assert primary_image_id(product) == first.pk
+
+
+def test_flagged_primary_image_wins(product, add_image):
+    add_image(order=1)
+    flagged = add_image(order=2, is_primary=True)
+
+    assert primary_image_id(product) == flagged.pk
+
+
+def test_reordering_touches_the_product_and_retires_cached_responses(
+    product, add_image, django_capture_on_commit_callbacks
+):
+    add_image(order=1)
+    second = add_image(order=2)
+    updated_at = Product.objects.get(pk=product.pk).updated_at
+    versions = response_cache.get_namespace_versions([response_cache.NAMESPACE_PRODUCTS])
+
+    with django_capture_on_commit_callbacks(execute=True):
+        second.order = 0
+        second.save()
+
+    assert primary_image_id(product) == second.pk
+    assert Product.objects.get(pk=product.pk).updated_at > updated_at
+    assert response_cache.get_namespace_versions([response_cache.NAMESPACE_PRODUCTS]) != versions
+
+
+def test_deleting_the_primary_image_repoints_the_product(product, add_image):
+    first = add_image(order=1)
+    second = add_image(order=2)
+
+    first.delete()
+
+    assert primary_image_id(product) == second.pk
+    second.delete()
+    assert primary_image_id(product) is None
+
+
+def test_sync_primary_images_repairs_stale_pointers(product, add_image, capsys):
+    image = add_image(order=1)
+    Product.objects.filter(pk=product.pk).update(primary_image=None)
+
+    with pytest.raises(CommandError):
+        call_command('sync_primary_images', check=True)
+    call_command('sync_primary_images')
+
+    assert primary_image_id(product) == image.pk
+    call_command('sync_primary_images', check=True)
+
+
+def test_sync_primary_images_retires_cached_responses(client, product, add_image):
+    image = add_image(order=1)
+    Product.objects.filter(pk=product.pk).update(primary_image=None)
+    assert client.get('/api/v1/products/').json()['results'][0]['primary_image'] is None
+    assert client.get('/api/v1/products/')['X-Cache'] == 'HIT'
+
+    call_command('sync_primary_images')
+
+    response = client.get('/api/v1/products/')
+    assert response['X-Cache'] == 'MISS'
+    assert response.json()['results'][0]['primary_image']['id'] == image.pk
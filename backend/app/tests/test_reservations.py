@@ -0,0 +1,161 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.db import connections
+
+from backend.api import cache as response_cache, tasks as api_tasks
+from backend.app import reservations
+from backend.app.models import CategoryStats, Product, StockReservation
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def product(make_category, make_product):
+    return make_product(make_category('rings'), 'R-1', stock_quantity=5)
+
+
+@pytest.fixture
+def committed(django_capture_on_commit_callbacks):
+    """Run a reservation call and its on-commit handlers like a committed request."""
+    def run(operation, *args, **kwargs):
+        with django_capture_on_commit_callbacks(execute=True):
+            return operation(*args, **kwargs)
+    return run
+
+
+@pytest.fixture
+def purged(settings, monkeypatch):
+    settings.CDN_PURGE_URL = 'http://cdn.test/purge'
+    purges = []
+    monkeypatch.setattr(api_tasks.purge_surrogate_keys, 'delay', purges.append)
+    return purges
+
+
+def stock(product):
+    return Product.objects.values_list('stock_quantity', flat=True).get(pk=product.pk)
+
+
+def in_stock_count(product):
+    return CategoryStats.objects.get(pk=product.category_id).in_stock_products_count
+
+
+def test_holds_take_stock_until_released(product):
+    reservation = reservations.reserve(product.pk, 2)
+    assert stock(product) == 3
+
+    reservations.release(reservation.pk)
+
+    assert stock(product) == 5
+    with pytest.raises(reservations.ReservationNotHeld):
+        reservations.release(reservation.pk)
+
+
+def test_confirmed_holds_stay_sold(product):
+    reservation = reservations.reserve(product.pk, 2)
+
+    assert reservations.confirm(reservation.pk).status == StockReservation.STATUS_CONFIRMED
+    assert stock(product) == 3
+    with pytest.raises(reservations.ReservationNotHeld):
+        reservations.release(reservation.pk)
+
+
+def test_sweep_returns_expired_holds(product):
+    held = reservations.reserve(product.pk, 1)
+    expired = [reservations.reserve(product.pk, 2, ttl=0) for _ in range(2)]
+    assert stock(product) == 0
+    assert in_stock_count(product) == 0
+
+    assert reservations.expire_reservations(batch_size=1) == 2
+
+    assert stock(product) == 4
+    assert in_stock_count(product) == 1
+    assert StockReservation.objects.get(pk=held.pk).status == StockReservation.STATUS_HELD
+    assert {StockReservation.objects.get(pk=r.pk).status for r in expired} == {StockReservation.STATUS_EXPIRED}
+    with pytest.raises(reservations.ReservationNotHeld):
+        reservations.confirm(expired[0].pk)
+
+
+def test_refusals(product):
+    with pytest.raises(reservations.InsufficientStock) as refusal:
+        reservations.reserve(product.pk, 6)
+    assert refusal.value.available == 5
+
+    product.is_active = False
+    product.save()
+    with pytest.raises(reservations.ProductUnavailable):
+        reservations.reserve(product.pk, 1)
+    assert not StockReservation.objects.exists()
+
+
+def test_every_stock_change_retires_cached_product_responses(client, product, committed, purged):
+    path = f'/api/v1/products/{product.pk}/'
+    etag = client.get(path)['ETag']
+    assert client.get(path)['X-Cache'] == 'HIT'
+
+    committed(reservations.reserve, product.pk, 1)
+
+    response = client.get(path)
+    assert response['X-Cache'] == 'MISS'
+    assert response.json()['stock_quantity'] == 4
+    assert client.get(path, headers={'If-None-Match': etag}).status_code == 200
+    assert purged[-1] == sorted(['products', f'product-{product.pk}', 'category-rings'])
+
+
+def test_a_sweep_retires_the_caches_once_per_batch(product, make_product, committed, purged):
+    other = make_product(product.category, 'R-2')
+    for held in (product, other):
+        reservations.reserve(held.pk, 1, ttl=0)
+    purged.clear()
+
+    assert committed(reservations.expire_reservations) == 2
+
+    assert purged == [sorted(['products', f'product-{product.pk}', f'product-{other.pk}', 'category-rings'])]
+
+
+def test_selling_out_also_moves_the_counters(product, committed, purged):
+    versions = response_cache.get_namespace_versions(response_cache.NAMESPACES)
+
+    committed(reservations.reserve, product.pk, 5)
+
+    assert purged[-1] == sorted(['categories', 'products', f'product-{product.pk}', 'category-rings'])
+    categories, products = response_cache.get_namespace_versions(response_cache.NAMESPACES)
+    assert categories != versions[0]
+    assert products != versions[1]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_parallel_holds_never_oversell(make_category, make_product):
+    product = make_product(make_category('rings'), 'R-1', stock_quantity=10)
+    clients = 8
+    start = threading.Barrier(clients)
+
+    def buy(_):
+        start.wait()
+        placed = 0
+        try:
+            for _ in range(4):
+                try:
+                    reservations.reserve(product.pk, 1)
+                    placed += 1
+                except reservations.InsufficientStock:
+                    pass
+                assert stock(product) >= 0
+        finally:
+            connections.close_all()
+        return placed
+
+    with ThreadPoolExecutor(clients) as pool:
+        placed = sum(pool.map(buy, range(clients)))
+
+    assert placed == 10
+    assert stock(product) == 0
+    assert StockReservation.objects.filter(product=product).count() == 10
+    assert in_stock_count(product) == 0
+
+    assert reservations.expire_reservations() == 0
+    StockReservation.objects.update(expires_at=product.created_at)
+    assert reservations.expire_reservations(batch_size=3) == 10
+    assert stock(product) == 10
+    assert in_stock_count(product) == 1
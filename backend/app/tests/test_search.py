@@ -0,0 +1,76 @@
+import pytest
+
+from backend.app.models import ProductSearchDocument
+from backend.app.search import get_search_config, update_search_documents
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def catalog(make_category, make_product):
+    rings = make_category('rings')
+
+    def translated(sku, material='', **names):
+        product = make_product(rings, sku, material=material)
+        for language_code, name in names.items():
+            product.set_current_language(language_code)
+            product.name = name
+            product.description = f'{name}, handmade.'
+            product.save()
+        return product
+
+    return {
+        'ring': translated('GR-1001', 'Gold', en='Golden wedding rings', de='Goldene Eheringe'),
+        'necklace': translated('SN-2002', 'Silver', en='Silver necklace', de='Silberkette'),
+        'bracelet': translated('PB-3003', 'Pearl', en='Pearl bracelet'),
+    }
+
+
+def search(client, terms, language='en'):
+    response = client.get('/api/v1/products/', {'search': terms}, headers={'Accept-Language': language})
+    assert response.status_code == 200
+    return [product['sku'] for product in response.json()['results']]
+
+
+def test_search_configs_follow_the_language():
+    assert get_search_config('de') == 'german'
+    assert get_search_config('de-at') == 'german'
+    assert get_search_config('pl') == 'simple'
+
+
+def test_every_translation_gets_a_document(catalog):
+    languages = ProductSearchDocument.objects.filter(
+        product=catalog['ring']
+    ).values_list('language_code', flat=True)
+
+    assert sorted(languages) == ['de', 'en']
+
+
+def test_english_search_matches_word_forms(client, catalog):
+    assert search(client, 'ring') == ['GR-1001']
+    assert search(client, 'necklaces') == ['SN-2002']
+
+
+def test_german_search_uses_german_stemming(client, catalog):
+    assert search(client, 'Ehering', language='de') == ['GR-1001']
+
+
+def test_untranslated_products_are_found_through_fallbacks(client, catalog):
+    assert search(client, 'pearl', language='de') == ['PB-3003']
+
+
+def test_partial_skus_and_typos_match_by_similarity(client, catalog):
+    assert search(client, 'SN-20') == ['SN-2002']
+    assert search(client, 'necklase') == ['SN-2002']
+
+
+def test_results_are_ranked_by_relevance(client, catalog):
+    assert search(client, 'silver OR pearl bracelet')[0] == 'PB-3003'
+
+
+def test_rebuild_restores_missing_documents(catalog):
+    ProductSearchDocument.objects.all().delete()
+
+    update_search_documents()
+
+    assert ProductSearchDocument.objects.count() == 5
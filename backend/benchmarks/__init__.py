@@ -0,0 +1,7 @@
+"""
+Reproducible performance harness for the catalog API.
+
+``catalog`` builds synthetic catalogs from the factories in ``factories``;
+``runner`` measures every routed API endpoint against them. Both are driven
+by the ``benchmark_api`` management command.
+"""
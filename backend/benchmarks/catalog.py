@@ -0,0 +1,158 @@
+"""
+Synthetic catalog generation for benchmarks.
+
+Catalogs are deterministic for a given size and seed: categories form a
+nested tree, every product is translated into en, de and fr and has a
+configurable number of images with WebP/AVIF rendition rows. Rows are written
+with ``bulk_create`` in batches; the denormalized data that signals normally
+maintain (category counters, primary image pointers, search documents) is
+rebuilt once at the end.
+"""
+import io
+import random
+
+import factory.random
+from django.core.management import call_command
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from backend.app.category_stats import rebuild_category_stats
+from backend.app.category_tree import invalidate_category_tree
+from backend.app.models import (
+    Category,
+    CategoryStats,
+    Product,
+    ProductImage,
+    ProductImageRendition,
+    ProductSearchDocument,
+)
+from backend.app.search import update_search_documents
+from backend.benchmarks.factories import (
+    LANGUAGES,
+    CategoryFactory,
+    CategoryTranslationFactory,
+    ProductFactory,
+    ProductImageFactory,
+    ProductImageRenditionFactory,
+    ProductTranslationFactory,
+)
+
+RENDITION_WIDTHS = (320, 640)
+
+CATALOG_MODELS = (
+    Category,
+    Category._parler_meta.root_model,
+    CategoryStats,
+    Product,
+    Product._parler_meta.root_model,
+    ProductImage,
+    ProductImageRendition,
+    ProductSearchDocument,
+)
+
+FACTORIES = (
+    CategoryFactory,
+    CategoryTranslationFactory,
+    ProductFactory,
+    ProductTranslationFactory,
+    ProductImageFactory,
+    ProductImageRenditionFactory,
+)
+
+
+def clear_catalog():
+    """Truncate catalog tables and reset their sequences so ids are reproducible."""
+    tables = [model._meta.db_table for model in CATALOG_MODELS]
+    statements = connection.ops.sql_flush(
+        no_style(), tables, reset_sequences=True, allow_cascade=True
+    )
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def build_categories(rng, count, depth):
+    """Create ``count`` categories spread over ``depth`` levels."""
+    roots = count if depth <= 1 else max(1, count // (2 ** depth))
+    levels = [CategoryFactory.build_batch(roots)]
+    Category.objects.bulk_create(levels[0])
+    created = roots
+    while created < count:
+        level = []
+        # Once the deepest level exists, further categories become its siblings
+        parents = levels[min(len(levels), depth - 1) - 1]
+        for _ in range(min(count - created, len(parents) * 3)):
+            level.append(CategoryFactory.build(parent=rng.choice(parents)))
+        Category.objects.bulk_create(level)
+        created += len(level)
+        levels.append(level)
+
+    categories = [category for level in levels for category in level]
+    Category._parler_meta.root_model.objects.bulk_create(
+        CategoryTranslationFactory.build(master=category, language_code=code)
+        for category in categories
+        for code in LANGUAGES
+    )
+    return categories
+
+
+def build_products(rng, count, categories, images_per_product, batch_size):
+    """Create translated products with images and renditions, in batches."""
+    for start in range(0, count, batch_size):
+        products = Product.objects.bulk_create(
+            ProductFactory.build(category=rng.choice(categories))
+            for _ in range(min(batch_size, count - start))
+        )
+        Product._parler_meta.root_model.objects.bulk_create(
+            ProductTranslationFactory.build(master=product, language_code=code)
+            for product in products
+            for code in LANGUAGES
+        )
+        images = ProductImage.objects.bulk_create(
+            ProductImageFactory.build(product=product, order=index, is_primary=index == 0)
+            for product in products
+            for index in range(images_per_product)
+        )
+        ProductImageRendition.objects.bulk_create(
+            ProductImageRenditionFactory.build(image=image, format=fmt, width=width)
+            for image in images
+            for fmt in (ProductImageRendition.FORMAT_WEBP, ProductImageRendition.FORMAT_AVIF)
+            for width in RENDITION_WIDTHS
+        )
+        yield start + len(products)
+
+
+def build_catalog(products=1000, categories=40, depth=3, images_per_product=2,
+                  seed=42, batch_size=5000, progress=None):
+    """Replace the catalog with a synthetic one and return its size."""
+    rng = random.Random(seed)
+    factory.random.reseed_random(seed)
+    for model_factory in FACTORIES:
+        model_factory.reset_sequence()
+
+    with transaction.atomic():
+        clear_catalog()
+        category_objects = build_categories(rng, categories, depth)
+        for done in build_products(rng, products, category_objects, images_per_product, batch_size):
+            if progress:
+                progress(done, products)
+
+        rebuild_category_stats()
+        call_command('sync_primary_images', stdout=io.StringIO())
+        update_search_documents()
+        invalidate_category_tree()
+
+    # Planner statistics, as autovacuum keeps them on a live database; without
+    # them filtered lists are planned for a near-empty table
+    with connection.cursor() as cursor:
+        for model in CATALOG_MODELS:
+            cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
+
+    return {
+        'products': products,
+        'categories': len(category_objects),
+        'depth': depth,
+        'images_per_product': images_per_product,
+        'languages': list(LANGUAGES),
+        'seed': seed,
+    }
@@ -0,0 +1,128 @@
+"""
+Base class for management commands benchmarking the API.
+
+Commands run against a throwaway test database holding a synthetic catalog,
+so benchmarks never touch real data, and report results as JSON.
+"""
+import json
+import logging
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from backend.app.models import Product
+from backend.benchmarks.catalog import build_catalog
+
+
+class BenchmarkCommand(BaseCommand):
+    """Set up the test database and catalog, call ``run`` and write the report."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=1000, help='Catalog size (1k to 200k).')
+        parser.add_argument('--categories', type=int, default=40)
+        parser.add_argument('--depth', type=int, default=3, help='Category tree depth.')
+        parser.add_argument('--images', type=int, default=2, help='Images per product.')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--requests', type=int, default=50, help='Timed requests per scenario.')
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--language', default='en')
+        parser.add_argument(
+            '--only',
+            action='append',
+            default=[],
+            help='Only run scenarios whose name contains this text (repeatable).',
+        )
+        parser.add_argument('--output', help='Write results as JSON to this file.')
+        parser.add_argument(
+            '--keepdb',
+            action='store_true',
+            help='Keep the test database, and reuse its catalog when the size matches.',
+        )
+
+    def run(self, options):
+        """Run the benchmark and return a JSON-serializable report."""
+        raise NotImplementedError
+
+    def benchmark(self, options):
+        query_logger = logging.getLogger('django.db.backends')
+        log_level = query_logger.level
+        query_logger.setLevel(logging.INFO)
+        setup_test_environment(debug=False)
+        old_config = setup_databases(
+            verbosity=0,
+            interactive=False,
+            keepdb=options['keepdb'],
+            aliases={'default'},
+            serialized_aliases=set(),
+        )
+        try:
+            report = self.run(options)
+        finally:
+            teardown_databases(old_config, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+            query_logger.setLevel(log_level)
+
+        if options['output']:
+            with open(options['output'], 'w') as fp:
+                json.dump(report, fp, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+        return report
+
+    def prepare_catalog(self, options):
+        """Build the synthetic catalog, or reuse a kept one of the same size."""
+        catalog = {
+            'products': options['products'],
+            'categories': options['categories'],
+            'depth': options['depth'],
+            'images_per_product': options['images'],
+            'seed': options['seed'],
+        }
+        if options['keepdb'] and Product.objects.count() == options['products']:
+            self.stdout.write('Reusing the catalog in the kept test database.')
+            return catalog
+
+        self.stdout.write(f"Building a catalog of {options['products']} products...")
+        return build_catalog(
+            products=options['products'],
+            categories=options['categories'],
+            depth=options['depth'],
+            images_per_product=options['images'],
+            seed=options['seed'],
+            progress=lambda done, total: self.stdout.write(f'  {done}/{total} products'),
+        )
+
+    def get_meta(self, options, catalog):
+        return {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'commit': self.get_commit(),
+            'python': sys.version.split()[0],
+            'django': django.get_version(),
+            'database': f"{connection.vendor} {'.'.join(map(str, connection.get_database_version()))}",
+            'platform': platform.platform(),
+            'language': options['language'],
+            'catalog': catalog,
+        }
+
+    def selected(self, options, name):
+        return not options['only'] or any(text in name for text in options['only'])
+
+    @staticmethod
+    def get_commit():
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
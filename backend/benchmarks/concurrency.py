@@ -0,0 +1,92 @@
+"""
+Concurrency benchmark of the async catalog views against the sync views.
+
+Both variants go through Django's ASGI request handling with the full
+middleware stack; only the v1 URLconf differs. Requests are issued by
+``concurrency`` coroutines running back to back on one event loop, the way an
+ASGI server interleaves connections in a single worker process.
+"""
+import asyncio
+import statistics
+import time
+from types import ModuleType
+
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.test.utils import override_settings
+from django.urls import include, path
+
+from backend.api.v1 import urls as v1_urls
+from backend.benchmarks.runner import discover_scenarios, percentile
+
+# Router routes served by the async views, and variants they hand to the sync views
+ASYNC_ROUTES = {
+    'category-tree',
+    'product-list',
+    'product-detail',
+    'product-featured',
+    'product-by-category',
+}
+SYNC_ONLY_VARIANTS = {'keyset', 'single-language'}
+
+
+def get_urlconf(async_views):
+    """Return a root URLconf serving the v1 API with or without the async views."""
+    patterns = v1_urls.sync_urlpatterns
+    if async_views:
+        patterns = v1_urls.async_urlpatterns + patterns
+    urlconf = ModuleType(f"{__name__}.{'async' if async_views else 'sync'}_urls")
+    urlconf.urlpatterns = [path('api/v1/', include((patterns, v1_urls.app_name)))]
+    return urlconf
+
+
+def async_scenarios(samples):
+    """Yield the router scenarios the async views serve natively."""
+    for scenario in discover_scenarios(samples):
+        route, _, variant = scenario.name.partition('[')
+        if route in ASYNC_ROUTES and variant.rstrip(']') not in SYNC_ONLY_VARIANTS:
+            yield scenario
+
+
+async def _worker(scenario, count, headers, latencies, responses):
+    client = AsyncClient()
+    for _ in range(count):
+        started = time.perf_counter()
+        response = await client.get(scenario.path, scenario.params, headers=headers)
+        latencies.append(time.perf_counter() - started)
+        responses.add((response.status_code, len(response.content)))
+
+
+async def _run(scenario, requests, warmup, concurrency, headers):
+    await _worker(scenario, warmup, headers, [], set())
+    latencies = []
+    responses = set()
+    shares = [requests // concurrency + (i < requests % concurrency) for i in range(concurrency)]
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        _worker(scenario, share, headers, latencies, responses) for share in shares if share
+    ))
+    return latencies, time.perf_counter() - started, responses
+
+
+def measure_concurrent(scenario, async_views, requests=200, warmup=5, concurrency=10,
+                       language='en'):
+    """Measure one scenario under concurrent ASGI requests and return a result dict."""
+    headers = {'Accept-Language': language}
+    with override_settings(ROOT_URLCONF=get_urlconf(async_views)):
+        latencies, elapsed, responses = async_to_sync(_run)(
+            scenario, requests, warmup, concurrency, headers
+        )
+
+    latencies.sort()
+    return {
+        'views': 'async' if async_views else 'sync',
+        'concurrency': concurrency,
+        'requests': requests,
+        # (status, bytes) pairs seen; more than one means unstable responses
+        'responses': sorted(responses),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 3),
+        'throughput_rps': round(requests / elapsed, 2),
+    }
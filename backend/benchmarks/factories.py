@@ -0,0 +1,121 @@
+"""
+factory_boy factories for synthetic catalog data.
+
+Factories are used with ``build()`` and the results are saved with
+``bulk_create`` by ``backend.benchmarks.catalog``, so no model signals run.
+Translated names are drawn from a small per-language jewelry vocabulary to
+keep full-text search realistic.
+"""
+from decimal import Decimal
+
+import factory
+from factory import fuzzy
+
+from backend.app.models import Category, Product, ProductImage, ProductImageRendition
+
+LANGUAGES = ('en', 'de', 'fr')
+
+VOCABULARY = {
+    'en': {
+        'kinds': ['Ring', 'Necklace', 'Bracelet', 'Earrings', 'Pendant', 'Brooch', 'Anklet', 'Chain'],
+        'materials': ['Gold', 'Silver', 'Platinum', 'Rose Gold', 'Pearl', 'Diamond', 'Sapphire', 'Emerald'],
+        'styles': ['Classic', 'Vintage', 'Minimal', 'Eternity', 'Solitaire', 'Twisted', 'Engraved', 'Halo'],
+    },
+    'de': {
+        'kinds': ['Ring', 'Halskette', 'Armband', 'Ohrringe', 'Anhänger', 'Brosche', 'Fußkettchen', 'Kette'],
+        'materials': ['Gold', 'Silber', 'Platin', 'Roségold', 'Perlen', 'Diamant', 'Saphir', 'Smaragd'],
+        'styles': ['Klassisch', 'Vintage', 'Minimal', 'Memoire', 'Solitär', 'Gedreht', 'Graviert', 'Halo'],
+    },
+    'fr': {
+        'kinds': ['Bague', 'Collier', 'Bracelet', "Boucles d'oreilles", 'Pendentif', 'Broche', 'Chaîne de cheville', 'Chaîne'],
+        'materials': ['Or', 'Argent', 'Platine', 'Or rose', 'Perle', 'Diamant', 'Saphir', 'Émeraude'],
+        'styles': ['Classique', 'Vintage', 'Minimaliste', 'Éternité', 'Solitaire', 'Torsadé', 'Gravé', 'Halo'],
+    },
+}
+
+CategoryTranslation = Category._parler_meta.root_model
+ProductTranslation = Product._parler_meta.root_model
+
+
+def translated_name(language_code, n, style=None):
+    """Deterministic product name for a sequence number in a language."""
+    words = VOCABULARY[language_code]
+    return ' '.join([
+        words['styles'][(n // 64) % 8] if style is None else style,
+        words['materials'][(n // 8) % 8],
+        words['kinds'][n % 8],
+    ])
+
+
+class CategoryFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Category
+
+    slug = factory.Sequence(lambda n: f'category-{n}')
+    is_active = True
+    order = factory.Sequence(lambda n: n % 10)
+
+
+class CategoryTranslationFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = CategoryTranslation
+
+    language_code = 'en'
+    name = factory.LazyAttribute(lambda o: f'{o.master.slug} ({o.language_code})')
+    description = factory.Faker('sentence', nb_words=10)
+
+
+class ProductFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Product
+
+    sku = factory.Sequence(lambda n: f'BM{n:07d}')
+    price = fuzzy.FuzzyDecimal(20, 5000)
+    discount_price = factory.LazyAttribute(
+        lambda o: (o.price * Decimal('0.8')).quantize(Decimal('0.01')) if o.on_sale else None
+    )
+    stock_quantity = fuzzy.FuzzyInteger(0, 50)
+    is_active = fuzzy.FuzzyChoice([True] * 19 + [False])
+    is_featured = fuzzy.FuzzyChoice([True] + [False] * 9)
+    weight = fuzzy.FuzzyDecimal(1, 80)
+    material = fuzzy.FuzzyChoice(VOCABULARY['en']['materials'])
+
+    class Params:
+        on_sale = fuzzy.FuzzyChoice([True] + [False] * 3)
+
+
+class ProductTranslationFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = ProductTranslation
+
+    language_code = 'en'
+    name = factory.LazyAttribute(lambda o: translated_name(o.language_code, o.master.pk or 0))
+    short_description = factory.Faker('sentence', nb_words=8)
+    description = factory.Faker('paragraph', nb_sentences=4)
+
+
+class ProductImageFactory(factory.django.DjangoModelFactory):
+    """Image rows point at a shared file name; the API never opens the file."""
+
+    class Meta:
+        model = ProductImage
+
+    image = factory.Sequence(lambda n: f'benchmarks/product-{n % 50}.jpg')
+    alt_text = factory.LazyAttribute(lambda o: f'Image of {o.product.sku}')
+    order = 0
+    is_primary = False
+    width = 1600
+    height = 1200
+    placeholder = 'LEHV6nWB2yk8pyo0adR*.7kCMdnj'
+
+
+class ProductImageRenditionFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = ProductImageRendition
+
+    format = ProductImageRendition.FORMAT_WEBP
+    width = 320
+    height = factory.LazyAttribute(lambda o: o.width * 3 // 4)
+    file = factory.LazyAttribute(
+        lambda o: f'benchmarks/renditions/{o.image.image.name.rsplit("/", 1)[-1]}-{o.width}w.{o.format}'
+    )
@@ -0,0 +1,214 @@
+"""
+Latency, throughput, query and memory measurements for the catalog API.
+
+Scenarios are discovered from the v1 router, so every list, detail and extra
+action route is covered; a few variants add the query parameters that change
+the work done (search, ordering, deep pages, keyset pagination, the
+single-language projection, category subtrees). Requests go through the
+Django test client, so only the database is needed.
+"""
+import math
+import statistics
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+
+from django.db import connections
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+
+from backend.api.v1.urls import app_name, router
+from backend.app.category_tree import get_category_tree
+from backend.app.models import Category, Product
+
+# Write endpoints, measured by benchmark_reservations
+EXCLUDED_BASENAMES = ('reservation',)
+
+# Query parameters an action cannot do without
+ACTION_PARAMS = {
+    'product-by-category': {'category_slug': '{category_slug}'},
+}
+
+VARIANTS = {
+    'product-by-category': {
+        'subtree': {'category_slug': '{subtree_category}', 'include_descendants': 'true'},
+    },
+    'category-list': {
+        'single-language': {'single_language': 'true'},
+    },
+    'product-list': {
+        'search': {'search': 'gold ring'},
+        'ordering': {'ordering': 'price'},
+        'price-range': {'min_price': '250', 'max_price': '1000', 'ordering': 'effective_price'},
+        'deep-page': {'page': '{deep_page}'},
+        'keyset': {'pagination': 'cursor'},
+        'single-language': {'single_language': 'true'},
+        'category': {'category': '{category}'},
+        'category-subtree': {'category': '{root_category}', 'include_descendants': 'true'},
+    },
+}
+
+
+@dataclass
+class Scenario:
+    name: str
+    path: str
+    params: dict = field(default_factory=dict)
+
+
+def get_samples(page_size=20):
+    """Pick the objects detail and filter scenarios refer to, deterministically."""
+    products = Product.objects.filter(is_active=True).order_by('pk')
+    product = products[products.count() // 2]
+    category = Category.objects.filter(is_active=True).annotate(
+        product_count=Count('products')
+    ).order_by('-product_count', 'pk').first()
+    tree = get_category_tree()
+    root = max(tree.roots(active_only=True), key=lambda node: (len(tree.descendants(node.id)), -node.id))
+    # A small subtree: the deepest category with children
+    subtree = max(
+        (node for node in tree.all(active_only=True) if node.children_ids),
+        key=lambda node: (len(node.ancestor_ids), -node.id),
+        default=root
+    )
+    return {
+        'product': product.pk,
+        'category': category.slug,
+        'category_slug': category.slug,
+        'root_category': root.slug,
+        'subtree_category': subtree.slug,
+        'deep_page': max(1, products.count() // page_size // 2),
+    }
+
+
+def discover_scenarios(samples):
+    """Yield a scenario for every route registered on the v1 router."""
+    for _prefix, viewset, basename in router.registry:
+        if basename in EXCLUDED_BASENAMES:
+            continue
+        lookup = viewset.lookup_url_kwarg or viewset.lookup_field
+        routes = [('list', False), ('detail', True)] + [
+            (action.url_name, action.detail) for action in viewset.get_extra_actions()
+        ]
+        for url_name, detail in routes:
+            name = f'{basename}-{url_name}'
+            path = reverse(
+                f'{app_name}:{name}',
+                kwargs={lookup: samples[basename]} if detail else None
+            )
+            params = ACTION_PARAMS.get(name, {})
+            yield Scenario(name, path, _format(params, samples))
+            for variant, extra in VARIANTS.get(name, {}).items():
+                yield Scenario(f'{name}[{variant}]', path, _format({**params, **extra}, samples))
+
+
+def _format(params, samples):
+    return {key: str(value).format(**samples) for key, value in params.items()}
+
+
+class QueryCounter:
+    """``execute_wrapper`` counting queries regardless of DEBUG and reconnects."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of a sorted list."""
+    index = max(0, math.ceil(percent / 100 * len(values)) - 1)
+    return values[index]
+
+
+def _fetch(client, scenario, headers):
+    """Request a scenario and return the response with its body."""
+    response = client.get(scenario.path, scenario.params, **headers)
+    # Streamed bodies are produced, and query the database, while consumed
+    content = b''.join(response.streaming_content) if response.streaming else response.content
+    return response, content
+
+
+def _timed_requests(scenario, count, headers):
+    client = Client()
+    latencies = []
+    for _ in range(count):
+        started = time.perf_counter()
+        _fetch(client, scenario, headers)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def _threaded_requests(scenario, count, headers):
+    try:
+        return _timed_requests(scenario, count, headers)
+    finally:
+        connections.close_all()
+
+
+def measure(scenario, requests=50, warmup=5, concurrency=1, language='en'):
+    """Measure one scenario and return a JSON-serializable result."""
+    headers = {'HTTP_ACCEPT_LANGUAGE': language}
+    client = Client()
+    for _ in range(warmup):
+        _fetch(client, scenario, headers)
+
+    # One traced request for queries and memory, kept out of the timings
+    queries = QueryCounter()
+    tracemalloc.start()
+    with ExitStack() as stack:
+        # Reads may be routed to a replica
+        for conn in connections.all():
+            stack.enter_context(conn.execute_wrapper(queries))
+        response, content = _fetch(client, scenario, headers)
+    _, memory_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    if concurrency > 1:
+        shares = [requests // concurrency + (i < requests % concurrency) for i in range(concurrency)]
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = executor.map(
+                lambda share: _threaded_requests(scenario, share, headers), shares
+            )
+            latencies = [latency for result in results for latency in result]
+    else:
+        latencies = _timed_requests(scenario, requests, headers)
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'path': scenario.path,
+        'params': scenario.params,
+        'status': response.status_code,
+        'bytes': len(content),
+        'requests': requests,
+        'concurrency': concurrency,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p90_ms': round(percentile(latencies, 90) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 3),
+        'max_ms': round(latencies[-1] * 1000, 3),
+        'throughput_rps': round(requests / elapsed, 2),
+        'queries': queries.count,
+        'memory_peak_kb': round(memory_peak / 1024, 1),
+    }
+
+
+def compare(baseline, current, metrics=('p50_ms', 'p99_ms', 'throughput_rps', 'queries')):
+    """Return ``(scenario, metric, before, after, change)`` rows for shared scenarios."""
+    rows = []
+    for name, result in current['results'].items():
+        before = baseline['results'].get(name)
+        if before is None:
+            continue
+        for metric in metrics:
+            old, new = before[metric], result[metric]
+            change = (new - old) / old * 100 if old else None
+            rows.append((name, metric, old, new, change))
+    return rows
@@ -0,0 +1,161 @@
+"""
+Process startup measurements for ``benchmark_startup``.
+
+``probe`` runs in a fresh interpreter (``python -m backend.benchmarks.startup``)
+and boots the application the way a spawned server worker does: it imports
+``backend.core.asgi``, sends one request through the ASGI application and
+prints the timings as JSON. ``run_server`` starts a real server, waits for
+its workers and measures how much of their memory is shared.
+
+Nothing here imports Django at module level, so probes time the whole import.
+"""
+import json
+import re
+import resource
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+# Logged by uvicorn once per worker, under gunicorn as well
+STARTUP_COMPLETE = 'Application startup complete'
+
+
+def probe(path):
+    started = time.perf_counter()
+    from backend.core.asgi import application
+    imported = time.perf_counter()
+
+    import asyncio
+
+    messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        # Django listens for a disconnect while the view runs
+        await asyncio.Event().wait()
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', b'localhost')],
+        'server': ('localhost', 80),
+        'client': ('127.0.0.1', 0),
+    }
+    asyncio.run(application(scope, receive, send))
+    served = time.perf_counter()
+    return {
+        'status': sent[0]['status'],
+        'import_ms': round((imported - started) * 1000, 1),
+        'first_request_ms': round((served - imported) * 1000, 1),
+        'boot_ms': round((served - started) * 1000, 1),
+        'modules': len(sys.modules),
+        'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def run_probe(path, env):
+    """Boot the application in a new interpreter with ``env`` and return the probe results."""
+    result = subprocess.run(
+        [sys.executable, '-m', __name__, path],
+        env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def get_children(pid):
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as fp:
+            return [int(child) for child in fp.read().split()]
+    except OSError:
+        return []
+
+
+def get_memory(pid):
+    """Proportional (PSS) and private (USS) memory of a process, in KiB, from smaps_rollup."""
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as fp:
+        for line in fp:
+            match = re.match(r'(\w+):\s+(\d+) kB', line)
+            if match:
+                fields[match[1]] = int(match[2])
+    return fields['Pss'], fields['Private_Clean'] + fields['Private_Dirty']
+
+
+def _get(url):
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as error:
+        return error.code
+    except OSError:
+        return None
+
+
+def run_server(command, env, url, workers, requests=100, timeout=60):
+    """
+    Start a server, wait for all its workers and load it with ``requests``
+    requests, then stop it. Returns the seconds until the first response and
+    until every worker had started, and the memory of the process tree.
+    """
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    workers_ready = threading.Event()
+    ready = []
+
+    def watch():
+        for line in process.stderr:
+            if STARTUP_COMPLETE in line:
+                ready.append(time.perf_counter() - started)
+                if len(ready) == workers:
+                    workers_ready.set()
+
+    threading.Thread(target=watch, daemon=True).start()
+    try:
+        while _get(url) != 200:
+            if process.poll() is not None or time.perf_counter() - started > timeout:
+                raise RuntimeError(f"{' '.join(command)} did not come up")
+            time.sleep(0.01)
+        first_response = time.perf_counter() - started
+        if not workers_ready.wait(timeout):
+            raise RuntimeError(f'Only {len(ready)} of {workers} workers started')
+
+        with ThreadPoolExecutor(max_workers=workers * 2) as executor:
+            statuses = list(executor.map(_get, [url] * requests))
+
+        pids = [process.pid, *get_children(process.pid)]
+        memory = [get_memory(pid) for pid in pids]
+    finally:
+        process.terminate()
+        process.wait(timeout)
+
+    return {
+        'first_response_s': round(first_response, 3),
+        'workers_ready_s': round(ready[-1], 3),
+        'processes': len(pids),
+        'pss_mb': round(sum(pss for pss, _ in memory) / 1024, 1),
+        'private_mb': round(sum(private for _, private in memory) / 1024, 1),
+        'errors': sum(status != 200 for status in statuses),
+    }
+
+
+if __name__ == '__main__':
+    print(json.dumps(probe(sys.argv[1])))
@@ -0,0 +1,60 @@
+import pytest
+
+from backend.app.models import CategoryStats, Product, ProductSearchDocument
+from backend.benchmarks.catalog import build_catalog
+from backend.benchmarks.runner import compare, discover_scenarios, get_samples, measure, percentile
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def catalog(settings):
+    settings.API_CACHE_ENABLED = False
+    return build_catalog(products=60, categories=12, depth=3, images_per_product=1, batch_size=25)
+
+
+def snapshot():
+    return list(Product.objects.order_by('pk').values_list('pk', 'sku', 'price', 'category_id'))
+
+
+@pytest.mark.django_db(transaction=True)
+def test_catalogs_are_reproducible(catalog):
+    first = snapshot()
+
+    build_catalog(products=60, categories=12, depth=3, images_per_product=1, batch_size=25)
+
+    assert snapshot() == first
+    assert len(first) == 60
+
+
+def test_denormalized_data_is_rebuilt(catalog):
+    counted = sum(CategoryStats.objects.values_list('active_products_count', flat=True))
+
+    assert counted == Product.objects.filter(is_active=True).count() > 0
+    assert not Product.objects.filter(primary_image=None).exists()
+    assert ProductSearchDocument.objects.count() == 60 * len(catalog['languages'])
+
+
+def test_every_scenario_succeeds(catalog):
+    scenarios = list(discover_scenarios(get_samples()))
+
+    assert {'product-list', 'product-detail', 'category-tree', 'product-list[keyset]'} <= {
+        scenario.name for scenario in scenarios
+    }
+    for scenario in scenarios:
+        result = measure(scenario, requests=1, warmup=0)
+        assert result['status'] == 200, scenario.name
+        assert result['queries'] > 0
+
+
+def test_percentiles_and_comparisons():
+    assert percentile([1, 2, 3, 4], 50) == 2
+    assert percentile([1, 2, 3, 4], 99) == 4
+
+    baseline = {'results': {'a': {'p50_ms': 10, 'queries': 4}, 'gone': {'p50_ms': 1, 'queries': 1}}}
+    current = {'results': {'a': {'p50_ms': 5, 'queries': 4}, 'new': {'p50_ms': 1, 'queries': 1}}}
+
+    assert compare(baseline, current, metrics=('p50_ms', 'queries')) == [
+        ('a', 'p50_ms', 10, 5, -50.0),
+        ('a', 'queries', 4, 4, 0.0),
+    ]
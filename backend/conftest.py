@@ -0,0 +1,40 @@
+import pytest
+from django.core.cache import caches
+
+from backend.app.models import Category, Product
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Start every test with empty caches, so versions and cached responses do not leak."""
+    for cache in caches.all():
+        cache.clear()
+
+
+@pytest.fixture
+def make_category(db, django_capture_on_commit_callbacks):
+    """Create a category like a committed admin save, on-commit invalidation included."""
+    def make(slug, parent=None, **fields):
+        category = Category(slug=slug, parent=parent, **fields)
+        category.set_current_language('en')
+        category.name = slug.replace('-', ' ').title()
+        with django_capture_on_commit_callbacks(execute=True):
+            category.save()
+        return category
+    return make
+
+
+@pytest.fixture
+def make_product(db, django_capture_on_commit_callbacks):
+    """Create a product with an English translation like a committed admin save."""
+    def make(category, sku, price=100, stock_quantity=5, **fields):
+        product = Product(
+            category=category, sku=sku, price=price, stock_quantity=stock_quantity, **fields
+        )
+        product.set_current_language('en')
+        product.name = f'Product {sku}'
+        product.description = f'Description of {sku}'
+        with django_capture_on_commit_callbacks(execute=True):
+            product.save()
+        return product
+    return make
@@ -0,0 +1,10 @@
+__all__ = ('celery_app',)
+
+
+def __getattr__(name):
+    # Celery is imported on first use rather than by every web worker; task
+    # modules import the app themselves
+    if name == 'celery_app':
+        from .celery import app
+        return app
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -3,14 +3,59 @@ ASGI config for core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Django does not handle ASGI lifespan events itself; they are answered here
+so that each worker drains its database connection pool on shutdown.
+Requests go through the middleware stack of their path prefix (see
+backend/core/handlers.py).
+
+Importing this module also does the work Django otherwise leaves to the
+first request: importing the URLconf with every view and loading the
+translation catalogs. Under gunicorn with ``preload_app`` (see
+gunicorn.conf.py) that happens once, in the master process, and workers
+start out warm. No connections are opened here.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
 
 import os
 
-from django.core.asgi import get_asgi_application
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.urls import get_resolver
+from django.utils import translation
+
+from backend.core.db_pool import close_pools
+from backend.core.handlers import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.core.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+
+def preload():
+    get_resolver().url_patterns
+    for code, _ in settings.LANGUAGES:
+        with translation.override(code):
+            pass
+
+
+preload()
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await sync_to_async(close_pools, thread_sensitive=False)()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+    else:
+        await django_application(scope, receive, send)
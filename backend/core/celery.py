@@ -0,0 +1,14 @@
+"""
+Celery application for background jobs.
+
+Workers are started with ``celery -A backend.core worker``.
+"""
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.core.settings')
+
+app = Celery('backend')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -0,0 +1,75 @@
+"""
+Database connection pool statistics and shutdown.
+
+Pools are created by Django's PostgreSQL backend from
+``DATABASES[alias]['OPTIONS']['pool']`` and live per process. Statistics
+are therefore per worker; ``pid`` tells workers apart.
+"""
+import os
+
+from django.conf import settings
+from django.db import connections
+
+
+def get_pools():
+    """Return the pools this process has created, by database alias."""
+    pools = {}
+    for alias in connections:
+        # Reading ``connection.pool`` would create a pool; only look up existing ones
+        pool = getattr(connections[alias], '_connection_pools', {}).get(alias)
+        if pool is not None:
+            pools[alias] = pool
+    return pools
+
+
+def get_pool_stats():
+    """
+    Return usage statistics of every pool in this process.
+
+    Counters are cumulative since the pool was opened. ``saturation`` is the
+    share of ``max_size`` checked out right now and ``wait_ms_avg`` the mean
+    time a checkout waited for a connection.
+    """
+    pools = {}
+    for alias, pool in get_pools().items():
+        stats = pool.get_stats()
+        in_use = stats['pool_size'] - stats['pool_available']
+        checkouts = stats.get('requests_num', 0)
+        wait_ms = stats.get('requests_wait_ms', 0)
+        pools[alias] = {
+            'name': pool.name,
+            'min_size': stats['pool_min'],
+            'max_size': stats['pool_max'],
+            'size': stats['pool_size'],
+            'available': stats['pool_available'],
+            'in_use': in_use,
+            'saturation': round(in_use / stats['pool_max'], 3),
+            'waiting': stats.get('requests_waiting', 0),
+            'checkouts': checkouts,
+            'checkouts_queued': stats.get('requests_queued', 0),
+            'checkout_errors': stats.get('requests_errors', 0),
+            'wait_ms_total': wait_ms,
+            'wait_ms_avg': round(wait_ms / checkouts, 3) if checkouts else 0,
+            'usage_ms_total': stats.get('usage_ms', 0),
+            'connections_opened': stats.get('connections_num', 0),
+            'connection_errors': stats.get('connections_errors', 0),
+            'connections_lost': stats.get('connections_lost', 0),
+            'returns_bad': stats.get('returns_bad', 0),
+        }
+    return {'pid': os.getpid(), 'pools': pools}
+
+
+def close_pools(timeout=None):
+    """
+    Drain and close every pool of this process.
+
+    Waits up to ``timeout`` seconds (``DB_POOL_CLOSE_TIMEOUT`` by default)
+    for checked-out connections to be returned before closing them.
+    """
+    if timeout is None:
+        timeout = settings.DB_POOL_CLOSE_TIMEOUT
+    for alias, pool in get_pools().items():
+        connection = connections[alias]
+        connection.close()
+        pool.close(timeout=timeout)
+        connection.close_pool()
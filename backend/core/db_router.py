@@ -0,0 +1,176 @@
+"""
+Read-replica routing.
+
+Catalog reads made while serving safe requests go to one of the replica
+aliases listed in ``DATABASE_REPLICAS``; everything else, including every
+write, admin request and code running outside a request (Celery tasks,
+management commands), uses the primary.
+
+Replication lags behind the primary, so writes pin reads to the primary:
+
+* for the rest of the request that wrote;
+* for ``DB_REPLICA_PIN_SECONDS`` in the same client, through a cookie, so
+  users read their own writes;
+* for requests that rebuild a cached response within
+  ``DB_REPLICA_PIN_SECONDS`` of the committed change that retired it (see
+  ``backend/api/cache.py``), so responses are not re-cached from a lagging
+  replica. The category tree snapshot is always built from the primary.
+
+A replica that cannot be connected to is skipped for
+``DB_REPLICA_RETRY_SECONDS`` and reads fall back to another replica or the
+primary.
+"""
+import asyncio
+import contextvars
+import logging
+import random
+import time
+from dataclasses import dataclass
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.utils.deprecation import MiddlewareMixin
+
+logger = logging.getLogger(__name__)
+
+PIN_COOKIE = 'db_primary'
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+@dataclass
+class RoutingState:
+    """Routing decisions of the current request."""
+    primary: bool = False
+    replica: str = None
+    wrote: bool = False
+
+
+_state = contextvars.ContextVar('db_routing_state', default=None)
+
+# Monotonic time until which a replica is skipped after failing to connect
+_unavailable_until = {}
+
+
+def _in_event_loop():
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def is_catalog_model(model):
+    return (
+        model._meta.app_label in settings.DATABASE_REPLICA_APPS
+        and model._meta.label_lower not in settings.DATABASE_REPLICA_EXCLUDED_MODELS
+    )
+
+
+def choose_replica():
+    """Return a reachable replica alias, or the primary if there is none."""
+    replicas = settings.DATABASE_REPLICAS
+    for alias in random.sample(replicas, len(replicas)):
+        if _unavailable_until.get(alias, 0) > time.monotonic():
+            continue
+        try:
+            connections[alias].ensure_connection()
+        except DatabaseError as exc:
+            _unavailable_until[alias] = time.monotonic() + settings.DB_REPLICA_RETRY_SECONDS
+            logger.warning(
+                'Replica %s is unavailable, skipping it for %ss: %s',
+                alias, settings.DB_REPLICA_RETRY_SECONDS, exc
+            )
+            continue
+        return alias
+    return DEFAULT_DB_ALIAS
+
+
+async def aselect_replica():
+    """
+    Choose the replica of the current request ahead of async ORM calls, which
+    look the alias up on the event loop where no connection can be tried.
+    """
+    state = _state.get()
+    if state is not None and not state.primary and state.replica is None:
+        state.replica = await sync_to_async(choose_replica)()
+
+
+def pin_to_primary():
+    """Serve the remaining reads of the current request from the primary."""
+    state = _state.get()
+    if state is not None:
+        state.primary = True
+
+
+class PrimaryReplicaRouter:
+    """Send catalog reads of unpinned requests to a replica and the rest to the primary."""
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or state.primary or not is_catalog_model(model):
+            return DEFAULT_DB_ALIAS
+        if state.replica is None:
+            # Async ORM calls look the alias up on the event loop before running
+            # the query in a thread; async views choose with aselect_replica()
+            # first, other coroutines read from the primary.
+            if _in_event_loop():
+                return DEFAULT_DB_ALIAS
+            state.replica = choose_replica()
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.primary = True
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive the schema through replication
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware(MiddlewareMixin):
+    """
+    Decide per request whether catalog reads may use a replica.
+
+    Must come before ``SessionMiddleware`` so session writes pin the browser
+    to the primary too.
+    """
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def process_request(self, request):
+        primary = (
+            request.method not in SAFE_METHODS
+            or request.path.startswith(settings.DB_PRIMARY_PATHS)
+            or PIN_COOKIE in request.COOKIES
+        )
+        _state.set(RoutingState(primary=primary))
+
+    def process_response(self, request, response):
+        state = _state.get()
+        _state.set(None)
+        if state is not None and state.wrote:
+            response.set_cookie(
+                PIN_COOKIE,
+                '1',
+                max_age=settings.DB_REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
@@ -0,0 +1,84 @@
+"""
+Middleware stacks per URL prefix.
+
+Django runs every request through ``MIDDLEWARE``. The handlers here also
+build one stack per entry of ``MIDDLEWARE_PROFILES``, which maps URL path
+prefixes to middleware lists, and run requests whose path starts with a
+prefix through that stack instead, the longest prefix winning. Everything
+else, the admin included, keeps the full ``MIDDLEWARE``.
+
+``asgi.py`` and ``wsgi.py`` serve the application through these handlers;
+the Django test client does not use them.
+"""
+import threading
+
+import django
+from django.conf import settings
+from django.core.handlers import asgi, wsgi
+from django.core.handlers.base import BaseHandler
+
+# BaseHandler reads the stack from settings.MIDDLEWARE, which is swapped
+# while a profile is loaded
+_loading = threading.Lock()
+
+
+class MiddlewareProfilesMixin:
+    """Handler dispatching requests to the middleware stack of their path prefix."""
+
+    _profiles = ()
+
+    def load_middleware(self, is_async=False):
+        with _loading:
+            profiles = []
+            stacks = getattr(settings, 'MIDDLEWARE_PROFILES', {})
+            for prefix in sorted(stacks, key=len, reverse=True):
+                handler = BaseHandler()
+                default = settings.MIDDLEWARE
+                settings.MIDDLEWARE = stacks[prefix]
+                try:
+                    handler.load_middleware(is_async)
+                finally:
+                    settings.MIDDLEWARE = default
+                profiles.append((prefix, handler))
+            # Profiles are in place before the default stack marks the handler loaded
+            self._profiles = profiles
+            super().load_middleware(is_async)
+
+    def get_profile_handler(self, request):
+        """Return the handler of the profile matching the request path, or None."""
+        for prefix, handler in self._profiles:
+            if request.path_info.startswith(prefix):
+                return handler
+        return None
+
+    def get_response(self, request):
+        handler = self.get_profile_handler(request)
+        if handler is None:
+            return super().get_response(request)
+        return handler.get_response(request)
+
+    async def get_response_async(self, request):
+        handler = self.get_profile_handler(request)
+        if handler is None:
+            return await super().get_response_async(request)
+        return await handler.get_response_async(request)
+
+
+class ASGIHandler(MiddlewareProfilesMixin, asgi.ASGIHandler):
+    pass
+
+
+class WSGIHandler(MiddlewareProfilesMixin, wsgi.WSGIHandler):
+    pass
+
+
+def get_asgi_application():
+    """``django.core.asgi.get_asgi_application`` with middleware profiles."""
+    django.setup(set_prefix=False)
+    return ASGIHandler()
+
+
+def get_wsgi_application():
+    """``django.core.wsgi.get_wsgi_application`` with middleware profiles."""
+    django.setup(set_prefix=False)
+    return WSGIHandler()
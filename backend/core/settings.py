@@ -1,6 +1,7 @@
 from dotenv import load_dotenv
 import os
 from pathlib import Path
+from importlib.util import find_spec
 
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -47,6 +48,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     #extra_libs,
     'rest_framework',
     'parler',
@@ -61,6 +63,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'backend.core.db_router.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -69,6 +72,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'backend.api.middlewares.LanguageMiddleware',
+    'backend.api.middlewares.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'backend.core.urls'
@@ -90,6 +94,42 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'backend.core.wsgi.application'
 
+# API-only profile of the processes serving requests (see gunicorn.conf.py):
+# the admin, the API docs and the apps only they use are not loaded.
+# Management commands, the admin and schema generation need the full settings.
+API_ONLY = os.getenv('API_ONLY', 'False') == 'True'
+API_ONLY_EXCLUDED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'drf_spectacular',
+]
+if API_ONLY:
+    INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in API_ONLY_EXCLUDED_APPS]
+    MIDDLEWARE.remove('django.contrib.messages.middleware.MessageMiddleware')
+    TEMPLATES[0]['OPTIONS']['context_processors'].remove(
+        'django.contrib.messages.context_processors.messages'
+    )
+
+# Middleware stacks by URL path prefix (see backend/core/handlers.py). Public
+# catalog reads authenticate nobody and LanguageMiddleware negotiates their
+# language, so they skip sessions, CSRF, authentication, messages and
+# Django's LocaleMiddleware. Other paths, the admin included, use MIDDLEWARE.
+CATALOG_SKIPPED_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.locale.LocaleMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+]
+CATALOG_MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE if middleware not in CATALOG_SKIPPED_MIDDLEWARE
+]
+MIDDLEWARE_PROFILES = {
+    '/api/v1/categories/': CATALOG_MIDDLEWARE,
+    '/api/v1/products/': CATALOG_MIDDLEWARE,
+}
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -102,9 +142,65 @@ DATABASES = {
         'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
         'HOST': os.getenv('POSTGRES_HOST'), # имя сервиса в docker-compose.yml
         'PORT': os.getenv('POSTGRES_PORT'),
+        # With pooling, checks run when a connection is taken from the pool
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {},
     }
 }
 
+# Connection pooling (psycopg 3, see backend/core/db_pool.py). Every worker
+# process keeps its own pool, so the server may see up to
+# workers x DB_POOL_MAX_SIZE connections.
+DB_POOL_ENABLED = os.getenv('DB_POOL_ENABLED', 'True') == 'True'
+# Seconds a worker waits for checked-out connections to come back on shutdown
+DB_POOL_CLOSE_TIMEOUT = float(os.getenv('DB_POOL_CLOSE_TIMEOUT', '10'))
+if DB_POOL_ENABLED:
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'name': 'default',
+        'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '2')),
+        'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+        # Seconds a request waits for a free connection before failing
+        'timeout': float(os.getenv('DB_POOL_TIMEOUT', '10')),
+        'max_idle': float(os.getenv('DB_POOL_MAX_IDLE', '300')),
+        'max_lifetime': float(os.getenv('DB_POOL_MAX_LIFETIME', '3600')),
+    }
+
+# Read replicas (see backend/core/db_router.py): comma-separated host[:port]
+# list of streaming replicas sharing the primary's name and credentials.
+DATABASE_REPLICAS = []
+# Seconds to wait for a replica connection before falling back to the primary
+DB_REPLICA_TIMEOUT = int(os.getenv('DB_REPLICA_TIMEOUT', '2'))
+for number, address in enumerate(filter(None, os.getenv('POSTGRES_REPLICA_HOSTS', '').split(',')), 1):
+    host, _, port = address.strip().partition(':')
+    alias = f'replica_{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'OPTIONS': {'connect_timeout': DB_REPLICA_TIMEOUT},
+        'TEST': {'MIRROR': 'default'},
+    }
+    if DB_POOL_ENABLED:
+        DATABASES[alias]['OPTIONS']['pool'] = {
+            **DATABASES['default']['OPTIONS']['pool'],
+            'name': alias,
+            'timeout': DB_REPLICA_TIMEOUT,
+        }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['backend.core.db_router.PrimaryReplicaRouter']
+# Apps whose reads may be served by a replica
+DATABASE_REPLICA_APPS = ['app']
+# Models of those apps that are not catalog data: they stay on the primary
+DATABASE_REPLICA_EXCLUDED_MODELS = ['app.stockreservation']
+# Requests under these paths always use the primary
+DB_PRIMARY_PATHS = ('/admin/',)
+# Seconds reads stay on the primary after a write, for the writing client and
+# for rebuilding the cached responses the write retired
+DB_REPLICA_PIN_SECONDS = int(os.getenv('DB_REPLICA_PIN_SECONDS', '10'))
+# Seconds an unreachable replica is skipped before it is tried again
+DB_REPLICA_RETRY_SECONDS = int(os.getenv('DB_REPLICA_RETRY_SECONDS', '30'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -163,10 +259,19 @@ PARLER_LANGUAGES = {
 
 PARLER_DEFAULT_LANGUAGE_CODE = 'en'
 
+# PostgreSQL text search configuration per language (see backend/app/search.py)
+PRODUCT_SEARCH_CONFIGS = {
+    'en': 'english',
+    'de': 'german',
+    'fr': 'french',
+}
+
 # REST Framework Configuration
 REST_FRAMEWORK = {
+    # orjson and msgpack are optional (see backend/api/renderers.py)
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'backend.api.renderers.FastJSONRenderer',
+        *(['backend.api.renderers.MessagePackRenderer'] if find_spec('msgpack') else []),
     ],
     'DEFAULT_PARSER_CLASSES': [
         'rest_framework.parsers.JSONParser',
@@ -185,7 +290,14 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_THROTTLE_RATES': {
+        # Per client IP (or user) and process-local without REDIS_URL
+        'reservations': os.getenv('RESERVATION_THROTTLE_RATE', '30/min'),
+    },
 }
+if API_ONLY:
+    # drf_spectacular's schema class is only used to generate the schema
+    REST_FRAMEWORK['DEFAULT_SCHEMA_CLASS'] = 'rest_framework.schemas.openapi.AutoSchema'
 
 # DRF Spectacular Settings
 SPECTACULAR_SETTINGS = {
@@ -196,15 +308,110 @@ SPECTACULAR_SETTINGS = {
 }
 
 # Cache Configuration
-# CACHES = {
-#     'default': {
-#         'BACKEND': 'django_redis.cache.RedisCache',
-#         'LOCATION': CORS_ALLOWED_ORIGINS('REDIS_URL', default='redis://127.0.0.1:6379/0'),
-#         'OPTIONS': {
-#             'CLIENT_CLASS': 'django_redis.client.DefaultClient',
-#         }
-#     }
-# }
+# Without REDIS_URL each process keeps its own in-memory cache, which is
+# enough for local development but not for invalidation across workers.
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Catalog API response cache (see backend/api/cache.py)
+API_CACHE_ENABLED = os.getenv('API_CACHE_ENABLED', 'True') == 'True'
+API_CACHE_ALIAS = 'default'
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', '600'))
+# Share of lookups counted in the hit/miss statistics; each one is a cache write
+API_CACHE_STATS_SAMPLE_RATE = float(os.getenv('API_CACHE_STATS_SAMPLE_RATE', '0.01'))
+# Per-product fragments of list responses (see backend/api/fragments.py); keys
+# change with the data, so the timeout only bounds memory use
+API_FRAGMENT_CACHE_ENABLED = os.getenv('API_FRAGMENT_CACHE_ENABLED', 'True') == 'True'
+API_FRAGMENT_CACHE_TIMEOUT = int(os.getenv('API_FRAGMENT_CACHE_TIMEOUT', '86400'))
+
+# Shared (CDN / reverse proxy) caching of catalog responses (see backend/api/cdn.py)
+CDN_MAX_AGE = int(os.getenv('CDN_MAX_AGE', '300'))
+# Browsers revalidate with the ETag by default
+CDN_BROWSER_MAX_AGE = int(os.getenv('CDN_BROWSER_MAX_AGE', '0'))
+# Request header in which the CDN passes the language it normalized from
+# Accept-Language at the edge (e.g. X-Language); responses then vary on it
+# instead of the raw Accept-Language (see backend/api/middlewares.py)
+CDN_LANGUAGE_HEADER = os.getenv('CDN_LANGUAGE_HEADER', '')
+# Surrogate-Key for Fastly, xkey for Varnish, Cache-Tag for Cloudflare
+CDN_SURROGATE_KEY_HEADER = os.getenv('CDN_SURROGATE_KEY_HEADER', 'Surrogate-Key')
+# Endpoint purging keys sent in CDN_SURROGATE_KEY_HEADER; purging is off without it
+CDN_PURGE_URL = os.getenv('CDN_PURGE_URL', '')
+CDN_PURGE_METHOD = os.getenv('CDN_PURGE_METHOD', 'PURGE')
+CDN_PURGE_TOKEN = os.getenv('CDN_PURGE_TOKEN', '')
+CDN_PURGE_TIMEOUT = float(os.getenv('CDN_PURGE_TIMEOUT', '5'))
+
+# Price range boundaries of the product facets, in EUR (see backend/api/v1/facets.py)
+FACET_PRICE_BOUNDS = [
+    bound for bound in os.getenv('FACET_PRICE_BOUNDS', '100,250,500,1000,2500').split(',') if bound
+]
+
+# Streaming product feed export (see backend/api/v1/export.py)
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', '2000'))
+# Seconds the cutoff of an export is moved back to allow for clock skew
+# between the application servers and the database
+EXPORT_CUTOFF_LAG = int(os.getenv('EXPORT_CUTOFF_LAG', '5'))
+EXPORT_FEED_TITLE = os.getenv('EXPORT_FEED_TITLE', 'Jewelry Workshop')
+EXPORT_SITE_URL = os.getenv('EXPORT_SITE_URL', '')
+# Storefront product page, formatted with {id}, {sku} and {language}
+EXPORT_PRODUCT_URL = os.getenv('EXPORT_PRODUCT_URL', '')
+# Days deleted-product tombstones are kept for incremental exports; an export
+# with an older since misses deletions and must be replaced by a full one
+EXPORT_TOMBSTONE_RETENTION = int(os.getenv('EXPORT_TOMBSTONE_RETENTION', '90'))
+
+# Serve the hot catalog read endpoints with native async views under ASGI
+# (see backend/api/v1/async_views.py)
+API_ASYNC_VIEWS = os.getenv('API_ASYNC_VIEWS', 'False') == 'True'
+
+# Per-request Server-Timing profiling (see backend/api/profiling.py); staff
+# can switch it at runtime through api/v1/profiling/
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'False') == 'True'
+# Seconds before other processes pick up a runtime switch
+PROFILING_REFRESH_SECONDS = 5
+# Statements at least this slow are logged with their call site
+PROFILING_SLOW_QUERY_MS = float(os.getenv('PROFILING_SLOW_QUERY_MS', '100'))
+# Slow queries kept per process for api/v1/profiling/
+PROFILING_SLOW_QUERY_LOG_SIZE = 100
+
+# Celery Configuration
+CELERY_BROKER_URL = os.getenv(
+    'CELERY_BROKER_URL',
+    f"redis://{os.getenv('REDIS_HOST', 'localhost')}:{os.getenv('REDIS_PORT', '6379')}/1"
+)
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_TASK_ALWAYS_EAGER = os.getenv('CELERY_TASK_ALWAYS_EAGER', 'False') == 'True'
+CELERY_BEAT_SCHEDULE = {
+    'expire-stock-reservations': {
+        'task': 'backend.app.tasks.expire_stock_reservations',
+        'schedule': float(os.getenv('RESERVATION_EXPIRY_INTERVAL', '30')),
+    },
+    'prune-deleted-products': {
+        'task': 'backend.app.tasks.prune_deleted_products',
+        'schedule': 86400.0,
+    },
+}
+
+# Stock reservations (see backend/app/reservations.py)
+RESERVATION_TTL_SECONDS = int(os.getenv('RESERVATION_TTL_SECONDS', '600'))
+# Units of one product a single reservation may hold
+RESERVATION_MAX_QUANTITY = int(os.getenv('RESERVATION_MAX_QUANTITY', '10'))
+# Expired holds released per transaction by the sweep
+RESERVATION_EXPIRY_BATCH_SIZE = 500
+
+# Product image renditions (see backend/app/images.py)
+PRODUCT_IMAGE_RENDITION_WIDTHS = [320, 640, 960, 1280]
+PRODUCT_IMAGE_RENDITION_FORMATS = ['webp', 'avif']
+PRODUCT_IMAGE_RENDITION_QUALITY = {'webp': 80, 'avif': 60}
 
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'static'
@@ -248,9 +455,10 @@ LOGGING = {
             'level': 'INFO',
             'propagate': False,
         },
+        # DEBUG prints every statement; use profiling for query timings instead
         'django.db.backends': {
             'handlers': ['console'],
-            'level': 'DEBUG',
+            'level': os.getenv('DB_LOG_LEVEL', 'INFO'),
             'propagate': False,
         },
     },
@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+from django.db import connection
+
+from backend.core import asgi
+from backend.core.db_pool import get_pool_stats
+
+pytestmark = pytest.mark.django_db
+
+
+def test_statistics_cover_the_open_pool():
+    connection.ensure_connection()
+
+    stats = get_pool_stats()['pools']['default']
+
+    assert stats['in_use'] >= 1
+    assert 0 < stats['saturation'] <= 1
+    assert stats['in_use'] + stats['available'] == stats['size']
+
+
+def test_pool_endpoint_is_staff_only(client, admin_client):
+    assert client.get('/api/v1/db-pool/').status_code == 403
+
+    response = admin_client.get('/api/v1/db-pool/')
+
+    assert response.status_code == 200
+    assert 'default' in response.json()['pools']
+
+
+def test_lifespan_shutdown_closes_the_pools(monkeypatch):
+    closed = []
+    monkeypatch.setattr(asgi, 'close_pools', lambda: closed.append(True))
+    messages = iter([{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}])
+    sent = []
+
+    async def receive():
+        return next(messages)
+
+    async def send(message):
+        sent.append(message['type'])
+
+    asyncio.run(asgi.application({'type': 'lifespan'}, receive, send))
+
+    assert sent == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+    assert closed == [True]
@@ -0,0 +1,117 @@
+import pytest
+from django.db import DEFAULT_DB_ALIAS
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from backend.api import cache
+from backend.app.models import Product, StockReservation
+from backend.core import db_router
+
+REPLICA = 'replica_1'
+
+
+@pytest.fixture
+def router(settings, monkeypatch):
+    settings.DATABASE_REPLICAS = [REPLICA]
+    router = db_router.PrimaryReplicaRouter()
+    router.replica = REPLICA
+    router.chosen = []
+
+    def choose_replica():
+        router.chosen.append(router.replica)
+        return router.replica
+
+    monkeypatch.setattr(db_router, 'choose_replica', choose_replica)
+    return router
+
+
+@pytest.fixture
+def middleware(router):
+    middleware = db_router.ReplicaRoutingMiddleware(lambda request: HttpResponse())
+    yield middleware
+    db_router._state.set(None)
+
+
+def start(middleware, method='get', cookies=None):
+    request = getattr(RequestFactory(), method)('/api/v1/products/')
+    request.COOKIES.update(cookies or {})
+    middleware.process_request(request)
+    return request
+
+
+def test_safe_requests_read_the_catalog_from_a_replica(router, middleware):
+    start(middleware)
+
+    assert router.db_for_read(Product) == REPLICA
+    assert router.db_for_read(StockReservation) == DEFAULT_DB_ALIAS
+
+
+@pytest.mark.parametrize('method, cookies', [
+    ('post', None),
+    ('get', {db_router.PIN_COOKIE: '1'}),
+])
+def test_unsafe_requests_and_pinned_clients_use_the_primary(router, middleware, method, cookies):
+    start(middleware, method, cookies)
+
+    assert router.db_for_read(Product) == DEFAULT_DB_ALIAS
+
+
+def test_reads_outside_requests_use_the_primary(router):
+    assert router.db_for_read(Product) == DEFAULT_DB_ALIAS
+
+
+def test_writes_pin_the_request_and_the_client(router, middleware):
+    request = start(middleware)
+    router.db_for_write(Product)
+
+    assert router.db_for_read(Product) == DEFAULT_DB_ALIAS
+    response = middleware.process_response(request, HttpResponse())
+    assert response.cookies[db_router.PIN_COOKIE]['max-age'] > 0
+
+
+def test_writes_do_not_pin_other_clients(router, middleware):
+    request = start(middleware)
+    router.db_for_write(Product)
+    middleware.process_response(request, HttpResponse())
+
+    start(middleware)
+
+    assert router.db_for_read(Product) == REPLICA
+
+
+def test_versions_remember_when_they_changed():
+    old = 'a' * 32 + '.0'
+
+    assert cache.changed_recently([old, cache.new_version()])
+    assert not cache.changed_recently([old, 'b' * 32])
+
+
+@pytest.mark.django_db
+def test_cache_rebuilds_right_after_a_change_read_the_primary(
+    client, router, make_category, make_product
+):
+    # Stands in for a replica, so requests can read the test database
+    router.replica = DEFAULT_DB_ALIAS
+    make_product(make_category('rings'), 'R-1')
+
+    assert client.get('/api/v1/products/').status_code == 200
+    assert router.chosen == []
+
+    old = {cache.VERSION_KEY.format(namespace): 'a' * 32 + '.0' for namespace in cache.NAMESPACES}
+    cache.get_cache().set_many(old, timeout=None)
+
+    assert client.get('/api/v1/products/').status_code == 200
+    assert router.chosen == [DEFAULT_DB_ALIAS]
+
+
+@pytest.mark.django_db
+def test_async_views_read_from_a_replica(client, settings, router, make_category, make_product):
+    settings.ROOT_URLCONF = 'backend.api.tests.async_urls'
+    # Stands in for a replica, so requests can read the test database
+    router.replica = DEFAULT_DB_ALIAS
+    make_product(make_category('rings'), 'R-1')
+    old = {cache.VERSION_KEY.format(namespace): 'a' * 32 + '.0' for namespace in cache.NAMESPACES}
+    cache.get_cache().set_many(old, timeout=None)
+
+    assert client.get('/api/v1/products/').status_code == 200
+    assert router.chosen == [DEFAULT_DB_ALIAS]
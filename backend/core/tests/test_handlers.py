@@ -0,0 +1,78 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import RequestFactory
+
+from backend.core.handlers import ASGIHandler, WSGIHandler
+
+pytestmark = pytest.mark.django_db
+
+
+def middleware_names(handler):
+    """Class names along the loaded middleware chain of a handler."""
+    names = []
+    # Each middleware is wrapped in convert_exception_to_response
+    layer = handler._middleware_chain.__wrapped__
+    while hasattr(layer, 'get_response'):
+        names.append(type(layer).__name__)
+        layer = layer.get_response.__wrapped__
+    return names
+
+
+@pytest.fixture
+def handler():
+    handler = WSGIHandler()
+    handler.load_middleware()
+    return handler
+
+
+def test_catalog_paths_get_the_lean_stack(handler):
+    catalog = handler.get_profile_handler(RequestFactory().get('/api/v1/products/1/'))
+
+    assert catalog is not None
+    assert 'SessionMiddleware' not in middleware_names(catalog)
+    assert 'LanguageMiddleware' in middleware_names(catalog)
+    assert handler.get_profile_handler(RequestFactory().get('/admin/')) is None
+    assert handler.get_profile_handler(RequestFactory().get('/api/v1/reservations/')) is None
+    assert 'SessionMiddleware' in middleware_names(handler)
+
+
+def test_longest_prefix_wins(settings):
+    settings.MIDDLEWARE_PROFILES = {
+        '/api/': settings.CATALOG_MIDDLEWARE,
+        '/api/v1/products/': ['django.middleware.common.CommonMiddleware'],
+    }
+    handler = WSGIHandler()
+    handler.load_middleware()
+
+    assert middleware_names(handler.get_profile_handler(RequestFactory().get('/api/v1/products/'))) == [
+        'CommonMiddleware',
+    ]
+    assert 'LanguageMiddleware' in middleware_names(handler.get_profile_handler(RequestFactory().get('/api/')))
+
+
+def test_catalog_responses_skip_sessions_and_negotiate_once(handler, make_category):
+    make_category('rings')
+
+    response = handler.get_response(RequestFactory().get('/api/v1/categories/', HTTP_ACCEPT_LANGUAGE='de'))
+
+    assert response.status_code == 200
+    assert response['Content-Language'] == 'de'
+    assert 'Cookie' not in response.get('Vary', '')
+    assert not response.cookies
+
+
+def test_admin_keeps_the_full_stack(handler):
+    response = handler.get_response(RequestFactory().get('/admin/login/'))
+
+    assert response.status_code == 200
+    assert 'csrftoken' in response.cookies
+
+
+def test_asgi_handler_dispatches_the_same_way(make_category):
+    make_category('rings')
+    handler = ASGIHandler()
+
+    response = async_to_sync(handler.get_response_async)(RequestFactory().get('/api/v1/categories/'))
+
+    assert response.status_code == 200
+    assert 'Cookie' not in response.get('Vary', '')
@@ -0,0 +1,55 @@
+import os
+import runpy
+import subprocess
+import sys
+
+import pytest
+from django.conf import settings
+
+pytestmark = pytest.mark.django_db
+
+# Prints the installed apps and which paths resolve under the settings in the environment
+PROBE = '''
+import django
+from django.conf import settings
+from django.urls import Resolver404, resolve
+django.setup()
+def resolves(path):
+    try:
+        resolve(path)
+    except Resolver404:
+        return False
+    return True
+print('django.contrib.admin' in settings.INSTALLED_APPS, resolves('/admin/'), resolves('/api/v1/products/'))
+'''
+
+
+def probe(api_only):
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'backend.core.settings', 'API_ONLY': api_only}
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE], cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    return result.stdout.split()
+
+
+def test_gunicorn_keeps_the_profile_of_the_environment(monkeypatch):
+    monkeypatch.delenv('API_ONLY', raising=False)
+
+    config = runpy.run_path(str(settings.BASE_DIR / 'gunicorn.conf.py'))
+
+    assert not any(entry.startswith('API_ONLY=') for entry in config.get('raw_env', []))
+
+
+@pytest.mark.parametrize('api_only, expected', [
+    ('False', ['True', 'True', 'True']),
+    ('True', ['False', 'False', 'True']),
+])
+def test_api_only_profile_leaves_out_the_admin(api_only, expected):
+    assert probe(api_only) == expected
+
+
+def test_staff_endpoints_accept_the_admin_login(client, admin_user):
+    response = client.post('/admin/login/', {'username': admin_user.username, 'password': 'password'})
+    assert response.status_code == 302
+
+    assert client.get('/api/v1/db-pool/').status_code == 200
@@ -1,28 +1,33 @@
-from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularRedocView,
-    SpectacularSwaggerView
-)
 
 urlpatterns = [
-    # Django Admin
-    path('admin/', admin.site.urls),
-    
     # API v1
     path('api/v1/', include('backend.api.v1.urls')),
-    
-    # API Documentation (Swagger UI)
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
-    path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
-    
-    # API Documentation (ReDoc)
-    path('api/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
 ]
 
+# The admin and the API docs are left out of the API-only profile
+if not settings.API_ONLY:
+    from django.contrib import admin
+    from drf_spectacular.views import (
+        SpectacularAPIView,
+        SpectacularRedocView,
+        SpectacularSwaggerView
+    )
+
+    urlpatterns += [
+        # Django Admin
+        path('admin/', admin.site.urls),
+
+        # API Documentation (Swagger UI)
+        path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
+        path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
+
+        # API Documentation (ReDoc)
+        path('api/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
+    ]
+
 # Serve media files in development
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
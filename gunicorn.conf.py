@@ -0,0 +1,31 @@
+"""
+Gunicorn configuration serving the ASGI application with uvicorn workers.
+
+    gunicorn -c gunicorn.conf.py backend.core.asgi:application
+
+The application is imported once in the master process (``preload_app``)
+and workers are forked from it warm, sharing the memory pages of everything
+imported. Database pools and cache clients are created in each worker on
+first use, never during the import.
+
+Workers run the full settings by default. ``API_ONLY=True`` selects the
+API-only profile, which leaves out the admin and the API docs; deployments
+using it serve those, and the admin session login the staff-only endpoints
+need, from a separate process with the full settings.
+"""
+import gc
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv('WEB_CONCURRENCY', '4'))
+worker_class = 'uvicorn_worker.UvicornWorker'
+preload_app = os.getenv('GUNICORN_PRELOAD', 'True') == 'True'
+# Longer than DB_POOL_CLOSE_TIMEOUT, so workers can drain their pools
+graceful_timeout = 30
+accesslog = '-'
+
+
+def when_ready(server):
+    # Keep the collector from touching objects loaded so far: writing to
+    # their pages in a worker would give it a private copy
+    gc.freeze()